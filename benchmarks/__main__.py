@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+""" benchmarks -- run the benchmark suite, optionally saving the results as JSON and comparing them with a previous run.
+
+Usage (from the directory containing htmltemplate.py):
+
+	python3 -m benchmarks [-o results.json] [-c baseline.json] [-t 0.1] [-k pattern] [--quick]
+
+Each benchmark times one operation (parsing, compiling, copying, repeating or rendering) on a workload derived from one of the sample scripts (see workloads.py), using both the tree-walking renderer and compiled templates where relevant. When comparing with a baseline, benchmarks that are more than the threshold slower than the baseline are reported as regressions, and the exit status is 1.
+
+The bench_*.py scripts in this directory compare specific optimisations (e.g. bench_compile.py compares the tree walker with compiled templates) and can be run individually.
+"""
+
+import argparse, json, os, platform, re, subprocess, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import workloads
+from workloads import Template, besttime
+
+
+#################################################
+# BENCHMARKS
+#################################################
+# Each function yields (name, function, args[, kwargs]) for the operations to time. Workloads are set up between yields, so are not included in the timings.
+
+
+def walktree(node):
+	# Access every sub-node, forcing a copied template to make its own copy of each one (see Node.copy()).
+	for subnode in node:
+		walktree(subnode)
+
+
+def filledtable(template, rows):
+	node = template.copy()
+	workloads.render_table(node, 'Foo Co.', workloads.tabledata(rows))
+	return node
+
+
+def bench_parse():
+	pagehtml, tochtml = workloads.docgenhtml()
+	for name, html in [('demo2_table', workloads.kTableHTML), ('demo9_recursive_list', workloads.kListHTML),
+			('docgen page', pagehtml), ('docgen toc', tochtml)]:
+		yield 'parse/' + name, Template, (html,)
+		yield 'compile/' + name, Template, (html,), {'compiled': True}
+
+
+def bench_copy():
+	pagehtml, _ = workloads.docgenhtml()
+	for name, html in [('demo2_table', workloads.kTableHTML), ('docgen page', pagehtml)]:
+		template = Template(html)
+		yield 'copy/' + name, template.copy, ()
+		yield 'copy+walk/' + name, lambda template: walktree(template.copy()), (template,)
+	for rows in (100, 1000):
+		template = filledtable(Template(workloads.kTableHTML), rows)
+		yield 'copy/demo2_table filled ({} rows)'.format(rows), template.copy, ()
+	htmlcalendar = workloads.calendarmodule()
+	yield 'copy/htmlcalendar month', htmlcalendar.CalendarRenderer.gTemplate.copy, ()
+	yield 'copy+walk/htmlcalendar page', lambda: walktree(htmlcalendar.gPageTemplate.copy()), ()
+
+
+def bench_repeat():
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		template = Template(workloads.kTableHTML, compiled=compiled)
+		for rows in (100, 1000, 10000):
+			data = workloads.tabledata(rows)
+			yield 'repeat/demo2_table ({} rows, {})'.format(rows, mode), \
+					lambda template, data: template.copy().client.repeat(workloads.render_client, data), (template, data)
+		template = Template(workloads.kListHTML, compiled=compiled)
+		for depth in (2, 4, 6):
+			yield 'repeat/demo9_recursive_list (depth {}, {})'.format(depth, mode), \
+					workloads.render_nestedlist, (template, workloads.nesteddata(depth))
+			yield 'repeat/demo9_recursive_list recurse (depth {}, {})'.format(depth, mode), \
+					workloads.render_recursivelist, (template, workloads.nesteddata(depth))
+
+
+def bench_render():
+	pagehtml, tochtml = workloads.docgenhtml()
+	pages = workloads.docgenpages()
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		for rows in (100, 1000, 10000):
+			yield 'render/demo2_table filled ({} rows, {})'.format(rows, mode), \
+					filledtable(Template(workloads.kTableHTML, compiled=compiled), rows).render, ()
+		yield 'render/docgen ({} pages, {})'.format(len(pages) + 1, mode), workloads.render_docs, \
+				(Template(pagehtml, compiled=compiled), Template(tochtml, compiled=compiled), pages)
+	# htmlcalendar's templates are module globals, so are compiled after the tree walker has been timed
+	htmlcalendar = workloads.calendarmodule()
+	yield 'render/htmlcalendar (walker)', workloads.render_calendar, (htmlcalendar,)
+	htmlcalendar.CalendarRenderer.gTemplate.compile()
+	htmlcalendar.gPageTemplate.compile()
+	yield 'render/htmlcalendar (compiled)', workloads.render_calendar, (htmlcalendar,)
+
+
+kSuites = [bench_parse, bench_copy, bench_repeat, bench_render]
+
+
+#################################################
+# SUPPORT
+#################################################
+
+
+def timeit(fn, args, kwargs, quick):
+	# Choose the number of calls per run so that each run takes at least 10ms, then return the best time for a single call.
+	number = 1
+	while True:
+		t = besttime(fn, *args, repeat=1, number=number, **kwargs)
+		if t * number >= 0.01 or number >= 100000:
+			break
+		number *= 10
+	return besttime(fn, *args, repeat=2 if quick else 5, number=number, **kwargs)
+
+
+def gitcommit():
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=workloads.gRootDir,
+				capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def run(pattern=None, quick=False):
+	""" Run the benchmarks whose names match the given regular expression.
+
+		pattern : str | None -- if given, only benchmarks whose names contain a match are run
+		quick : bool -- if True, time fewer runs
+		Result : dict -- benchmark name : best time, in seconds
+	"""
+	results = {}
+	for suite in kSuites:
+		for name, fn, args, *kwargs in suite():
+			if pattern and not re.search(pattern, name):
+				continue
+			results[name] = t = timeit(fn, args, kwargs[0] if kwargs else {}, quick)
+			print('  {:<56}{:>12.3f}ms'.format(name, t * 1000), flush=True)
+	return results
+
+
+def compare(results, baseline, threshold):
+	""" Print the change in each benchmark's time since the baseline run.
+
+		results : dict -- benchmark name : best time
+		baseline : dict -- benchmark name : best time
+		threshold : float -- the fractional slowdown above which a benchmark is reported as a regression
+		Result : list of str -- the names of the benchmarks that regressed
+	"""
+	regressions = []
+	print('\ncompared with baseline:')
+	for name, t in results.items():
+		if name not in baseline:
+			continue
+		change = t / baseline[name] - 1
+		flag = ''
+		if change > threshold:
+			regressions.append(name)
+			flag = '  REGRESSION'
+		print('  {:<56}{:>12.3f}ms{:>+9.1%}{}'.format(name, t * 1000, change, flag))
+	return regressions
+
+
+#################################################
+# MAIN
+#################################################
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the htmltemplate benchmark suite.')
+	parser.add_argument('-o', '--output', help='save the results to this JSON file')
+	parser.add_argument('-c', '--compare', help='compare the results with those in this JSON file')
+	parser.add_argument('-t', '--threshold', type=float, default=0.1, help='the slowdown above which a benchmark is a regression (default: 0.1, i.e. 10%%)')
+	parser.add_argument('-k', '--pattern', help='only run benchmarks whose names match this regular expression')
+	parser.add_argument('--quick', action='store_true', help='time fewer runs')
+	options = parser.parse_args(argv)
+	baseline = None
+	if options.compare:
+		with open(options.compare, encoding='utf-8') as f:
+			baseline = json.load(f)['results']
+	print('htmltemplate benchmarks (best time per call):')
+	results = run(options.pattern, options.quick)
+	if options.output:
+		with open(options.output, 'w', encoding='utf-8') as f:
+			json.dump({'commit': gitcommit(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+					'platform': platform.platform(), 'results': results}, f, indent='\t')
+			f.write('\n')
+	if baseline is not None and compare(results, baseline, options.threshold):
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+# Compares rendering the demo2_table workload using controller functions with rendering the same data as dicts using Node.renderdata(), checking that both produce identical HTML.
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def binddata(title, clients):
+	return {'title': title, 'client': [
+			{'name': client.surname + ', ' + client.firstname, 
+			'email': {'text': client.email, 'atts': {'href': 'mailto:' + client.email}}} for client in clients]}
+
+
+def simpledata(title, clients):
+	# As binddata, but without changing the email link's href, so that every row can be bound directly.
+	return {'title': title, 'client': [
+			{'name': client.surname + ', ' + client.firstname, 'email': client.email} for client in clients]}
+
+
+def render_simple(node, title, clients):
+	node.title.text = title
+	node.client.repeat(render_simple_client, clients)
+
+def render_simple_client(node, client):
+	node.name.text = client.surname + ', ' + client.firstname
+	node.email.text = client.email
+
+
+if __name__ == '__main__':
+	results = []
+	for compiled in (False, True):
+		template = Template(workloads.kTableHTML, compiled=compiled)
+		mode = 'compiled' if compiled else 'walker'
+		for rows in (1000, 10000):
+			clients = workloads.tabledata(rows)
+			data = binddata('Foo Co.', clients)
+			assert template.render(workloads.render_table, 'Foo Co.', clients) == template.renderdata(data)
+			results.append(('{} rows, with atts ({})'.format(rows, mode),
+					besttime(template.render, workloads.render_table, 'Foo Co.', clients), 
+					besttime(template.renderdata, data)))
+			data = simpledata('Foo Co.', clients)
+			assert template.render(render_simple, 'Foo Co.', clients) == template.renderdata(data)
+			results.append(('{} rows, text only ({})'.format(rows, mode),
+					besttime(template.render, render_simple, 'Foo Co.', clients), 
+					besttime(template.renderdata, data)))
+	report('controller functions vs renderdata', results)
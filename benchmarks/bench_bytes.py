@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Compares encoding rendered HTML using render().encode('utf-8') with using Node.renderbytes(), for large, mostly-static pages and for the demo2_table workload, checking that both produce identical bytes.
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def staticpage(paragraph, paragraphs):
+	# A page of static text (e.g. documentation), with a few nodes for the page's title, navigation links and footer.
+	body = '\n'.join('<p class="body">{} {}</p>'.format(paragraph, i) for i in range(paragraphs))
+	return '''<html>
+	<head><title node="con:title">TITLE</title></head>
+	<body>
+		<ul><li node="rep:link"><a node="con:link" href="#">LINK</a></li></ul>
+		<h1 node="con:heading">HEADING</h1>
+		{0}
+		<div node="con:note">NOTE</div>
+		{0}
+		<p node="con:footer">FOOTER</p>
+	</body>
+</html>'''.format(body)
+
+
+def render_page(node, title, links):
+	node.title.text = node.heading.text = title
+	node.link.repeat(render_link, links)
+	node.note.text = 'Last updated: today'
+	node.footer.text = 'Copyright'
+
+def render_link(node, name):
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+
+
+def encoded(template, fn, *args):
+	return template.render(fn, *args).encode('utf-8')
+
+
+if __name__ == '__main__':
+	links = ['page{}'.format(i) for i in range(10)]
+	results = []
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		for label, paragraph in (('ASCII', 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'),
+				('non-ASCII', 'Zoë’s café serves crème brûlée — naïve résumé ✓')):
+			for paragraphs in (100, 2000):
+				template = Template(staticpage(paragraph, paragraphs), compiled=compiled)
+				assert encoded(template, render_page, 'Title', links) == template.renderbytes(render_page, 'Title', links)
+				results.append(('{}KB page, {} ({})'.format(len(template.render()) // 1000, label, mode),
+						besttime(encoded, template, render_page, 'Title', links, number=10),
+						besttime(template.renderbytes, render_page, 'Title', links, number=10)))
+		template = Template(workloads.kTableHTML, compiled=compiled)
+		clients = workloads.tabledata(1000)
+		assert encoded(template, workloads.render_table, 'Foo Co.', clients) == template.renderbytes(workloads.render_table, 'Foo Co.', clients)
+		results.append(('1000 table rows ({})'.format(mode),
+				besttime(encoded, template, workloads.render_table, 'Foo Co.', clients),
+				besttime(template.renderbytes, workloads.render_table, 'Foo Co.', clients)))
+	report('render().encode() vs renderbytes()', results)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+# Compares rendering times for the tree-walking renderer and compiled templates (Template.compile) on the demo2_table and htmlcalendar workloads, checking that both produce identical HTML.
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def bench_table(rows):
+	data = workloads.tabledata(rows)
+	template = Template(workloads.kTableHTML)
+	compiled = Template(workloads.kTableHTML, compiled=True)
+	assert template.render(workloads.render_table, 'Foo Co.', data) == compiled.render(workloads.render_table, 'Foo Co.', data)
+	return ('demo2_table ({} rows)'.format(rows),
+			besttime(template.render, workloads.render_table, 'Foo Co.', data),
+			besttime(compiled.render, workloads.render_table, 'Foo Co.', data))
+
+
+def bench_calendar():
+	htmlcalendar = workloads.calendarmodule()
+	expected = workloads.render_calendar(htmlcalendar)
+	walked = besttime(workloads.render_calendar, htmlcalendar, number=10)
+	htmlcalendar.CalendarRenderer.gTemplate.compile()
+	htmlcalendar.gPageTemplate.compile()
+	assert workloads.render_calendar(htmlcalendar) == expected
+	return ('htmlcalendar (12 months)', walked, besttime(workloads.render_calendar, htmlcalendar, number=10))
+
+
+if __name__ == '__main__':
+	report('render: tree walker vs compiled', 
+			[bench_table(rows) for rows in (100, 1000, 10000)] + [bench_calendar()])
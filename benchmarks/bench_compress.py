@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Compares gzip-compressing rendered HTML using render().encode() and zlib with using Node.rendercompressed(), for pages with a long static head (inline CSS, etc.) followed by small and large bodies, and for the demo2_table workload, checking that both produce identical HTML once decompressed.
+
+import zlib
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def page(headsize, paragraphs):
+	# A page whose head is a run of static HTML of about headsize characters (meta tags, stylesheet links and inline CSS), followed by a body of mostly static paragraphs with a few nodes.
+	links = ''.join('\n\t\t<link rel="stylesheet" href="/css/style{}.css" />'.format(i) for i in range(10))
+	rules = []
+	while sum(map(len, rules)) < headsize:
+		rules.append('\n\t\t\t.rule{0} {{ margin: {0}px; padding: 0 {0}px; color: #{1:06x}; }}'.format(len(rules), len(rules) * 7919))
+	body = '\n'.join('<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit {}.</p>'.format(i) for i in range(paragraphs))
+	return '''<!DOCTYPE html>
+<html>
+	<head>
+		<meta charset="utf-8" />
+		<meta name="viewport" content="width=device-width, initial-scale=1" />{}
+		<style>{}
+		</style>
+	</head>
+	<body>
+		<h1 node="con:title">TITLE</h1>
+		<ul><li node="rep:link"><a node="con:link" href="#">LINK</a></li></ul>
+		{}
+	</body>
+</html>'''.format(links, ''.join(rules), body)
+
+
+def render_page(node, title, links):
+	node.title.text = title
+	node.link.repeat(render_link, links)
+
+def render_link(node, name):
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+
+
+def compressed(template, fn, *args):
+	compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+	return compressor.compress(template.render(fn, *args).encode('utf-8')) + compressor.flush()
+
+
+if __name__ == '__main__':
+	links = ['page{}'.format(i) for i in range(10)]
+	results = []
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		for headsize, paragraphs in ((4000, 10), (4000, 100), (16000, 10), (16000, 100)):
+			template = Template(page(headsize, paragraphs), compiled=compiled)
+			expected = template.render(render_page, 'Title', links).encode('utf-8')
+			assert zlib.decompress(template.rendercompressed(render_page, 'Title', links), 31) == expected
+			assert zlib.decompress(b''.join(template.renderitercompressed(render_page, 'Title', links)), 31) == expected
+			results.append(('{}KB head, {}KB page ({})'.format(headsize // 1000, len(expected) // 1000, mode),
+					besttime(compressed, template, render_page, 'Title', links, number=100),
+					besttime(template.rendercompressed, render_page, 'Title', links, number=100),
+					besttime(lambda: b''.join(template.renderitercompressed(render_page, 'Title', links)), number=100)))
+		template = Template(workloads.kTableHTML, compiled=compiled)
+		clients = workloads.tabledata(1000)
+		expected = template.render(workloads.render_table, 'Foo Co.', clients).encode('utf-8')
+		assert zlib.decompress(template.rendercompressed(workloads.render_table, 'Foo Co.', clients), 31) == expected
+		results.append(('1000 table rows ({})'.format(mode),
+				besttime(compressed, template, workloads.render_table, 'Foo Co.', clients),
+				besttime(template.rendercompressed, workloads.render_table, 'Foo Co.', clients),
+				besttime(lambda: b''.join(template.renderitercompressed(workloads.render_table, 'Foo Co.', clients)))))
+	report('zlib.compress(render()) vs rendercompressed() vs renderitercompressed()', results)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Times the multi-step rendering pattern used by demo8_multi_step_rendering: a section template is copied for each page, and a few of its slots are filled in. As copies share their sub-nodes until they are accessed, the time per page should depend on the number of slots touched, not on the size of the template.
+
+from workloads import Template, besttime, report
+
+
+def sitetemplate(sections):
+	# A page with a small header and a large number of navigation sections, each containing nested nodes.
+	return Template('''<html>
+	<head><title node="con:title">TITLE</title></head>
+	<body>
+		<h1 node="con:heading">HEADING</h1>
+		<div node="con:body">BODY</div>''' + ''.join('''
+		<div class="section" node="con:section{0}">
+			<h2 node="con:title">SECTION</h2>
+			<ul><li node="rep:item"><a node="con:link" href="#">LINK</a> <span node="con:note">NOTE</span></li></ul>
+		</div>'''.format(i) for i in range(sections)) + '''
+	</body>
+</html>''')
+
+
+def render_item(node, i):
+	node.link.atts['href'] = '/page{}.html'.format(i)
+	node.link.text = 'Page {}'.format(i)
+	node.note.omit()
+
+
+def sectiontemplate(template):
+	node = template.copy()
+	for section in node:
+		if section.nodename.startswith('section'):
+			section.title.text = section.nodename.title()
+			section.item.repeat(render_item, range(5))
+	return node
+
+
+def renderpage(section, title):
+	node = section.copy()
+	node.title.text = title
+	node.heading.text = title
+	node.body.html = '<p>Page content.</p>'
+	return node.render()
+
+
+def copytouch(section, title):
+	node = section.copy()
+	node.title.text = title
+	node.heading.text = title
+
+
+if __name__ == '__main__':
+	rows = []
+	for sections in (1, 10, 100, 1000):
+		section = sectiontemplate(sitetemplate(sections))
+		rows.append(('{} sections: copy + 2 slots'.format(sections), besttime(copytouch, section, 'Title', number=100)))
+		rows.append(('{} sections: copy + render'.format(sections), besttime(renderpage, section, 'Title', number=10)))
+	report('copy-on-write cloning', rows)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Compares rendering a table of numbers using a controller function, using Node.renderdata(), and using Repeater.fillrows() with row tuples and with columns, checking that all produce identical HTML.
+
+from workloads import Template, besttime, report
+
+
+kGridHTML = '''<table>
+	<tr node="rep:row">
+		<th node="con:label">Label</th>
+		<td node="con:a">0</td><td node="con:b">0</td><td node="con:c">0</td><td node="con:d">0</td>
+		<td node="con:e">0</td><td node="con:f">0</td><td node="con:g">0.00</td>
+	</tr>
+</table>'''
+
+kNames = ('label', 'a', 'b', 'c', 'd', 'e', 'f', 'g')
+
+
+def griddata(rows):
+	return [('Row {}'.format(i), i, i + 1, i + 2, i * 2, i * 3, i % 7, i / 3) for i in range(rows)]
+
+
+def render_grid(node, rows):
+	node.row.repeat(render_row, rows)
+
+def render_row(node, row):
+	node.label.text = row[0]
+	node.a.text, node.b.text, node.c.text, node.d.text, node.e.text, node.f.text = row[1:7]
+	node.g.text = '{:.2f}'.format(row[7])
+
+
+def binddata(rows):
+	return {'row': [dict(zip(kNames, row[:7] + ('{:.2f}'.format(row[7]),))) for row in rows]}
+
+
+def render_fill(node, rows, formatters):
+	node.row.fillrows(rows, formatters=formatters)
+
+
+if __name__ == '__main__':
+	formatters = {'g': '{:.2f}'.format}
+	results = []
+	for compiled in (False, True):
+		template = Template(kGridHTML, compiled=compiled)
+		mode = 'compiled' if compiled else 'walker'
+		for count in (1000, 10000):
+			rows = griddata(count)
+			columns = dict(zip(kNames, zip(*rows)))
+			expected = template.render(render_grid, rows)
+			data = binddata(rows)
+			assert template.renderdata(data) == expected
+			assert template.render(render_fill, rows, formatters) == expected
+			assert template.render(render_fill, columns, formatters) == expected
+			base = besttime(template.render, render_grid, rows)
+			results.append(('{} rows, renderdata ({})'.format(count, mode), base, besttime(template.renderdata, data)))
+			results.append(('{} rows, fillrows tuples ({})'.format(count, mode), base, besttime(template.render, render_fill, rows, formatters)))
+			results.append(('{} rows, fillrows columns ({})'.format(count, mode), base, besttime(template.render, render_fill, columns, formatters)))
+	report('controller functions vs renderdata vs fillrows', results)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Compares rendering a page whose navigation menu and footer are the same on every request with and without Container.cached(), checking that both produce identical HTML.
+
+from workloads import Template, besttime, report
+from htmltemplate import FragmentCache
+
+
+kPageHTML = '''<html>
+	<body>
+		<ul node="con:nav">
+			<li node="rep:section"><a node="con:link" href="#">Section</a>
+				<ul><li node="rep:page"><a node="con:link" href="#">Page</a></li></ul>
+			</li>
+		</ul>
+		<h1 node="con:title">TITLE</h1>
+		<div node="con:footer"><a node="rep:link" href="#">Link</a></div>
+	</body>
+</html>'''
+
+
+def sitemap(sections, pages):
+	return [('Section {}'.format(i), ['Page {}.{}'.format(i, j) for j in range(pages)]) for i in range(sections)]
+
+
+def render_page(node, title, sections, cache):
+	if cache is None:
+		render_nav(node.nav, sections)
+		render_footer(node.footer, sections)
+	else:
+		node.nav.cached('nav', render_nav, sections, cache=cache)
+		node.footer.cached('footer', render_footer, sections, cache=cache)
+	node.title.text = title
+
+def render_nav(node, sections):
+	node.section.repeat(render_section, sections)
+
+def render_section(node, section):
+	name, pages = section
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+	node.page.repeat(render_link, pages)
+
+def render_link(node, name):
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+
+def render_footer(node, sections):
+	node.link.repeat(render_footerlink, sections)
+
+def render_footerlink(node, section):
+	node.text = section[0]
+	node.atts['href'] = '/' + section[0]
+
+
+if __name__ == '__main__':
+	results = []
+	for compiled in (False, True):
+		template = Template(kPageHTML, compiled=compiled)
+		mode = 'compiled' if compiled else 'walker'
+		for sections, pages in ((5, 5), (20, 20)):
+			data = sitemap(sections, pages)
+			cache = FragmentCache()
+			assert template.render(render_page, 'Home', data, None) == template.render(render_page, 'Home', data, cache)
+			results.append(('{} menu items ({})'.format(sections * (pages + 1), mode),
+					besttime(template.render, render_page, 'Home', data, None, number=100),
+					besttime(template.render, render_page, 'Home', data, cache, number=100)))
+	report('uncached vs cached fragments (per page)', results)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Compares rendering pages from a partly filled section template (as in demo8_multi_step_rendering) with and without Node.freeze(), checking that both produce identical HTML.
+
+from workloads import Template, besttime, report
+
+
+kSiteHTML = '''<html>
+	<head>
+		<title><span node="-con:sectiontitle">SECTION</span> : <span node="-con:pagetitle">PAGE</span></title>
+	</head>
+	<body>
+		<ul>
+			<li node="rep:navbaritem"><a href="" node="con:link">LINK</a>
+				<ul><li node="rep:subitem"><a href="" node="con:link">LINK</a></li></ul>
+			</li>
+		</ul>
+		<h1 node="con:pageheading">PAGE</h1>
+		<div node="-con:bodyhtml">BODY</div>
+		<div node="con:sidebar"><p node="rep:note"><b node="con:title">TITLE</b> <span node="con:body">TEXT</span></p></div>
+	</body>
+</html>'''
+
+
+def render_section(node, title, links, notes):
+	node.sectiontitle.text = title
+	node.navbaritem.repeat(render_navbaritem, links)
+	node.sidebar.note.repeat(render_note, notes)
+
+def render_navbaritem(node, link):
+	name, sublinks = link
+	node.link.atts['href'] = name
+	node.link.text = name
+	node.subitem.repeat(render_subitem, sublinks)
+
+def render_subitem(node, name):
+	node.link.atts['href'] = name
+	node.link.text = name
+
+def render_note(node, note):
+	node.title.text, node.body.text = note
+
+
+def render_pages(section, pages):
+	for title, body in pages:
+		node = section.copy()
+		node.pagetitle.text = title
+		node.pageheading.text = title
+		node.bodyhtml.html = body
+		node.render()
+
+def render_page(node, title, body):
+	node.pagetitle.text = title
+	node.pageheading.text = title
+	node.bodyhtml.html = body
+
+
+if __name__ == '__main__':
+	pages = [('Page {}'.format(i), '<p>Content for page {}</p>'.format(i)) for i in range(1000)]
+	results = []
+	for compiled in (False, True):
+		template = Template(kSiteHTML, compiled=compiled)
+		mode = 'compiled' if compiled else 'walker'
+		for size in (5, 20):
+			links = [('section{}'.format(i), ['page{}.{}'.format(i, j) for j in range(size)]) for i in range(size)]
+			notes = [('Note {}'.format(i), 'Some text') for i in range(size)]
+			section = template.copy()
+			render_section(section, 'Products', links, notes)
+			frozen = section.copy()
+			frozen.freeze('pagetitle', 'pageheading', 'bodyhtml')
+			for title, body in pages[:10]:
+				assert section.render(render_page, title, body) == frozen.render(render_page, title, body)
+			results.append(('1000 pages, {} nav links ({})'.format(size * (size + 1), mode),
+					besttime(render_pages, section, pages), besttime(render_pages, frozen, pages)))
+	report('section template vs frozen section template', results)
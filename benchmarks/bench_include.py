@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Compares composing a page from a layout and partial templates by grafting the partials' nodes onto a copy of the layout on each request with including the partials when the page template is loaded (node="inc:..."), checking that both produce identical HTML.
+
+import os, tempfile
+
+from workloads import Template, besttime, report
+from htmltemplate import TemplateLoader
+
+
+kLayoutHTML = '''<html>
+	<head><title node="con:title">TITLE</title></head>
+	<body>
+		<div node="con:header">HEADER</div>
+		<div node="con:nav">NAV</div>
+		<h1 node="con:heading">HEADING</h1>
+		<div node="con:content">CONTENT</div>
+		<div node="con:footer">FOOTER</div>
+	</body>
+</html>'''
+
+kHeaderHTML = '''<div class="header">
+	<a href="/"><img src="/logo.png" alt="Logo" /></a>
+	<form action="/search"><input type="text" name="q" /><input type="submit" value="Search" /></form>
+</div>'''
+
+kNavHTML = '''<ul class="nav">{}
+	<li><a node="con:current" href="#">PAGE</a></li>
+</ul>'''
+
+kFooterHTML = '''<div class="footer">{}
+	<p>Copyright <span node="con:year">YEAR</span></p>
+</div>'''
+
+kSiteHTML = kLayoutHTML.replace('node="con:header">HEADER', 'node="-inc:header.html">').replace(
+		'node="con:nav">NAV', 'node="-inc:nav.html">').replace('node="con:footer">FOOTER', 'node="-inc:footer.html">')
+
+
+def partials(links):
+	# The partials' HTML, with the given number of links in the navigation menu and footer.
+	items = ''.join('\n\t<li><a href="/page{0}">Page {0}</a></li>'.format(i) for i in range(links))
+	paras = ''.join('\n\t<p><a href="/info{0}">Info {0}</a></p>'.format(i) for i in range(links))
+	return {'header.html': kHeaderHTML, 'nav.html': kNavHTML.format(items), 'footer.html': kFooterHTML.format(paras)}
+
+
+def render_grafted(layout, header, nav, footer):
+	node = layout.copy()
+	node.header = header.header
+	node.nav = nav.nav
+	node.footer = footer.footer
+	render_page(node, node.nav, node.footer)
+	return node.render()
+
+def render_included(site):
+	node = site.copy()
+	render_page(node, node, node)
+	return node.render()
+
+def render_page(node, nav, footer):
+	node.title.text = node.heading.text = 'Home'
+	node.content.text = 'Welcome'
+	nav.current.text = 'Home'
+	footer.year.text = '2026'
+
+
+if __name__ == '__main__':
+	results = []
+	with tempfile.TemporaryDirectory() as dirpath:
+		for links in (10, 100):
+			html = partials(links)
+			for name in html:
+				with open(os.path.join(dirpath, name), 'w', encoding='utf-8') as f:
+					f.write(html[name])
+			with open(os.path.join(dirpath, 'site.html'), 'w', encoding='utf-8') as f:
+				f.write(kSiteHTML)
+			for compiled in (False, True):
+				mode = 'compiled' if compiled else 'walker'
+				# grafted: the partials are separate templates, whose nodes replace the layout's placeholder nodes on each request
+				templates = [Template(kLayoutHTML, compiled=compiled)] + [Template('<div node="-con:{}">{}</div>'.format(
+						name, html[name + '.html']), compiled=compiled) for name in ('header', 'nav', 'footer')]
+				# included: the layout includes the partials when it is loaded
+				site = TemplateLoader(dirpath, checkinterval=None, compiled=compiled).template('site.html')
+				assert render_grafted(*templates) == render_included(site)
+				results.append(('{} links ({})'.format(links, mode),
+						besttime(render_grafted, *templates, number=1000), besttime(render_included, site, number=1000)))
+	report('grafted partials vs included partials (per page)', results)
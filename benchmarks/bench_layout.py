@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# Compares nesting a rendered table inside a section, a page layout and a site frame by assigning each rendered string to the enclosing template's html, with assigning Node.renderfragment() results instead, checking that both produce identical HTML. The table is rendered in advance, so only the cost of nesting it is timed.
+
+import workloads
+from workloads import Template, besttime, report
+
+
+kFrameHTML = '''<html>
+	<head><title node="con:title">TITLE</title></head>
+	<body><div node="con:header">HEADER</div><div node="-con:page">PAGE</div><div node="con:footer">FOOTER</div></body>
+</html>'''
+
+kPageHTML = '''<div class="page">
+	<ul><li node="rep:link"><a node="con:link" href="#">LINK</a></li></ul>
+	<div node="-con:section">SECTION</div>
+</div>'''
+
+kSectionHTML = '''<section>
+	<h1 node="con:heading">HEADING</h1>
+	<p node="rep:para">TEXT</p>
+	<div node="-con:content">CONTENT</div>
+</section>'''
+
+
+def render_frame(node, title, page):
+	node.title.text = title
+	node.header.text = title
+	node.page.html = page
+	node.footer.text = 'Copyright'
+
+def render_page(node, links, section):
+	node.link.repeat(render_link, links)
+	node.section.html = section
+
+def render_link(node, name):
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+
+def render_section(node, heading, paras, content):
+	node.heading.text = heading
+	node.para.repeat(render_para, paras)
+	node.content.html = content
+
+def render_para(node, text):
+	node.text = text
+
+
+def renderstrings(templates, table, links, paras):
+	section, page, frame = templates
+	html = section.render(render_section, 'Clients', paras, table)
+	html = page.render(render_page, links, html)
+	return frame.render(render_frame, 'Clients', html)
+
+def renderfragments(templates, table, links, paras):
+	section, page, frame = templates
+	fragment = section.renderfragment(render_section, 'Clients', paras, table)
+	fragment = page.renderfragment(render_page, links, fragment)
+	return frame.render(render_frame, 'Clients', fragment)
+
+
+if __name__ == '__main__':
+	links = ['page{}'.format(i) for i in range(20)]
+	paras = ['Paragraph {} of some introductory text.'.format(i) for i in range(10)]
+	results = []
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		table = Template(workloads.kTableHTML, compiled=compiled)
+		templates = [Template(html, compiled=compiled) for html in (kSectionHTML, kPageHTML, kFrameHTML)]
+		for rows in (10, 1000, 10000):
+			clients = workloads.tabledata(rows)
+			tablehtml = table.render(workloads.render_table, 'Foo Co.', clients)
+			tablefragment = table.renderfragment(workloads.render_table, 'Foo Co.', clients)
+			assert renderstrings(templates, tablehtml, links, paras) == renderfragments(templates, tablefragment, links, paras)
+			results.append(('{}KB table, 3 levels ({})'.format(len(tablehtml) // 1000, mode),
+					besttime(renderstrings, templates, tablehtml, links, paras, number=20),
+					besttime(renderfragments, templates, tablefragment, links, paras, number=20)))
+	report('nesting rendered strings vs fragments (table pre-rendered)', results)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Measures the memory used by template object models with tracemalloc: the memory per node of a parsed template, and of fully populated copies of it (each of which duplicates every node).
+
+import gc, tracemalloc
+
+from workloads import Template
+
+
+def largetemplatehtml(sections):
+	return '<html><body>' + ''.join('''
+	<div class="section" node="con:section{0}">
+		<h2 node="con:title">TITLE</h2>
+		<p node="con:intro">Introduction <b node="con:name">NAME</b>, <i node="-con:date">DATE</i>.</p>
+		<ul><li node="rep:item"><a node="con:link" href="#">LINK</a></li></ul>
+		<br node="con:spacer" />
+	</div>'''.format(i) for i in range(sections)) + '\n</body></html>'
+
+
+def countnodes(node):
+	return 1 + sum(countnodes(subnode) for subnode in node)
+
+
+def touch(node):
+	# Access every sub-node, so that a copy-on-write copy duplicates all of them.
+	for subnode in node:
+		touch(subnode)
+
+
+def measure(fn):
+	# Return the result of fn() and the number of bytes it allocated that are still in use.
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	result = fn()
+	gc.collect()
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	return result, after - before
+
+
+def filledcopies(template, count):
+	copies = []
+	for _ in range(count):
+		node = template.copy()
+		touch(node)
+		copies.append(node)
+	return copies
+
+
+if __name__ == '__main__':
+	html = largetemplatehtml(1000)
+	template, parsedsize = measure(lambda: Template(html))
+	nodes = countnodes(template)
+	_, copysize = measure(lambda: filledcopies(template, 10))
+	print('tracemalloc: {} nodes'.format(nodes))
+	print('  {:<36}{:>10.1f} bytes'.format('parsed template, per node', parsedsize / nodes))
+	print('  {:<36}{:>10.1f} bytes'.format('fully copied template, per node', copysize / nodes / 10))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+# Compares Repeater.repeat with Repeater.repeatparallel on a 100,000-row, 20-column table whose cells are formatted numbers, using thread and process pools with increasing numbers of workers, and checks that all produce identical HTML. (Process pools only help on multi-core machines, and thread pools only help where rows release the GIL.)
+
+import concurrent.futures, os, sys
+
+from workloads import Template, besttime, report
+
+kColumns = 20
+
+kGridHTML = '''<table>
+	<tr node="rep:row">''' + ''.join('<td node="con:c{}">0</td>'.format(i) for i in range(kColumns)) + '''</tr>
+</table>'''
+
+
+def griddata(rows):
+	return [[(r * kColumns + c) * 1.0137 for c in range(kColumns)] for r in range(rows)]
+
+
+def render_row(node, values):
+	for i, value in enumerate(values):
+		cell = getattr(node, 'c{}'.format(i))
+		cell.text = '{:,.2f}'.format(value)
+		if value < 0:
+			cell.atts['class'] = 'negative'
+
+
+def render_serial(node, data):
+	node.row.repeat(render_row, data)
+
+
+def render_parallel(node, data, executor):
+	node.row.repeatparallel(render_row, data, executor=executor)
+
+
+if __name__ == '__main__':
+	rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+	data = griddata(rows)
+	template = Template(kGridHTML, compiled=True)
+	expected = template.render(render_serial, data)
+	results = [('repeat ({} rows)'.format(rows), besttime(template.render, render_serial, data, repeat=3))]
+	for name, cls in [('threads', concurrent.futures.ThreadPoolExecutor), ('processes', concurrent.futures.ProcessPoolExecutor)]:
+		for workers in (1, 2, 4, 8):
+			with cls(workers) as executor:
+				assert template.render(render_parallel, data, executor) == expected # also starts the workers
+				results.append(('repeatparallel ({} {})'.format(workers, name), 
+						besttime(template.render, render_parallel, data, executor, repeat=3)))
+	report('repeat vs repeatparallel ({} CPUs)'.format(os.cpu_count()), results)
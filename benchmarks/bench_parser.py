@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Compares template compilation times for each parser backend on large templates, after checking that every backend builds the same object model from the sample templates.
+
+import glob, os, re
+
+import workloads
+from workloads import Template, besttime, report
+from htmltemplate import ParseError, parserbackends
+
+
+def sampletemplates():
+	""" Get the HTML templates used by the sample scripts. """
+	templates = {}
+	for path in glob.glob(os.path.join(workloads.gSampleDir, '**', '*.html'), recursive=True):
+		with open(path, encoding='utf8') as f:
+			templates[os.path.relpath(path, workloads.gSampleDir)] = f.read()
+	for path in glob.glob(os.path.join(workloads.gSampleDir, '*.py')):
+		with open(path, encoding='utf8') as f:
+			for i, html in enumerate(re.findall(r"Template\((?:'''|\"\"\")(.*?)(?:'''|\"\"\")", f.read(), re.S)):
+				templates['{}#{}'.format(os.path.basename(path), i)] = html
+	return templates
+
+
+def dump(node):
+	""" Describe a node's structure and content, for comparing object models. """
+	out = [node.__class__.__name__, node.nodename, repr(getattr(node, '_atts', None)), repr(getattr(node, '_sep', None))]
+	content = getattr(node, '_RichContent__nodeslist', None)
+	if content is None:
+		out.append(repr(getattr(node, '_html', None)))
+	else:
+		out += [repr(item) if i % 2 == 0 else dump(item) for i, item in enumerate(content)]
+	return '(' + ' '.join(out) + ')'
+
+
+def checkequivalence():
+	for name, html in sorted(sampletemplates().items()):
+		expected = dump(Template(html))
+		for backend in parserbackends:
+			try:
+				result = dump(Template(html, parser=backend))
+			except ParseError as e: # expat only accepts well-formed XHTML
+				print('  {} ({}): {}'.format(name, backend, e))
+			else:
+				assert result == expected, '{} ({}): object model differs'.format(name, backend)
+
+
+def largetemplate(months):
+	""" Make a large template from many copies of the htmlcalendar month template. """
+	with open(os.path.join(workloads.gSampleDir, 'htmlcalendar', 'templates', 'month_template.html'), encoding='utf8') as f:
+		month = f.read()
+	return '<html>\n<body>\n{}\n</body>\n</html>'.format(
+			''.join('<div node="con:month{}">\n{}</div>\n'.format(i, month) for i in range(months)))
+
+
+if __name__ == '__main__':
+	print('checking backend equivalence...')
+	checkequivalence()
+	print()
+	rows = []
+	for months in (10, 100, 1000):
+		html = largetemplate(months)
+		rows.append(['{} KB template'.format(len(html) // 1024)] + [besttime(Template, html, parser=backend) for backend in parserbackends])
+	report('compile: ' + ' vs '.join(parserbackends), rows)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+# Compares rendering nested lists as in demo9_recursive_list (rendering each sub-list to a string and inserting it as HTML) with using Container.recurse(), for wide and for deeply nested data, checking that both produce identical HTML.
+
+import sys
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def chaindata(depth, width):
+	# A list of width items, one of which is a nested list, to the given depth.
+	data = ['item{}'.format(i) for i in range(width)]
+	for _ in range(depth - 1):
+		data = ['item{}'.format(i) for i in range(width - 1)] + [data]
+	return data
+
+
+if __name__ == '__main__':
+	sys.setrecursionlimit(50000) # each level of nesting uses several stack frames
+	results = []
+	for compiled in (False, True):
+		template = Template(workloads.kListHTML, compiled=compiled)
+		mode = 'compiled' if compiled else 'walker'
+		for label, data in (('depth 4, width 8', workloads.nesteddata(4, 8)), ('depth 6, width 6', workloads.nesteddata(6, 6)),
+				('depth 100, width 10', chaindata(100, 10)), ('depth 1000, width 10', chaindata(1000, 10)),
+				('depth 3000, width 10', chaindata(3000, 10)), ('depth 1000, width 50', chaindata(1000, 50))):
+			assert workloads.render_nestedlist(template, data) == workloads.render_recursivelist(template, data)
+			results.append(('{} ({})'.format(label, mode), besttime(workloads.render_nestedlist, template, data),
+					besttime(workloads.render_recursivelist, template, data)))
+	report('render-to-string vs recurse()', results)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+# Compares rendering the same pages again and again with render(), with Node.rendercached() using keys derived from the arguments and given by the caller, and answering conditional requests using Node.cachedetag() (i.e. a '304 Not Modified' response), checking that the cached HTML is identical.
+
+import workloads
+from workloads import Template, besttime, report
+from htmltemplate import RenderCache
+
+
+def render_tables(template, pages):
+	for title, clients in pages:
+		template.render(workloads.render_table, title, clients)
+
+def render_tablescached(template, pages, cache, keys):
+	for i, (title, clients) in enumerate(pages):
+		template.rendercached(workloads.render_table, title, clients, key=i if keys else None, cache=cache)
+
+def checketags(template, pages, cache):
+	for title, clients in pages:
+		assert template.cachedetag(workloads.render_table, title, clients, cache=cache) is not None
+
+
+def render_docs(template, pages):
+	for title, content, navlinks in pages:
+		template.render(workloads.render_docpage, title, content, navlinks)
+
+def render_docscached(template, pages, cache, keys):
+	for i, (title, content, navlinks) in enumerate(pages):
+		template.rendercached(workloads.render_docpage, title, content, navlinks, key=i if keys else None, cache=cache)
+
+
+if __name__ == '__main__':
+	pagehtml, _ = workloads.docgenhtml()
+	docpages = [(title, content, [('TOC', 'index.html')]) for name, title, content in workloads.docgenpages()]
+	results = []
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		for rows in (10, 100):
+			template = Template(workloads.kTableHTML, compiled=compiled)
+			pages = [('Page {}'.format(i), workloads.tabledata(rows)) for i in range(10)]
+			cache = RenderCache()
+			render_tablescached(template, pages, cache, False)
+			title, clients = pages[0]
+			assert template.rendercached(workloads.render_table, title, clients, cache=cache)[0] == \
+					template.render(workloads.render_table, title, clients)
+			results.append(('10 tables, {} rows ({})'.format(rows, mode), besttime(render_tables, template, pages, number=10),
+					besttime(render_tablescached, template, pages, cache, False, number=10),
+					besttime(render_tablescached, template, pages, cache, True, number=10),
+					besttime(checketags, template, pages, cache, number=10)))
+		template = Template(pagehtml, compiled=compiled)
+		cache = RenderCache()
+		render_docscached(template, docpages, cache, False)
+		results.append(('{} docgen pages ({})'.format(len(docpages), mode), besttime(render_docs, template, docpages, number=10),
+				besttime(render_docscached, template, docpages, cache, False, number=10),
+				besttime(render_docscached, template, docpages, cache, True, number=10)))
+	report('render() vs rendercached() with derived keys, given keys, and cachedetag()', results)
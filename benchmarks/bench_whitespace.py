@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# Compares rendering the sample templates as written with rendering them after Node.collapsewhitespace(), reporting the size of the rendered HTML and the bytes and static chunks removed from each template, and checking that the HTML only differs in whitespace.
+
+import re
+
+import workloads
+from workloads import Template, besttime, report
+
+
+def stripped(html):
+	return re.sub(r'[ \t\n\r\f]+', '', html)
+
+
+def compare(label, fn, templates, *args):
+	# Time fn(*templates, *args) before and after collapsing the templates' whitespace.
+	before = fn(*templates, *args)
+	stats = {'bytes': 0, 'chunks': 0}
+	t1 = besttime(fn, *templates, *args)
+	for template in templates:
+		for key, value in template.collapsewhitespace().items():
+			stats[key] += value
+	after = fn(*templates, *args)
+	t2 = besttime(fn, *templates, *args)
+	before, after = ''.join(before) if isinstance(before, list) else before, ''.join(after) if isinstance(after, list) else after
+	assert stripped(before) == stripped(after)
+	print('  {:<36}{:>9} -> {:>9} chars rendered; {} template bytes, {} chunks removed'.format(
+			label, len(before), len(after), stats['bytes'], stats['chunks']))
+	return label, t1, t2
+
+
+def render_filledtable(template, clients):
+	return template.render(workloads.render_table, 'Foo Co.', clients)
+
+
+if __name__ == '__main__':
+	clients = workloads.tabledata(1000)
+	pagehtml, tochtml = workloads.docgenhtml()
+	pages = workloads.docgenpages()
+	results = []
+	print('rendered HTML size:')
+	for compiled in (False, True):
+		mode = 'compiled' if compiled else 'walker'
+		results.append(compare('demo2_table, 1000 rows ({})'.format(mode), render_filledtable,
+				[Template(workloads.kTableHTML, compiled=compiled)], clients))
+		results.append(compare('demo9_recursive_list ({})'.format(mode), workloads.render_recursivelist,
+				[Template(workloads.kListHTML, compiled=compiled)], workloads.nesteddata(6)))
+		results.append(compare('docgen ({})'.format(mode), workloads.render_docs,
+				[Template(pagehtml, compiled=compiled), Template(tochtml, compiled=compiled)], pages))
+	htmlcalendar = workloads.calendarmodule() # its templates are module globals, compiled at import time
+	results.append(compare('htmlcalendar (compiled)', lambda *templates: workloads.render_calendar(htmlcalendar),
+			[htmlcalendar.CalendarRenderer.gTemplate, htmlcalendar.gPageTemplate]))
+	print()
+	report('as written vs collapsed whitespace', results)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+""" workloads -- templates, data and timing support shared by the benchmark scripts.
+
+Workloads are derived from the scripts in the 'sample' folder, scaled up to sizes where the cost of parsing, copying and rendering can be measured reliably.
+"""
+
+import html, os, sys, time
+
+gRootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+gSampleDir = os.path.join(gRootDir, 'sample')
+
+sys.path.insert(0, gRootDir)
+sys.path.insert(0, os.path.join(gSampleDir, 'htmlcalendar'))
+
+from htmltemplate import Template
+
+
+#################################################
+# SUPPORT
+#################################################
+
+def besttime(fn, *args, repeat=5, number=1, **kwargs):
+	""" Call a function repeatedly and return the fastest time taken, in seconds.
+	
+		fn : function -- the function to time
+		*args : any -- arguments to pass to the function
+		**kwargs : any -- keyword arguments to pass to the function
+		repeat : int -- the number of timing runs
+		number : int -- the number of calls per run
+		Result : float -- the best time for a single call
+	"""
+	best = None
+	for _ in range(repeat):
+		t = time.perf_counter()
+		for _ in range(number):
+			fn(*args, **kwargs)
+		t = (time.perf_counter() - t) / number
+		if best is None or t < best:
+			best = t
+	return best
+
+
+def report(title, rows):
+	""" Print a simple table of timings.
+	
+		title : str -- the table's title
+		rows : list of (str, float, ...) -- a label followed by one or more times in seconds
+	"""
+	print(title)
+	for label, *times in rows:
+		print('  {:<36}'.format(label) + ''.join('{:>12.2f}ms'.format(t * 1000) for t in times))
+	print()
+
+
+#################################################
+# demo2_table
+#################################################
+
+kTableHTML = '''<html>
+	<head>
+		<title node="con:title">TITLE</title>
+	</head>
+	<body>
+	
+		<table>
+			<tr node="rep:client">
+				<td node="con:name">Surname, Firstname</td>
+				<td><a node="con:email" href="mailto:client@email.com">client@email.com</a></td>
+			</tr>
+		</table>
+	
+	</body>
+</html>'''
+
+
+class Client:
+	def __init__(self, surname, firstname, email):
+		self.surname, self.firstname, self.email = surname, firstname, email
+
+
+def tabledata(rows):
+	return [Client('Smith{}'.format(i), 'K', 'ks{}@foo.com'.format(i)) for i in range(rows)]
+
+
+def render_table(node, title, clients):
+	node.title.text = title
+	node.client.repeat(render_client, clients)
+
+def render_client(node, client):
+	node.name.text = client.surname + ', ' + client.firstname
+	node.email.atts['href'] = 'mailto:' + client.email
+	node.email.text = client.email
+
+
+#################################################
+# htmlcalendar
+#################################################
+
+def calendarmodule():
+	""" Import the htmlcalendar sample, whose templates are compiled at import time. """
+	import htmlcalendar
+	return htmlcalendar
+
+
+def render_calendar(htmlcalendar, year=2014):
+	return htmlcalendar.renderyearcalendar(year)
+
+
+#################################################
+# demo9_recursive_list
+#################################################
+
+kListHTML = '''<html>
+	<ul node="con:list">
+		<li node="rep:item">...</li>
+	</ul>
+</html>'''
+
+
+def nesteddata(depth, width=4):
+	""" A list of width items, each of which is a string or, above the given depth, a nested list. """
+	if depth <= 1:
+		return ['item{}'.format(i) for i in range(width)]
+	return ['item{}'.format(i) if i % 2 else nesteddata(depth - 1, width) for i in range(width)]
+
+
+def render_nestedlist(template, data):
+	def render_item(node, dataitem):
+		if isinstance(dataitem, list):
+			listnode = template.list.copy()
+			listnode.item.repeat(render_item, dataitem)
+			node.html = listnode.render()
+		else:
+			node.text = dataitem
+	return template.render(lambda node: node.list.item.repeat(render_item, data))
+
+
+def render_recursivelist(template, data):
+	# As render_nestedlist, using Container.recurse() instead of rendering each sub-list to a string.
+	def render_list(node, datalist):
+		node.item.repeat(render_item, datalist)
+	def render_item(node, dataitem):
+		if isinstance(dataitem, list):
+			node.recurse(template.list, render_list, dataitem)
+		else:
+			node.text = dataitem
+	return template.render(lambda node: render_list(node.list, data))
+
+
+#################################################
+# docgen
+#################################################
+
+gDocgenDir = os.path.join(gSampleDir, 'docgen')
+
+
+def readfile(dirpath, name):
+	with open(os.path.join(dirpath, name), encoding='utf8') as f:
+		return f.read()
+
+
+def docgenhtml():
+	""" The HTML of the docgen sample's page and table of contents templates. """
+	templatesdir = os.path.join(gDocgenDir, 'templates')
+	return readfile(templatesdir, 'page_template.html'), readfile(templatesdir, 'toc_template.html')
+
+
+def docgenpages():
+	""" The docgen sample's pages, as (file name, title, content HTML). The Markdown source is inserted as preformatted text, as the markdown2 module that docgen uses may not be installed. """
+	sourcedir = os.path.join(gDocgenDir, 'source')
+	pages = []
+	for name in sorted(os.listdir(sourcedir)):
+		if name.endswith('.md'):
+			title, content = readfile(sourcedir, name).split('\n', 1)
+			pages.append((name[:-3] + '.html', title.strip(' #'), '<pre>{}</pre>'.format(html.escape(content))))
+	return pages
+
+
+def render_docpage(node, title, content, navlinks):
+	# As docgen.render_page.
+	node.doctitle.text, node.pagetitle1.text = 'htmltemplate', title.lower()
+	node.pagetitle2.text, node.content.html = title, content
+	node.topnav.link.repeat(render_docnavlink, navlinks)
+	node.bottomnav = node.topnav
+	node.year.text, node.author.text = '2013-2016', 'HAS'
+
+def render_docnavlink(node, link):
+	node.text, node.atts['href'] = link
+
+
+def render_docs(pagetemplate, toctemplate, pages):
+	result = [pagetemplate.render(render_docpage, 'TOC', toctemplate.render(
+			lambda node: node.chapter.repeat(render_doclink, pages)), [('Next', pages[0][0])])]
+	for i, (name, title, content) in enumerate(pages):
+		navlinks = [('Prev', pages[i - 1][0] if i else 'index.html'), ('TOC', 'index.html')]
+		if i + 1 < len(pages):
+			navlinks.append(('Next', pages[i + 1][0]))
+		result.append(pagetemplate.render(render_docpage, title, content, navlinks))
+	return result
+
+def render_doclink(node, page):
+	node.link.atts['href'], node.link.text = page[:2]
@@ -30,9 +30,9 @@ THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLI
 #
 
 
-import html, html.parser, keyword, re
+import codecs, collections, collections.abc, concurrent.futures, hashlib, html, html.parser, inspect, keyword, operator, os, pickle, re, sys, tempfile, threading, time, xml.parsers.expat, zlib
 
-__all__ = ['ParseError', 'Node', 'Template', 'encodeentity', 'decodeentity']
+__all__ = ['ParseError', 'Parser', 'Scanner', 'ExpatParser', 'parserbackends', 'Node', 'Template', 'TemplateCache', 'templatecache', 'TemplateLoader', 'FragmentCache', 'fragmentcache', 'RenderCache', 'rendercache', 'wsgiresponse', 'asgiresponse', 'profile', 'Profiler', 'Markup', 'Fragment', 'encodeentity', 'decodeentity']
 
 
 #####################################################################
@@ -57,6 +57,303 @@ def encodeentity(s):
 decodeentity = html.unescape
 
 
+class Markup(str):
+	""" A string of HTML markup. When passed to Node.bind() or Node.renderdata(), it is inserted as the node's html instead of its text. """
+	
+	__slots__ = ()
+
+##
+
+def _iterchunks(chunks):
+	# Iterate over rendered chunks, expanding any deferred chunks (objects with a _renderchunks method, e.g. the content of a Repeater with lazily rendered rows) as they are reached. Nested deferred chunks are expanded using a stack rather than recursion, so content nested to any depth (see Container.recurse) takes time proportional to the number of chunks.
+	stack = []
+	chunks = iter(chunks)
+	while True:
+		for chunk in chunks:
+			if isinstance(chunk, str):
+				yield chunk
+			else:
+				stack.append(chunks)
+				chunks = iter(chunk._renderchunks())
+				break
+		else:
+			if not stack:
+				return
+			chunks = stack.pop()
+
+
+async def _aiterchunks(chunks):
+	# Asynchronous equivalent of _iterchunks, used by Node.renderasync(), etc. Deferred chunks may include items that are rendered using asynchronous controller functions and/or iterators.
+	for chunk in chunks:
+		if isinstance(chunk, str):
+			yield chunk
+			continue
+		stack = [chunk._arenderchunks()]
+		while stack:
+			try:
+				subchunk = await stack[-1].__anext__()
+			except StopAsyncIteration:
+				stack.pop()
+				continue
+			if isinstance(subchunk, str):
+				yield subchunk
+			else:
+				stack.append(subchunk._arenderchunks())
+
+
+def _joinruns(chunks):
+	# Join each run of strings in rendered chunks, returning a list of strings alternating with deferred chunks.
+	if chunks.__class__ is not list:
+		chunks = list(chunks)
+	try:
+		return [''.join(chunks)]
+	except TypeError: # chunks contains deferred chunks
+		pass
+	result, start = [], 0
+	for i, chunk in enumerate(chunks):
+		if not isinstance(chunk, str):
+			result += [''.join(chunks[start:i]), chunk]
+			start = i + 1
+	result.append(''.join(chunks[start:]))
+	return result
+
+
+def _joinchunks(chunks):
+	# Equivalent to ''.join(_iterchunks(chunks)), but quicker when only a few of the chunks are deferred (e.g. Fragment objects), as each run of strings is joined by str.join. Used by Node.render(), etc.
+	try:
+		return ''.join(chunks)
+	except TypeError: # chunks contains deferred chunks
+		pass
+	result = []
+	stack = []
+	chunks = iter(_joinruns(chunks))
+	while True:
+		for chunk in chunks:
+			if isinstance(chunk, str):
+				result.append(chunk)
+			else:
+				stack.append(chunks)
+				subchunks = chunk._renderchunks()
+				if chunk.__class__ is not Fragment: # a Fragment's chunks are already joined into runs
+					subchunks = _joinruns(subchunks)
+				chunks = iter(subchunks)
+				break
+		else:
+			if not stack:
+				return ''.join(result)
+			chunks = stack.pop()
+
+
+def _bufferchunks(chunks, buffersize):
+	# Used by Node.renderiter() to join rendered chunks into pieces of at least buffersize characters.
+	if not buffersize:
+		for chunk in chunks:
+			if chunk:
+				yield chunk
+		return
+	buffer, size = [], 0
+	for chunk in chunks:
+		if chunk:
+			buffer.append(chunk)
+			size += len(chunk)
+			if size >= buffersize:
+				yield ''.join(buffer)
+				buffer, size = [], 0
+	if buffer:
+		yield ''.join(buffer)
+
+
+async def _abufferchunks(chunks, buffersize):
+	# Asynchronous equivalent of _bufferchunks.
+	buffer, size = [], 0
+	async for chunk in chunks:
+		if chunk:
+			buffer.append(chunk)
+			size += len(chunk)
+			if size >= buffersize:
+				yield ''.join(buffer)
+				buffer, size = [], 0
+	if buffer:
+		yield ''.join(buffer)
+
+##
+
+_kEncodedChunkSize = 512 # rendered chunks of at least this many characters are encoded once by _ChunkEncoder, then cached
+_kChunkEncoders = {} # encoding name : _ChunkEncoder
+
+
+class _ChunkEncoder:
+	""" Encodes rendered chunks to bytes for Node.renderbytes() and Node.renderiterbytes(). Long chunks are mostly the static HTML of templates (i.e. the markup between nodes, which is the same for every render), so each is encoded once and the bytes are cached; runs of shorter chunks are joined and encoded as a single string. """
+	
+	maxbytes = 32 * 1024 * 1024 # the least recently used chunks are discarded once the cached strings and their bytes exceed this total size
+	
+	def __init__(self, encoding):
+		self.encoding = encoding
+		self._encoded = _LRUCache(None, self.maxbytes) # chunk : bytes
+		self._lock = threading.Lock()
+		self._hasbom = bool(''.encode(encoding)) # e.g. UTF-16, whose byte order mark must only appear at the start of the output
+	
+	def encode(self, chunks, buffersize):
+		# Yield the encoded chunks in pieces of at least buffersize characters; if buffersize is None, yield a single piece.
+		encoding, encoded, lock = self.encoding, self._encoded, self._lock
+		if self._hasbom:
+			if buffersize is None:
+				yield ''.join(chunks).encode(encoding)
+			else:
+				encode = codecs.getincrementalencoder(encoding)().encode
+				for chunk in _bufferchunks(chunks, buffersize):
+					yield encode(chunk)
+			return
+		result, run, size = [], [], 0
+		for chunk in chunks:
+			if len(chunk) < _kEncodedChunkSize:
+				if not chunk:
+					continue
+				run.append(chunk)
+			else:
+				if run:
+					result.append(''.join(run).encode(encoding))
+					run = []
+				with lock:
+					data = encoded.get(chunk)
+				if data is None:
+					data = chunk.encode(encoding)
+					with lock:
+						encoded.set(chunk, data, sys.getsizeof(chunk) + sys.getsizeof(data))
+				result.append(data)
+			size += len(chunk)
+			if buffersize is not None and size >= buffersize:
+				if run:
+					result.append(''.join(run).encode(encoding))
+					run = []
+				yield b''.join(result)
+				result, size = [], 0
+		if run:
+			result.append(''.join(run).encode(encoding))
+		if result:
+			yield b''.join(result)
+
+
+def _chunkencoder(encoding):
+	try:
+		return _kChunkEncoders[encoding]
+	except KeyError:
+		encoder = _kChunkEncoders[encoding] = _ChunkEncoder(encoding)
+		return encoder
+
+
+##
+
+class _LRUCache:
+	""" A least-recently-used cache with optional limits on its number of entries and their total size in bytes. """
+	
+	def __init__(self, maxentries=None, maxbytes=None):
+		self.maxentries, self.maxbytes = maxentries, maxbytes
+		self._entries = collections.OrderedDict() # key : (value, size)
+		self.size = 0
+		self.hits = self.misses = self.evictions = 0
+	
+	def __len__(self):
+		return len(self._entries)
+	
+	def __contains__(self, key):
+		return key in self._entries
+	
+	def get(self, key, default=None):
+		try:
+			value = self._entries[key][0]
+		except KeyError:
+			self.misses += 1
+			return default
+		self._entries.move_to_end(key)
+		self.hits += 1
+		return value
+	
+	def set(self, key, value, size=0):
+		self.pop(key)
+		self._entries[key] = (value, size)
+		self.size += size
+		entries = self._entries
+		while entries and ((self.maxentries is not None and len(entries) > self.maxentries) 
+				or (self.maxbytes is not None and self.size > self.maxbytes)):
+			self.size -= entries.popitem(last=False)[1][1]
+			self.evictions += 1
+	
+	def pop(self, key):
+		try:
+			value, size = self._entries.pop(key)
+		except KeyError:
+			return None
+		self.size -= size
+		return value
+	
+	def clear(self):
+		self._entries.clear()
+		self.size = 0
+
+
+def _sizeof(obj, seen):
+	# Estimate the memory used by a template object model, in bytes. Objects already in the seen set (e.g. strings shared with other nodes) are not counted.
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+	size = sys.getsizeof(obj)
+	if isinstance(obj, (list, tuple)):
+		for item in obj:
+			size += _sizeof(item, seen)
+	elif isinstance(obj, dict):
+		for key, value in obj.items():
+			size += _sizeof(key, seen) + _sizeof(value, seen)
+	elif isinstance(obj, Node):
+		for name in _slotnames(obj.__class__):
+			size += _sizeof(getattr(obj, name, None), seen)
+		if hasattr(obj, '__dict__'):
+			size += _sizeof(obj.__dict__, seen)
+	return size
+
+
+##
+
+_kCompressionFormats = {'gzip': 31, 'deflate': 15} # format name : zlib wbits value ('deflate' is the zlib format, as used by HTTP's 'deflate' content coding)
+_kCompressedPrefixSize = 512 # a rendered node's first chunk is compressed once and the compressor's state reused if it is at least this many characters
+_kCompressedPrefixes = _LRUCache(64) # (chunk, format, level, encoding) : (compressor, compressed data)
+_kCompressedPrefixesLock = threading.Lock()
+
+
+def _prefixcompressor(collector, format, level, encoding):
+	# Get a compressor for Node.rendercompressed(), etc. The first rendered chunk is usually the template's leading static HTML (doctype, head, etc.), which is the same for every render, so it is compressed once and a copy of the compressor is returned in the state it was left in.
+	# Result : (compressor, compressed data, index of the first chunk still to be compressed)
+	try:
+		wbits = _kCompressionFormats[format]
+	except KeyError:
+		raise ValueError("Can't compress HTML: unknown format {!r}.".format(format)) from None
+	first = collector[0] if collector else ''
+	if not isinstance(first, str) or len(first) < _kCompressedPrefixSize or _chunkencoder(encoding)._hasbom:
+		return zlib.compressobj(level, zlib.DEFLATED, wbits), b'', 0
+	key = (first, format, level, encoding)
+	with _kCompressedPrefixesLock:
+		entry = _kCompressedPrefixes.get(key)
+	if entry is None:
+		compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+		entry = compressor, compressor.compress(first.encode(encoding))
+		with _kCompressedPrefixesLock:
+			_kCompressedPrefixes.set(key, entry)
+	return entry[0].copy(), entry[1], 1
+
+
+def _itercompressed(collector, format, level, encoding, buffersize, flush):
+	compressor, data, start = _prefixcompressor(collector, format, level, encoding)
+	if data:
+		yield data
+	for chunk in _chunkencoder(encoding).encode(_iterchunks(collector[start:]), buffersize):
+		data = compressor.compress(chunk)
+		if flush:
+			data += compressor.flush(zlib.Z_SYNC_FLUSH)
+		if data:
+			yield data
+	yield compressor.flush()
+
+
 #####################################################################
 # TEMPLATE PARSER
 #####################################################################
@@ -68,11 +365,12 @@ class ParseError(Exception):
 
 
 class ElementCollector:
-	""" Used by Parser to assemble individual HTML elements. """
+	""" Used by Builder to assemble individual HTML elements. """
 
 	def __init__(self, *args):
 		self.nodetype, self.nodename, self.tagname, self.atts, self.isempty, self.omittags, self.shoulddelete = args
-		self.content = ['']
+		self.content = [] # alternating text, node, text, node, ...
+		self.text = [] # text added since the last sub-node; joined once the next sub-node is added or the element is complete
 		self.elementnames = {}
 		self.__depth = 1
 	
@@ -86,73 +384,104 @@ class ElementCollector:
 		return self.__depth < 1
 		
 	def addtext(self, txt):
-		self.content[-1] += txt
+		self.text.append(txt)
 		
 	def addelement(self, node, nodetype, nodename):
-		self.content.extend([node, ''])
+		self.content.extend([''.join(self.text), node])
+		self.text = []
 		self.elementnames[nodename] = nodetype
+	
+	def finish(self):
+		self.content.append(''.join(self.text))
+		self.text = []
+		return self.content
 
 
-class Parser(html.parser.HTMLParser):
-	""" Parses an HTML document, converting elements tagged with special 'node' attributes (e.g. node="con:foo") to template nodes. Called by Template.__init__(). 
+class Builder:
+	""" Abstract base class for template parsers. Converts a stream of parse events into template content, converting elements tagged with special 'node' attributes (e.g. node="con:foo") to template nodes.
+	
+		Parser backends subclass Builder and implement feed(html) and close() methods that tokenize the template HTML, calling _starttag, _endtag and _addtext for each tag and run of text found. Template.__init__() then calls result() to obtain the parsed content.
+		
+		Elements tagged with include directives (e.g. node="inc:nav.html") are replaced with the content of the named template, which is obtained from the function given as Template.__init__()'s include argument. The included template's static HTML is merged with the surrounding HTML and copies of its sub-nodes are added in its place, so included templates cost nothing extra to render.
 	"""
 
-	__specialattvaluepattern = re.compile('(-)?(con|rep|sep|del):(.*)')
+	__specialattvaluepattern = re.compile('(-)?(con|rep|sep|del|inc):(.*)')
 	__validnodenamepattern = re.compile('[a-zA-Z][_a-zA-Z0-9]*')
 	
 	# List of words already used as property and method names, so cannot be used as template node names as well:
 	__invalidnodenames = set(keyword.kwlist).union({'nodetype', 'nodename', 
-			'text', 'html', 'atts', 'omittags', 'omit', 'add', 'repeat', 'copy', 'render', 'structure', 'separator'})
+			'text', 'html', 'atts', 'omittags', 'omit', 'add', 'repeat', 'copy', 'render', 'structure', 'separator', 
+			'compile', 'load', 'renderiter', 'renderto', 'repeatlazy', 
+			'renderasync', 'renderiterasync', 'renderstream', 'addasync', 'repeatasync', 'repeatparallel', 
+			'bind', 'renderdata', 'fillrows', 'cached', 'freeze', 'renderbytes', 'renderiterbytes', 'recurse', 'renderfragment', 
+			'collapsewhitespace', 'rendercompressed', 'renderitercompressed', 
+			'rendercached', 'renderitercached', 'cachedetag'})
+	
+	_include = None # set by Template.__init__(); function that takes the name given in an include directive and returns the Template to include
 	
 	##
 	
 	def __init__(self, attribute, encode, isxhtml):
-		html.parser.HTMLParser.__init__(self)
-		self.__specialattributename = attribute
+		self._specialattributename = attribute
 		self._encode = encode
-		self.__outputstack = [ElementCollector('tem', '', None, None, False, False, False)]
+		self._outputstack = [ElementCollector('tem', '', None, None, False, False, False)]
 		self.__emptytagclose = ' />' if isxhtml else '>'
 		self.__emptytagformat = '<{}{{}} />' if isxhtml else '<{}{{}}>'
 	
-	def __isspecialtag(self, atts, specialattname):
+	def __isspecialtag(self, atts):
+		specialattname = self._specialattributename
 		for name, value in atts:
 			if name == specialattname:
-				value = self.__specialattvaluepattern.match(value)
+				value = self.__specialattvaluepattern.match(value or '')
 				if value:
 					atts = dict(atts)
 					del atts[specialattname]
 					omittags, nodetype, nodename = value.groups()
 					return True, nodetype, nodename, omittags, atts
-		return False, '', '', False, _renderatts(atts)
+		return False, '', '', False, atts
 	
-	def __starttag(self, tagname, atts, isempty):
-		node = self.__outputstack[-1]
-		if node.shoulddelete:
-			isspecial = 0
+	def _starttag(self, tagname, atts, isempty, raw=None):
+		""" Process a start tag.
+		
+			tagname : str -- the tag's name, in lowercase
+			atts : list of (str, str | None) | None -- the tag's attributes, where attribute values are not HTML-decoded; or None if the backend has already determined the tag has no directive attribute
+			isempty : bool -- True if the tag is an empty element tag (e.g. <br />), in which case _endtag must be called immediately after
+			raw : str | None -- the tag's source text; if given, this is used as-is when the tag isn't a template node, else the tag is re-rendered from its name and attributes
+		"""
+		node = self._outputstack[-1]
+		if node.shoulddelete or atts is None:
+			isspecial = False
 		else:
-			isspecial, nodetype, nodename, omittags, atts = self.__isspecialtag(atts, self. __specialattributename)
+			isspecial, nodetype, nodename, omittags, atts = self.__isspecialtag(atts)
 		if isspecial:
-			if nodetype != 'del' and \
+			if nodetype == 'inc':
+				if not nodename:
+					raise ParseError("Can't include template: no template name given.")
+			elif nodetype != 'del' and \
 					(not self.__validnodenamepattern.match(nodename) or nodename in self.__invalidnodenames):
 				raise ParseError("Invalid node name: {!r}".format(nodename))
-			if nodename in node.elementnames and nodetype != 'sep':
+			if nodename in node.elementnames and nodetype not in ('sep', 'inc'):
 				raise ParseError("Duplicate node name: {!r}.".format(nodename))
-			self.__outputstack.append(
+			self._outputstack.append(
 					ElementCollector(nodetype, nodename, tagname, atts, isempty, omittags, nodetype == 'del'))
 		else:
 			if node.tagname == tagname:
 				node.incdepth()
 			if not node.shoulddelete:
-				node.addtext('<' + tagname + atts + (self.__emptytagclose if isempty else '>'))
+				if raw is None:
+					raw = '<' + tagname + (_renderatts(atts) if atts else '') + (self.__emptytagclose if isempty else '>')
+				node.addtext(raw)
 	
 	def __hascompletedelement(self, element, parent):
-		content = [] if element.isempty else element.content
+		content = [] if element.isempty else element.finish()
 		if element.nodetype in ['con', 'rep']:
 			node = _kNodeClasses[element.nodetype][min(len(content), 2)](
 					element.nodename, element.tagname, element.atts, content, self.__emptytagformat, self._encode)
 			if element.omittags:
 				node.omittags()
 			parent.addelement(node, element.nodetype, element.nodename)
+		elif element.nodetype == 'inc':
+			self.__includetemplate(element, content, parent)
 		else: # element.nodetype == 'sep'
 			# Add this separator to its repeater
 			for node in parent.content[1::2]:
@@ -171,65 +500,264 @@ class Parser(html.parser.HTMLParser):
 					"Can't process separator node 'sep:{}' in node '{}:{}': repeater node 'rep:{}' wasn't found." 
 					.format(element.nodename, parent.nodetype, parent.nodename, element.nodename))
 	
-	def __endtag(self, tagname, isempty):
-		node = self.__outputstack[-1]
+	def __includetemplate(self, element, content, parent):
+		# Replace an include element with the named template's content. Any nodes defined within the element replace the included template's top-level nodes of the same name.
+		if self._include is None:
+			raise ParseError("Can't include template {!r}: no include function was given.".format(element.nodename))
+		L = self._include(element.nodename)._RichContent__nodeslist
+		overrides = {node._nodename: node for node in content[1::2]}
+		if not element.omittags:
+			parent.addtext('<{}{}>'.format(element.tagname, _renderatts(element.atts.items())))
+		parent.addtext(L[0])
+		for i in range(1, len(L), 2):
+			name = L[i]._nodename
+			if name in parent.elementnames:
+				raise ParseError("Duplicate node name: {!r} (included from template {!r}).".format(name, element.nodename))
+			node = overrides.pop(name) if name in overrides else L[i].copy()
+			parent.addelement(node, node._nodetype, name)
+			parent.addtext(L[i + 1])
+		if not element.omittags:
+			parent.addtext('</{}>'.format(element.tagname))
+		if overrides:
+			raise ParseError("Can't include template {!r}: it has no node named {!r} to replace."
+					.format(element.nodename, next(iter(overrides))))
+	
+	def _endtag(self, tagname, isempty, raw=None):
+		""" Process an end tag.
+		
+			tagname : str -- the tag's name, in lowercase
+			isempty : bool -- True if this closes an empty element tag
+			raw : str | None -- the tag's source text; if None, the tag is re-rendered from its name
+		"""
+		node = self._outputstack[-1]
 		if node.tagname == tagname:
 			node.decdepth()
 		if node.iscomplete():
-			self.__outputstack.pop()
+			self._outputstack.pop()
 			if not node.shoulddelete:
-				parent = self.__outputstack[-1]
+				parent = self._outputstack[-1]
 				self.__hascompletedelement(node, parent)
 		elif not isempty:
-			node.addtext('</{}>'.format(tagname))
+			node.addtext('</{}>'.format(tagname) if raw is None else raw)
 
-	def __addtext(self, txt):
-		self.__outputstack[-1].addtext(txt)
+	def _addtext(self, txt):
+		""" Process a run of text, comments, declarations, etc. that is copied as-is. """
+		self._outputstack[-1].addtext(txt)
 	
 	##
 	
-	def unescape(self, s):
-		# Override HTMLParser.unescape() to prevent HTML entities in attributes being decoded during parsing; Attributes instances will encode/decode attribute entities as and when needed.
-		return s
+	def result(self):
+		element = self._outputstack.pop()
+		if element.nodetype != 'tem':
+			raise ParseError("Can't compile template: node '{}:{}' is not correctly closed."
+					.format(element.nodetype, element.nodename))
+		return element.finish()
+
+
+class Parser(Builder, html.parser.HTMLParser):
+	""" Parses an HTML document using Python's standard html.parser module. This is the default parser backend, and the most tolerant of malformed HTML. Tags and attributes outside of template nodes are normalized: tag and attribute names are lowercased, attribute values are double-quoted, and empty element tags are written according to the template's isxhtml setting.
+	"""
+	
+	def __init__(self, attribute, encode, isxhtml):
+		html.parser.HTMLParser.__init__(self, convert_charrefs=False)
+		Builder.__init__(self, attribute, encode, isxhtml)
+	
+	def __rawatts(self, atts):
+		# HTMLParser decodes HTML entities in attribute values, but template nodes keep them encoded, so re-read the values from the tag's source text. (This is the same loop as HTMLParser.parse_starttag(), minus the decoding.)
+		text = self.get_starttag_text()
+		if '&' not in text:
+			return atts
+		atts = []
+		k = html.parser.tagfind_tolerant.match(text, 1).end()
+		while k < len(text):
+			m = html.parser.attrfind_tolerant.match(text, k)
+			if not m:
+				break
+			attrname, rest, attrvalue = m.group(1, 2, 3)
+			if not rest:
+				attrvalue = None
+			elif attrvalue[:1] == '\'' == attrvalue[-1:] or attrvalue[:1] == '"' == attrvalue[-1:]:
+				attrvalue = attrvalue[1:-1]
+			atts.append((attrname.lower(), attrvalue))
+			k = m.end()
+		return atts
 	
 	# event handlers
 
 	def handle_startendtag(self, tagname, atts):
-		self.__starttag(tagname, atts, True)
-		self.__endtag(tagname, True)
+		self._starttag(tagname, self.__rawatts(atts), True)
+		self._endtag(tagname, True)
 
 	def handle_starttag(self, tagname, atts):
-		self.__starttag(tagname, atts, False)
+		self._starttag(tagname, self.__rawatts(atts), False)
 
 	def handle_endtag(self, tagname):
-		self.__endtag(tagname, False)
+		self._endtag(tagname, False)
 
 	def handle_charref(self, txt):
-		self.__addtext('&#{};'.format(txt))
+		self._addtext('&#{};'.format(txt))
 
 	def handle_entityref(self, txt):
-		self.__addtext('&{};'.format(txt))
+		self._addtext('&{};'.format(txt))
 
 	def handle_data(self, txt):
-		self.__addtext(txt)
+		self._addtext(txt)
 
 	def handle_comment(self, txt):
-		self.__addtext('<!--{}-->'.format(txt))
+		self._addtext('<!--{}-->'.format(txt))
 
 	def handle_decl(self, txt):
-		self.__addtext('<!{}>'.format(txt))
+		self._addtext('<!{}>'.format(txt))
+	
+	def unknown_decl(self, txt): # marked section, e.g. CDATA
+		self._addtext(('<![{}]]>' if txt.startswith('CDATA[') else '<![{}]>').format(txt))
+
+	def handle_pi(self, txt): # note: txt includes the trailing '?' of XML-style processing instructions
+		self._addtext('<?{}>'.format(txt))
+
+
+##
 
-	def handle_pi(self, txt):
-		self.__addtext('<?{}?>'.format(txt))
+_kTagPattern = r'''<([a-zA-Z][^\s/>]*)((?:\s+[^\s/>"'=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?)*)\s*(/?)>'''
+
+_kTokenPattern = re.compile(r'''<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>|<\?.*?>|</([a-zA-Z][^\s/>]*)\s*>|''' + _kTagPattern, re.S) # groups: end tag name, start tag name, attributes, empty tag slash
+
+_kAttributePattern = re.compile(r'''([^\s/>"'=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?''')
+
+def _parseatts(text):
+	# Parse a start tag's attributes without decoding HTML entities.
+	atts = []
+	for name, value in _kAttributePattern.findall(text):
+		if not value:
+			value = None
+		elif value[0] in '"\'':
+			value = value[1:-1]
+		atts.append((name.lower(), value))
+	return atts
+
+
+class Scanner(Builder):
+	""" A fast parser backend for well-formed templates. Only tags whose text contains the directive attribute's name are fully parsed; all other markup is copied through as-is, without normalization. (This means that, unlike the default Parser, markup outside of template nodes is not affected by the isxhtml setting.)
+	"""
 	
-	##
+	__tokenpattern = _kTokenPattern
+	__rawtextendpatterns = {name: re.compile('</' + name, re.I) for name in ('script', 'style')} # the content of these elements is skipped up to the end tag
 	
-	def result(self):
-		element = self.__outputstack.pop()
-		if element.nodetype != 'tem':
-			raise ParseError("Can't compile template: node '{}:{}' is not correctly closed."
-					.format(element.nodetype, element.nodename))
-		return element.content
+	def __init__(self, attribute, encode, isxhtml):
+		Builder.__init__(self, attribute, encode, isxhtml)
+		self.__html = []
+	
+	def feed(self, html):
+		self.__html.append(html)
+	
+	def close(self):
+		html = ''.join(self.__html)
+		search = self.__tokenpattern.search
+		specialattributename = self._specialattributename
+		outputstack = self._outputstack
+		pos = start = 0 # start is the beginning of any text not yet passed to _addtext
+		while True:
+			m = search(html, pos)
+			if not m:
+				break
+			pos = m.end()
+			endtagname, tagname, atts, isempty = m.groups()
+			if tagname:
+				tagname = tagname.lower()
+				isspecial = specialattributename in atts
+				if isspecial or tagname == outputstack[-1].tagname:
+					if start < m.start():
+						self._addtext(html[start:m.start()])
+					self._starttag(tagname, _parseatts(atts) if isspecial else None, bool(isempty), m.group())
+					if isempty:
+						self._endtag(tagname, True)
+					start = pos
+				if tagname in self.__rawtextendpatterns and not isempty:
+					m = self.__rawtextendpatterns[tagname].search(html, pos)
+					pos = m.start() if m else len(html)
+			elif endtagname:
+				endtagname = endtagname.lower()
+				if endtagname == outputstack[-1].tagname:
+					if start < m.start():
+						self._addtext(html[start:m.start()])
+					self._endtag(endtagname, False, m.group())
+					start = pos
+		if start < len(html):
+			self._addtext(html[start:])
+
+
+class ExpatParser(Builder):
+	""" A parser backend for well-formed XHTML templates, using Python's standard xml.parsers.expat module. A ParseError is raised if the template is not well-formed XML. HTML entities such as &nbsp; are allowed, unless the template has a DOCTYPE declaration without an external identifier (e.g. <!DOCTYPE html>). As with Scanner, markup outside of template nodes is copied through as-is.
+	"""
+	
+	__tagpattern = re.compile(_kTagPattern.encode('ascii'))
+	__xmldeclpattern = re.compile(r'<\?xml.*?\?>', re.S)
+	__prologpattern = re.compile(r'\s*(?:(?:<!--.*?-->|<\?.*?\?>|<!DOCTYPE[^[>]*(?:\[.*?\])?\s*>)\s*)*', re.S)
+	__root = 'htmltemplate-root' # the template HTML is wrapped in this element as it may have more than one top-level element
+	
+	def __init__(self, attribute, encode, isxhtml):
+		Builder.__init__(self, attribute, encode, isxhtml)
+		self.__html = []
+		self.__isempty = []
+	
+	def feed(self, html):
+		self.__html.append(html)
+	
+	def close(self):
+		html = ''.join(self.__html)
+		m = self.__xmldeclpattern.match(html)
+		i = m.end() if m else 0
+		j = self.__prologpattern.match(html, i).end()
+		if '<!DOCTYPE' in html[i:j]:
+			doctype = ''
+		else: # expat only allows undefined entities (&nbsp;, etc.) in documents with an external DTD, so declare one; this is not copied to the output
+			doctype = '<!DOCTYPE {} SYSTEM "">'.format(self.__root)
+		self.__skip = (len(html[:i].encode('utf-8')), len((html[:i] + doctype).encode('utf-8')))
+		self.__data = data = (html[:i] + doctype + html[i:j] + '<{}>'.format(self.__root) + html[j:] 
+				+ '</{}>'.format(self.__root)).encode('utf-8')
+		self.__parser = parser = xml.parsers.expat.ParserCreate('utf-8')
+		parser.SetParamEntityParsing(xml.parsers.expat.XML_PARAM_ENTITY_PARSING_UNLESS_STANDALONE)
+		parser.ExternalEntityRefHandler = lambda *args: 1 # don't load the external DTD, so undefined entities are skipped
+		parser.SkippedEntityHandler = self.__skippedentity
+		parser.StartElementHandler = self.__starttag
+		parser.EndElementHandler = self.__endtag
+		parser.DefaultHandler = self.__default # with no other handlers defined, text, entity/character references, comments, etc. are all passed here unchanged
+		try:
+			parser.Parse(data, True)
+		except xml.parsers.expat.ExpatError as e:
+			raise ParseError("Can't parse template: {}".format(e)) from e
+	
+	def __default(self, txt):
+		i = self.__parser.CurrentByteIndex
+		if i >= self.__skip[1]: # past the DOCTYPE declaration (if any) that was added by close()
+			self.__parser.DefaultHandler = self._addtext
+			self._addtext(txt)
+		elif i < self.__skip[0]:
+			self._addtext(txt)
+	
+	def __starttag(self, tagname, atts):
+		if tagname == self.__root:
+			return
+		m = self.__tagpattern.match(self.__data, self.__parser.CurrentByteIndex)
+		isempty = bool(m.group(3))
+		self.__isempty.append(isempty)
+		self._starttag(tagname.lower(), _parseatts(m.group(2).decode('utf-8')) if self._specialattributename in atts else None, 
+				isempty, m.group().decode('utf-8'))
+	
+	def __endtag(self, tagname):
+		if tagname == self.__root:
+			return
+		if self.__isempty.pop():
+			self._endtag(tagname.lower(), True)
+		else:
+			i = self.__parser.CurrentByteIndex
+			self._endtag(tagname.lower(), False, self.__data[i:self.__data.index(b'>', i) + 1].decode('utf-8'))
+	
+	def __skippedentity(self, name, isparameterentity):
+		self._addtext('&{};'.format(name))
+
+
+parserbackends = {'htmlparser': Parser, 'scanner': Scanner, 'expat': ExpatParser}
 
 
 #####################################################################
@@ -237,12 +765,72 @@ class Parser(html.parser.HTMLParser):
 #####################################################################
 
 
-class CloneNode:
+# Nodes store their state in __slots__ to minimize memory use, so are cloned by copying each slot. The clone function for each node class is generated on first use. Each class's slot names and clone function are stored on the class itself (see Node._cachedslotnames and Node._cachedclonefunction) rather than in a dict keyed by class, so that they don't keep generated classes (e.g. compiled classes evicted from _kCompiledClasses) alive.
+
+
+def _slotnames(cls):
+	# Get the (mangled) names of all the slots defined by a class and its base classes.
+	owner, names = cls._cachedslotnames
+	if owner is cls:
+		return names
+	names = []
+	for c in cls.__mro__:
+		slots = c.__dict__.get('__slots__', ())
+		for name in ((slots,) if isinstance(slots, str) else slots):
+			if name.startswith('__') and not name.endswith('__'):
+				name = '_' + c.__name__.lstrip('_') + name
+			if name not in ('__dict__', '__weakref__') and name not in names:
+				names.append(name)
+	cls._cachedslotnames = (cls, names)
+	return names
+
+
+def _clonenode(node):
 	""" Used to clone existing nodes; cheaper and more precise than using Python's standard copy/deepcopy functions. """
-	
-	def __init__(self, node):
-		self.__dict__ = node.__dict__.copy()
-		self.__class__ = node.__class__
+	cls = node.__class__
+	owner, clone = cls._cachedclonefunction
+	if owner is not cls:
+		clone = _clonefunction(cls)
+	return clone(node)
+
+
+def _clonefunction(cls):
+	# Get the clone function for a node class.
+	owner, clone = cls._cachedclonefunction
+	if owner is not cls:
+		clone = _makeclonefunction(cls)
+		cls._cachedclonefunction = (cls, clone)
+	return clone
+
+
+def _makeclonefunction(cls):
+	names = _slotnames(cls)
+	newcls = cls
+	if cls.__setattr__ is not object.__setattr__:
+		# e.g. RichContent, whose __setattr__ would intercept the slot assignments; instead, the clone is created as an instance of a subclass with the same layout that doesn't override __setattr__, then its class is changed
+		newcls = type(cls.__name__, (cls,), {'__slots__': (), '__setattr__': object.__setattr__})
+	out = ['def clone(self):',
+			'\tnode = new(newcls)',
+			'\ttry:'] + ['\t\tnode.{0} = self.{0}'.format(name) for name in names] + [
+			'\texcept AttributeError: # one or more slots are unset',
+			'\t\t_copyslots(self, node, names)']
+	if cls.__dictoffset__: # instances also have a __dict__ (e.g. attributes set by the user), which is only copied if it isn't empty so that clones don't all get a dict of their own
+		out += ['\tif self.__dict__:',
+				'\t\tnode.__dict__.update(self.__dict__)']
+	if newcls is not cls:
+		out.append('\tnode.__class__ = cls')
+	out.append('\treturn node')
+	namespace = {'new': object.__new__, 'cls': cls, 'newcls': newcls, 'names': names, '_copyslots': _copyslots}
+	exec(compile('\n'.join(out) + '\n', '<htmltemplate: clone {}>'.format(cls.__name__), 'exec'), namespace)
+	return namespace['clone']
+
+
+def _copyslots(fromnode, tonode, names):
+	for name in names:
+		try:
+			object.__setattr__(tonode, name, object.__getattribute__(fromnode, name))
+		except AttributeError:
+			pass
 
 
 #####################################################################
@@ -255,8 +843,16 @@ class Node:
 		Notes:
 		
 		- If implementing custom node classes, these must also inherit from Node otherwise RichContent.__setattr__ will raise a TypeError when the user tries to replace an existing node with the custom one.
+		
+		- Node classes store their state in __slots__. The concrete classes also have a '__dict__' slot, so nodes still accept arbitrary attributes (e.g. data stored by the user). Custom node classes should also define __slots__ to get the same memory savings; the mixin classes' slots are defined by the concrete classes, as a class can't inherit non-empty __slots__ from more than one base class.
 	"""
 	
+	__slots__ = ('_nodename', '_encode')
+	
+	# (class, value) pairs, set on each class by _slotnames() and _clonenode() on first use; a subclass inherits its base class's pair until it gets its own
+	_cachedslotnames = (None, None)
+	_cachedclonefunction = (None, None)
+	
 	nodetype = property(lambda self:self._nodetype, doc="str -- The node's type (e.g. 'con').")
 	nodename = property(lambda self:self._nodename, doc="str -- The node's name.")
 	
@@ -292,17 +888,265 @@ class Node:
 			fn(self, *args, **kwargs)
 		collector = []
 		self._render(collector)
-		return ''.join(collector)
+		return _joinchunks(collector)
+	
+	def renderfragment(self, fn=None, *args, lazy=False, **kwargs):
+		""" Render this node as a Fragment, which can be inserted into other nodes by assigning it to their html property. Unlike rendering this node and assigning the resulting string, the fragment's HTML is not copied again into the HTML of each node that contains it, so templates can be nested to any depth in time proportional to the total size of their HTML.
+			
+			fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function
+			lazy : bool -- if True, the node is not rendered (and fn is not called) until the node that contains the fragment is rendered, and is rendered again each time; fn may then be a coroutine function, in which case that node must be rendered using renderasync(), renderiterasync() or renderstream(); note that this argument is not passed to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : Fragment -- the rendered HTML
+		"""
+		if lazy:
+			return _LazyFragment(self.copy(), fn, args, kwargs)
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		return Fragment(collector)
+	
+	def renderiter(self, fn=None, *args, buffersize=8192, **kwargs):
+		""" Render this node as a sequence of text chunks. Unlike render(), the complete HTML is never assembled into a single string, and the first chunk is available as soon as it has been rendered.
+			
+			fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function
+			buffersize : int -- the minimum size of each chunk, in characters (the last chunk may be shorter); if 0, rendered chunks are yielded as-is; note that this argument is not passed to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : iterator of str -- the generated HTML
+		"""
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		return _bufferchunks(_iterchunks(collector), buffersize)
+	
+	def renderto(self, fileobj, fn=None, *args, buffersize=8192, **kwargs):
+		""" Render this node, writing the HTML to a file-like object in chunks of buffersize characters. See renderiter() for details.
+			
+			fileobj : file -- a text file, or other object with a write(str) method
+		"""
+		write = fileobj.write
+		for chunk in self.renderiter(fn, *args, buffersize=buffersize, **kwargs):
+			write(chunk)
+	
+	def renderbytes(self, fn=None, *args, encoding='utf-8', **kwargs):
+		""" Render this node as encoded text. This is the same as render(), followed by encoding the HTML, except that the template's static HTML is only encoded the first time it is rendered.
+			
+			fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function
+			encoding : str -- the encoding used to convert the HTML to bytes; note that this argument is not passed to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : bytes -- the generated HTML
+		"""
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		try:
+			length = sum(map(len, collector))
+		except TypeError: # collector contains deferred chunks
+			return b''.join(_chunkencoder(encoding).encode(_iterchunks(collector), None))
+		if length < 65536 or length < len(collector) * 64: # small pages, and pages of mostly short chunks (e.g. table cells), are quicker to join then encode all at once
+			return ''.join(collector).encode(encoding)
+		return b''.join(_chunkencoder(encoding).encode(collector, None))
+	
+	def renderiterbytes(self, fn=None, *args, buffersize=8192, encoding='utf-8', **kwargs):
+		""" Render this node as a sequence of encoded text chunks. See renderiter() and renderbytes() for details.
+			
+			Result : iterator of bytes -- the generated HTML
+		"""
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		return _chunkencoder(encoding).encode(_iterchunks(collector), buffersize)
+	
+	def rendercompressed(self, fn=None, *args, format='gzip', level=6, encoding='utf-8', **kwargs):
+		""" Render this node as compressed, encoded text. This is the same as compressing the output of renderbytes(), except that when the HTML starts with a long run of static HTML (e.g. the doctype and head of a page), that is only compressed the first time it is rendered.
+			
+			fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function
+			format : str -- the compressed data format: 'gzip' or 'deflate' (i.e. zlib, as used by HTTP's 'deflate' content coding); note that this argument is not passed to the function
+			level : int -- the compression level, from 0 (no compression) to 9 (best), or -1 for zlib's default; note that this argument is not passed to the function
+			encoding : str -- the encoding used to convert the HTML to bytes; note that this argument is not passed to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : bytes -- the compressed HTML
+		"""
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		compressor, data, start = _prefixcompressor(collector, format, level, encoding)
+		return data + compressor.compress(_joinchunks(collector[start:]).encode(encoding)) + compressor.flush()
+	
+	def renderitercompressed(self, fn=None, *args, format='gzip', level=6, buffersize=8192, encoding='utf-8', flush=False, **kwargs):
+		""" Render this node as a sequence of compressed, encoded chunks. The HTML is compressed as it is rendered, buffersize characters at a time. See renderiter() and rendercompressed() for details.
+			
+			flush : bool -- if True, the compressor is flushed after each buffersize characters, so that the client can display the page as it is received, at the cost of a slightly larger response; if False, chunks are only yielded when the compressor produces output; note that this argument is not passed to the function
+			Result : iterator of bytes -- the compressed HTML
+		"""
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		return _itercompressed(collector, format, level, encoding, buffersize, flush)
+	
+	def rendercached(self, fn=None, *args, key=None, cache=None, ttl=None, encoding='utf-8', **kwargs):
+		""" Render this node using a render cache. If the cache contains HTML for this node, function and key, that HTML is returned without calling fn; otherwise this is the same as render(), and the HTML is added to the cache. This is used for pages that are rendered from the same data again and again, e.g. a catalogue page or a calendar month.
+			
+			fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function
+			key : any -- a hashable value that identifies the content that fn inserts; if None, a key is derived from the args and kwargs, which must then be picklable; note that this argument is not passed to the function
+			cache : RenderCache | None -- the cache to use; if None, the shared rendercache is used; note that this argument is not passed to the function
+			ttl : float | None -- the number of seconds for which newly rendered HTML is cached; if None, the cache's default is used; note that this argument is not passed to the function
+			encoding : str -- the encoding of the response, from which the ETag is calculated; note that this argument is not passed to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : tuple of (str, str) -- the generated HTML and its strong ETag, including the double quotes
+		"""
+		if cache is None:
+			cache = rendercache
+		key = _rendercachekey(self, fn, key, args, kwargs, encoding)
+		entry = cache.get(key)
+		if entry is None:
+			html = self.render(fn, *args, **kwargs)
+			entry = html, _etag(html.encode(encoding))
+			cache.set(key, *entry, ttl=ttl)
+		return entry
+	
+	def renderitercached(self, fn=None, *args, key=None, cache=None, ttl=None, buffersize=8192, encoding='utf-8', **kwargs):
+		""" Render this node as a sequence of text chunks using a render cache. See renderiter() and rendercached() for details. If the HTML isn't cached, its ETag is calculated as it is rendered, and the HTML and ETag are added to the cache once the last chunk has been rendered.
+			
+			Result : tuple of (str | None, iterator of str) -- the cached HTML's ETag, or None if it is being rendered; and the generated HTML
+		"""
+		if cache is None:
+			cache = rendercache
+		key = _rendercachekey(self, fn, key, args, kwargs, encoding)
+		entry = cache.get(key)
+		if entry is not None:
+			return entry[1], iter([entry[0]])
+		if fn:
+			self = self.copy()
+			fn(self, *args, **kwargs)
+		collector = []
+		self._render(collector)
+		return None, _itercached(collector, cache, key, ttl, buffersize, encoding)
+	
+	def cachedetag(self, fn=None, *args, key=None, cache=None, encoding='utf-8', **kwargs):
+		""" Get the ETag of the HTML that rendercached() would return for the same arguments, if it is cached. This allows a request whose If-None-Match header matches the ETag to be answered with '304 Not Modified' without rendering the page. fn is not called.
+			
+			Result : str | None -- the strong ETag, or None if the HTML isn't cached
+		"""
+		if cache is None:
+			cache = rendercache
+		entry = cache.get(_rendercachekey(self, fn, key, args, kwargs, encoding))
+		return None if entry is None else entry[1]
+	
+	async def renderasync(self, fn=None, *args, **kwargs):
+		""" Render this node as text. This coroutine is the same as render(), except that the function may be a coroutine function, and repeaters may include items added by Repeater.repeatlazy() using asynchronous functions and/or iterators.
+			
+			fn : function | coroutine function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the current node is rendered as-is
+			*args : any -- any additional arguments to pass to the function (e.g. the data to insert)
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : str -- the generated HTML
+		"""
+		if fn:
+			self = self.copy()
+			result = fn(self, *args, **kwargs)
+			if inspect.isawaitable(result):
+				await result
+		collector = []
+		self._render(collector)
+		try:
+			return ''.join(collector)
+		except TypeError: # collector contains deferred chunks
+			return ''.join([chunk async for chunk in _aiterchunks(collector)])
+	
+	async def renderiterasync(self, fn=None, *args, buffersize=8192, **kwargs):
+		""" Render this node as an asynchronous sequence of text chunks. See renderiter() and renderasync() for details.
+			
+			Result : asynchronous iterator of str -- the generated HTML
+		"""
+		if fn:
+			self = self.copy()
+			result = fn(self, *args, **kwargs)
+			if inspect.isawaitable(result):
+				await result
+		collector = []
+		self._render(collector)
+		async for chunk in _abufferchunks(_aiterchunks(collector), buffersize or 1):
+			yield chunk
+	
+	async def renderstream(self, writer, fn=None, *args, buffersize=8192, encoding='utf-8', **kwargs):
+		""" Render this node, writing the HTML to an asyncio.StreamWriter in chunks of buffersize characters. The writer is drained after each chunk is written, so rendering is paused while the client is slow to receive the data. See renderiter() and renderasync() for details.
+			
+			writer : asyncio.StreamWriter -- the stream to write to
+			encoding : str -- the encoding used to convert the HTML to bytes; note that this argument is not passed to the function
+		"""
+		encode = codecs.getincrementalencoder(encoding)().encode # e.g. UTF-16's byte order mark is only written before the first chunk
+		async for chunk in self.renderiterasync(fn, *args, buffersize=buffersize, **kwargs):
+			writer.write(encode(chunk))
+			await writer.drain()
+	
+	def bind(self, data):
+		""" Insert data into this node and its sub-nodes, matching dict keys to sub-node names:
+			
+			- a dict's items are inserted into the sub-nodes with the same names; sub-nodes that have no item are omitted, and items that have no sub-node are ignored. The 'atts' key may give a dict of tag attributes to set, and the 'text' or 'html' key may give the node's content.
+			- a list or other iterable renders a Repeater node once for each item
+			- a Markup string is inserted as HTML; other strings, numbers, etc. are inserted as text
+			- None or False omits the node; True leaves the node unchanged
+			
+			data : any -- the data to insert; for a Template node, this must be a dict
+		"""
+		_bindnode(self, data)
+	
+	def renderdata(self, data):
+		""" Render a copy of this node with the given data inserted into it. This is equivalent to render(), using a controller function that calls bind(). 
+			
+			data : any -- the data to insert (see bind())
+			Result : str -- the generated HTML
+		"""
+		return self.render(_bindnode, data)
+	
+	def freeze(self, *names):
+		""" Render all of this node's sub-nodes except the named ones as static HTML, so that they no longer need to be copied or rendered each time this node is. This is used to turn a partly filled template into a skeleton containing only the sub-nodes that are still to be filled; the frozen sub-nodes can no longer be accessed or modified.
+			
+			*names : str -- the names of the sub-nodes to keep; a dotted name (e.g. 'body.content') keeps a sub-node of a sub-node, in which case the sub-node's other sub-nodes are frozen too
+		"""
+		_freezenode(self, names)
+	
+	def collapsewhitespace(self):
+		""" Collapse each run of whitespace in this node's static HTML and its sub-nodes' content to a single linefeed (if it contains one) or space, except within pre, textarea, script and style elements, and within tags and comments. This reduces the size of the rendered HTML without changing how it is displayed. Static chunks that become empty (e.g. the indentation between two sub-nodes) are no longer output by compiled templates (see Template.compile()). Content that has been rendered, e.g. by Repeater.repeat(), is unchanged.
+			
+			Result : dict -- 'bytes': the number of bytes removed from the static HTML; 'chunks': the number of static chunks that are now empty
+		"""
+		stats = {'bytes': 0, 'chunks': 0}
+		_collapsenode(self, [], stats)
+		return stats
 
 
 class Container(Node):
 	""" A Container node has a one-to-one relationship with the node that contains it. """
 	
+	__slots__ = ('_atts', '_attsshared', '__starttag', '__endtag', '_renderedstarttag', '__omittags', '_omit', '_fragment', '_origin')
+	# _attsshared -- copy-on-write: True if this node's _atts dict is shared with a copy of it
+	# _renderedstarttag -- the start tag, rendered with the current attributes; None if it needs to be re-rendered
+	# _fragment -- the node's HTML, once fixed by cached(); else None
+	# _origin -- an object that identifies the template node this node was parsed from, and is shared by all copies of it; used by cached() so that nodes from different templates don't share cached HTML
+	
 	_nodetype = 'con'
 	
 	def __init__(self, nodename, tagname, atts, emptytagformat, encode):
 		Node.__init__(self, nodename, encode)
 		self._atts = dict(atts) # Note: on cloning node, shallow copy this dict.
+		self._attsshared = False
 		if isinstance(self, NullContent):
 			self.__starttag = emptytagformat.format(tagname)
 			self.__endtag = ''
@@ -311,6 +1155,9 @@ class Container(Node):
 			self.__endtag = '</{}>'.format(tagname)
 		self.__omittags = False
 		self._omit = False
+		self._fragment = None
+		self._origin = object()
+		self._renderstarttag()
 	
 	def __len__(self):
 		return int(not self._omit)
@@ -320,15 +1167,26 @@ class Container(Node):
 			
 			Result : Container
 		"""
-		newnode = CloneNode(self) # performance optimisation
-		newnode._atts = self._atts.copy()
-		return newnode
+		# Copy-on-write: both nodes share the same _atts dict until one of them modifies it (see _ownatts)
+		if not self._attsshared:
+			object.__setattr__(self, '_attsshared', True) # performance optimisation (bypasses RichContent.__setattr__)
+		return _clonenode(self) # performance optimisation
+	
+	def _ownatts(self):
+		# Give this node its own copy of the tag attributes that it shares with other copies of it; called before the attributes are modified.
+		self._atts = self._atts.copy()
+		self._attsshared = False
+	
+	def _renderstarttag(self):
+		# Render the start tag and cache it until the attributes are next modified (see Attributes).
+		tag = self._renderedstarttag = self.__starttag.format(_renderatts(self._atts.items()))
+		return tag
 	
 	def _rendernode(self, collector):
 		if self.__omittags:
 			self._rendercontent(collector)
 		else:
-			collector.append(self.__starttag.format(_renderatts(self._atts.items())))
+			collector.append(self._renderedstarttag or self._renderstarttag())
 			self._rendercontent(collector)
 			collector.append(self.__endtag)
 
@@ -337,11 +1195,13 @@ class Container(Node):
 			self._rendernode(collector)
 	
 	def __attsget(self):
-		return Attributes(self._atts, self._encode)
+		return Attributes(self)
 	
 	def __attsset(self, value):
 		self._atts = {}
-		atts = Attributes(self._atts, self._encode)
+		self._attsshared = False
+		self._renderedstarttag = None
+		atts = Attributes(self)
 		for k, v in value.items():
 			atts[k] = v
 	
@@ -354,6 +1214,46 @@ class Container(Node):
 	def omit(self):
 		"""Don't render this element."""
 		self._omit = True
+	
+	def cached(self, key, fn, *args, cache=None, ttl=None, **kwargs):
+		""" Insert content into this node using a fragment cache. If the cache contains HTML for the given key, this node is rendered as that HTML and fn is not called; otherwise fn is called to insert content into this node as usual, then the node is rendered and its HTML is added to the cache. Either way, this node's HTML is fixed once this method returns, so any later changes to the node (other than omit()) are ignored. A Repeater node's HTML is that of the copies of it that fn renders, unless the node is itself one of the copies that add() or repeat() passes to a controller function, whose HTML is that of the copy.
+			
+			key : any -- a hashable value that identifies the content that fn inserts (e.g. the data that is passed to fn); this is combined with the identity of the template node that this node was copied from
+			fn : function -- the controller function responsible for inserting content into the node
+			*args : any -- extra values to pass to the controller function
+			cache : FragmentCache | None -- the cache to use; if None, the shared fragmentcache is used
+			ttl : float | None -- the number of seconds for which newly rendered HTML is cached; if None, the cache's default is used; note that this argument is not passed to the function
+			**kwargs : any -- extra values to pass to the controller function
+		"""
+		if cache is None:
+			cache = fragmentcache
+		isrow = isinstance(self, Repeater) and self._isrow
+		key = (self._origin, isrow, key)
+		fragment = cache.get(key)
+		if fragment is None:
+			fn(self, *args, **kwargs)
+			chunks = []
+			if isrow: # a row's HTML is its own element, not the rows that have been added to the node it was copied from
+				self._rendernode(chunks)
+			else:
+				self._render(chunks)
+			fragment = _joinchunks(chunks)
+			cache.set(key, fragment, ttl)
+		_setfragment(self, fragment)
+	
+	def recurse(self, prototype, fn, *args, **kwargs):
+		""" Replace this node's content with a copy of another node, e.g. to render nested data using the node that contains this one. This is the same as assigning prototype.renderfragment(fn, *args, **kwargs) to this node's html, so nested data is rendered in time proportional to the total number of items, however deeply it is nested.
+			
+			prototype : Node -- the node to copy, e.g. template.list; the node itself is not modified, so the same node can be used at every level
+			fn : function -- the controller function responsible for inserting content into the copy, which may call recurse() in turn
+			*args : any -- extra values to pass to the controller function
+			**kwargs : any -- extra values to pass to the controller function
+		"""
+		node = prototype.copy()
+		fn(node, *args, **kwargs)
+		collector = []
+		node._render(collector)
+		self.html = Fragment(collector)
 
 
 class Repeater(Container):
@@ -361,6 +1261,11 @@ class Repeater(Container):
 	   contains it.
 	"""
 	
+	__slots__ = ('_sep', '__renderedcontent', '_renderedshared', '_haslazy', '_isrow')
+	# _renderedshared -- copy-on-write: True if this node's rendered content is shared with a copy of it
+	# _haslazy -- set to True once repeatlazy() has been called
+	# _isrow -- True if this node is a copy made by _fastclone() to render a single row (e.g. the node passed to add()'s function), which is rendered by calling its _rendernode method
+	
 	_nodetype = 'rep'
 	
 	def _setsep(self, s): self._sep = str(s)
@@ -369,9 +1274,13 @@ class Repeater(Container):
 	def __init__(self, nodename, tagname, atts, emptytagformat, encode):
 		self._sep = '\n'
 		self.__renderedcontent = [] # On cloning, shallow-copy this list.
+		self._renderedshared = self._haslazy = self._isrow = False
 		Container.__init__(self, nodename, tagname, atts,  emptytagformat, encode)
 		
-	_fastclone = Container.copy
+	def _fastclone(self): # performance optimisation
+		newnode = Container.copy(self)
+		object.__setattr__(newnode, '_isrow', True) # bypass RichContent.__setattr__
+		return newnode
 	
 	def __len__(self):
 		return len(self.__renderedcontent) / 2
@@ -382,15 +1291,28 @@ class Repeater(Container):
 			Result : Repeater
 		"""
 		newnode = Container.copy(self)
-		newnode.__renderedcontent = self.__renderedcontent[:]
+		# Copy-on-write: both nodes share the same rendered content until one of them adds to it (see __ownrenderedcontent)
+		if not self._renderedshared:
+			object.__setattr__(self, '_renderedshared', True) # performance optimisation (bypasses RichContent.__setattr__)
+		object.__setattr__(newnode, '_renderedshared', True)
 		return newnode
 	
+	def __ownrenderedcontent(self):
+		self.__renderedcontent = self.__renderedcontent[:]
+		self._renderedshared = False
+	
 	def _render(self, collector):
-		if not self._omit:
+		if self._omit:
+			pass
+		elif self._haslazy:
+			collector.append(_RepeaterContent(self.__renderedcontent[:]))
+		else:
 			collector.extend(self.__renderedcontent[1:])
 	
 	def add(self, fn, *args, **kwargs):
 		"""Render an instance of this node."""
+		if self._renderedshared:
+			self.__ownrenderedcontent()
 		newnode = self._fastclone()
 		fn(newnode, *args, **kwargs)
 		if not newnode._omit:
@@ -402,6 +1324,270 @@ class Repeater(Container):
 		for item in list:
 			self.add(fn, item, *args, **kwargs)
 
+	def repeatlazy(self, fn, iterable, *args, **kwargs):
+		"""Render an instance of this node for each item in iterable, but not until the enclosing template is rendered. Each instance is rendered as it is output, so when used with Node.renderiter() or Node.renderto() only one instance need be held in memory at a time. If fn is a coroutine function and/or iterable is an asynchronous iterable, the template must be rendered using Node.renderasync(), Node.renderiterasync() or Node.renderstream()."""
+		if self._renderedshared:
+			self.__ownrenderedcontent()
+		self.__renderedcontent.append(_LazyRows(self._fastclone(), fn, iterable, args, kwargs))
+		self._haslazy = True
+	
+	async def addasync(self, fn, *args, **kwargs):
+		"""Render an instance of this node, where fn may be a coroutine function."""
+		newnode = self._fastclone()
+		result = fn(newnode, *args, **kwargs)
+		if inspect.isawaitable(result):
+			await result
+		if self._renderedshared: # checked after awaiting, as the node may have been copied in the meantime
+			self.__ownrenderedcontent()
+		if not newnode._omit:
+			self.__renderedcontent.append(newnode._sep)
+			newnode._rendernode(self.__renderedcontent)
+	
+	def repeatparallel(self, fn, items, *args, executor=None, chunksize=None, **kwargs):
+		"""Render an instance of this node for each item in items, dividing the items into chunks that are rendered concurrently by a concurrent.futures executor. Each chunk is rendered from a copy of this node, and the rendered chunks are added in the same order as the items. If executor is None, a ProcessPoolExecutor is created for the duration of the call. When using a process pool, fn, the items and any additional arguments must be picklable (e.g. fn must be a module-level function), and fn can only modify the copies of this node that it is given. If chunksize is None, the items are divided into about four chunks per CPU; pass chunksize to suit the executor's number of workers."""
+		if not isinstance(items, (list, tuple)):
+			items = list(items)
+		if not items:
+			return
+		ownsexecutor = executor is None
+		if ownsexecutor:
+			executor = concurrent.futures.ProcessPoolExecutor()
+		try:
+			if not chunksize:
+				# aim for several chunks per CPU, so that uneven chunks are balanced between workers
+				chunksize = max(1, -(-len(items) // ((os.cpu_count() or 1) * 4)))
+			prototype = self._fastclone()
+			futures = [executor.submit(_renderparallelrows, prototype, fn, items[i:i + chunksize], args, kwargs) 
+					for i in range(0, len(items), chunksize)]
+			for future in futures:
+				if self._renderedshared:
+					self.__ownrenderedcontent()
+				self.__renderedcontent.extend(future.result())
+		finally:
+			if ownsexecutor:
+				executor.shutdown()
+	
+	def _bindrows(self, rows):
+		# Called by Node.bind() to render an instance of this node for each item in rows. Where possible, rows are rendered directly to HTML by a generated function (see _bindplan) instead of by copying this node and binding each row to the copy.
+		if self._renderedshared:
+			self.__ownrenderedcontent()
+		plan = _bindplan(self)
+		if plan is None:
+			for row in rows:
+				self.add(_bindcontent, row)
+		else:
+			plan(self, rows, self.__renderedcontent.append, lambda row: self.add(_bindcontent, row))
+	
+	def fillrows(self, rows, columns=None, formatters=None, encoders=None):
+		""" Render an instance of this node for each row of a table, inserting the row's values as the text of this node's sub-nodes (or, if this node has no sub-nodes, as the text of this node). Unlike repeat(), this does not copy the node or call any user code for each row: the values of each column are formatted and encoded in a single pass, then inserted into a row skeleton that is rendered once from this node. Sub-nodes that are not filled are rendered in every row as they currently are; filled sub-nodes must be Container nodes with no sub-nodes of their own.
+			
+			rows : sequence | dict -- a sequence of tuples or dicts, one per row; or a dict of equal-length column sequences (e.g. lists or NumPy arrays), keyed by column name
+			columns : dict | None -- maps the names of the sub-nodes to fill to tuple indices or dict keys; if None, sub-nodes are filled in order from tuples (one per tuple item), or by name from dicts
+			formatters : dict | None -- maps sub-node names to functions that convert a column's values to strings; the default is str
+			encoders : dict | None -- maps sub-node names to functions that encode a column's formatted values as HTML, or to None to insert them as HTML without encoding; the default is the sub-node's own encoding
+		"""
+		if self._renderedshared:
+			self.__ownrenderedcontent()
+		rowshtml = _fillrows(self, rows, columns, formatters or {}, encoders or {})
+		if rowshtml:
+			result = [self._sep] * (len(rowshtml) * 2)
+			result[1::2] = rowshtml
+			self.__renderedcontent += result
+	
+	async def repeatasync(self, fn, iterable, *args, **kwargs):
+		"""Render an instance of this node for each item in iterable, where fn may be a coroutine function and iterable may be an asynchronous iterable."""
+		if hasattr(iterable, '__aiter__'):
+			async for item in iterable:
+				await self.addasync(fn, item, *args, **kwargs)
+		else:
+			for item in iterable:
+				await self.addasync(fn, item, *args, **kwargs)
+
+
+def _renderparallelrows(prototype, fn, items, args, kwargs):
+	# Called by Repeater.repeatparallel() to render a chunk of items, possibly in another process. Returns a list of (separator, HTML, separator, HTML, ...) for the instances that are not omitted; any deferred content (e.g. rows added by repeatlazy) is rendered here, as it can't be returned to the calling process.
+	result = []
+	for item in items:
+		newnode = prototype._fastclone()
+		fn(newnode, item, *args, **kwargs)
+		if not newnode._omit:
+			chunks = []
+			newnode._rendernode(chunks)
+			result += [newnode._sep, _joinchunks(chunks)]
+	return result
+
+
+class _LazyRows:
+	""" Records a Repeater.repeatlazy() call, so that its instances can be rendered at output time. """
+	
+	def __init__(self, prototype, fn, iterable, args, kwargs):
+		self.__prototype, self.__fn, self.__args, self.__kwargs = prototype, fn, args, kwargs
+		self.__iterable = iterable
+		self.__isasync = hasattr(iterable, '__aiter__')
+		# e.g. a generator or database cursor:
+		self.__isoneshot = (iterable.__aiter__() if self.__isasync else iter(iterable)) is iterable
+	
+	def __takeiterable(self):
+		if self.__iterable is None:
+			raise RuntimeError("Can't render repeater node 'rep:{}': its lazily repeated items were an iterator that has already been consumed.".format(self.__prototype._nodename))
+		iterable = self.__iterable
+		if self.__isoneshot:
+			self.__iterable = None
+		return iterable
+	
+	def _renderrows(self):
+		# Yield (separator, chunks) for each instance that is not omitted.
+		if self.__isasync:
+			raise TypeError("Can't render repeater node 'rep:{}': its lazily repeated items are an asynchronous iterable, so it must be rendered asynchronously.".format(self.__prototype._nodename))
+		iterable = self.__takeiterable()
+		prototype, fn, args, kwargs = self.__prototype, self.__fn, self.__args, self.__kwargs
+		for item in iterable:
+			newnode = prototype._fastclone()
+			result = fn(newnode, item, *args, **kwargs)
+			if inspect.isawaitable(result):
+				if inspect.iscoroutine(result):
+					result.close() # avoid 'coroutine was never awaited' warning
+				raise TypeError("Can't render repeater node 'rep:{}': its lazily repeated items are rendered by a coroutine function, so it must be rendered asynchronously.".format(self.__prototype._nodename))
+			if not newnode._omit:
+				chunks = []
+				newnode._rendernode(chunks)
+				yield newnode._sep, chunks
+	
+	async def _arenderrows(self):
+		# Asynchronous equivalent of _renderrows.
+		iterable = self.__takeiterable()
+		if not self.__isasync:
+			iterable = _aiter(iterable)
+		prototype, fn, args, kwargs = self.__prototype, self.__fn, self.__args, self.__kwargs
+		async for item in iterable:
+			newnode = prototype._fastclone()
+			result = fn(newnode, item, *args, **kwargs)
+			if inspect.isawaitable(result):
+				await result
+			if not newnode._omit:
+				chunks = []
+				newnode._rendernode(chunks)
+				yield newnode._sep, chunks
+
+
+async def _aiter(iterable):
+	# Wrap an ordinary iterable as an asynchronous iterable.
+	for item in iterable:
+		yield item
+
+
+class _RepeaterContent:
+	""" The deferred content of a Repeater whose rendered instances include lazily repeated items. """
+	
+	def __init__(self, renderedcontent):
+		self.__renderedcontent = renderedcontent
+	
+	def _renderchunks(self):
+		# The rendered content is a list of (separator, chunk, chunk, ...) sequences for each instance added by Repeater.add, interspersed with _LazyRows objects. As with Repeater._render, the separator before the first instance is omitted.
+		isrendered = False # True once any instance has been rendered
+		isrowstart = True # True if the next item is the separator at the start of an instance
+		for item in self.__renderedcontent:
+			if item.__class__ is _LazyRows:
+				for sep, chunks in item._renderrows():
+					if isrendered:
+						yield sep
+					isrendered = True
+					yield from chunks
+				isrowstart = True
+			elif isrowstart:
+				isrowstart = False
+				if isrendered:
+					yield item
+				isrendered = True
+			else:
+				yield item
+	
+	async def _arenderchunks(self):
+		# Asynchronous equivalent of _renderchunks.
+		isrendered = False
+		isrowstart = True
+		for item in self.__renderedcontent:
+			if item.__class__ is _LazyRows:
+				async for sep, chunks in item._arenderrows():
+					if isrendered:
+						yield sep
+					isrendered = True
+					for chunk in chunks:
+						yield chunk
+				isrowstart = True
+			elif isrowstart:
+				isrowstart = False
+				if isrendered:
+					yield item
+				isrendered = True
+			else:
+				yield item
+
+
+_kInlineFragmentSize = 65536 # the size, in characters, below which a Fragment's HTML is inserted into a node as a string (see _fragmentcontent)
+
+
+class Fragment:
+	""" Rendered HTML that can be inserted into other nodes by assigning it to their html property, without first being joined into a single string. Fragments are created by Node.renderfragment(). """
+	
+	__slots__ = ('_chunks',) # strings alternating with deferred chunks (see _joinruns); _joinchunks relies on this
+	
+	def __init__(self, chunks):
+		self._chunks = _joinruns(chunks)
+	
+	def _renderchunks(self):
+		return self._chunks
+	
+	async def _arenderchunks(self):
+		for chunk in self._renderchunks():
+			yield chunk
+	
+	def __str__(self):
+		return _joinchunks(self._renderchunks())
+
+
+class _LazyFragment(Fragment):
+	""" A Fragment created by Node.renderfragment(lazy=True), which renders a copy of its node each time it is output. """
+	
+	__slots__ = ('_node', '_fn', '_args', '_kwargs')
+	
+	def __init__(self, node, fn, args, kwargs):
+		self._chunks = None
+		self._node, self._fn, self._args, self._kwargs = node, fn, args, kwargs
+	
+	def _renderchunks(self):
+		node = self._node
+		if self._fn:
+			node = node.copy()
+			result = self._fn(node, *self._args, **self._kwargs)
+			if inspect.isawaitable(result):
+				if inspect.iscoroutine(result):
+					result.close() # avoid 'coroutine was never awaited' warning
+				raise TypeError("Can't render lazy fragment: it is rendered by a coroutine function, so must be rendered asynchronously.")
+		chunks = []
+		node._render(chunks)
+		return chunks
+	
+	async def _arenderchunks(self):
+		node = self._node
+		if self._fn:
+			node = node.copy()
+			result = self._fn(node, *self._args, **self._kwargs)
+			if inspect.isawaitable(result):
+				await result
+		chunks = []
+		node._render(chunks)
+		for chunk in chunks:
+			yield chunk
+
+
+def _fragmentcontent(fragment):
+	# Return the content to store in a node whose html is set to a Fragment. Small fragments without deferred chunks are stored as strings, as joining a short string into the HTML of the node that contains it is quicker than expanding a deferred chunk; other fragments are stored as-is.
+	chunks = fragment._chunks
+	if fragment.__class__ is Fragment and len(chunks) == 1 and len(chunks[0]) < _kInlineFragmentSize:
+		return chunks[0]
+	return fragment
+
 
 #######
 # 'Mixin' classes used to manage nodes' content
@@ -410,11 +1596,10 @@ class Repeater(Container):
 class Content:
 	""" Abstract base class. """
 	
+	__slots__ = () # the mixin classes don't define any slots, as a class can't inherit slots from more than one base class; the concrete classes define them instead
+	
 	def __iter__(self):
-		def makegen():
-			raise StopIteration
-			yield None
-		return makegen()
+		return iter(())
 
 
 ##
@@ -422,13 +1607,19 @@ class Content:
 class NullContent(Content):
 	""" Represents an empty HTML element's non-existent content. """
 	
+	__slots__ = ()
+	
 	def _rendercontent(self, collector):
 		pass
+	
+	text = html = property(lambda self: '', lambda self, txt: None, doc="str -- An empty element has no content, so this is always empty; setting it has no effect.")
 
 
 class PlainContent(Content):
 	""" Represents a non-empty HTML element's content where it contains plain text/markup only. """
 	
+	__slots__ = () # subclasses must define a '_html' slot
+	
 	def __init__(self, content):
 		self._html = content
 		
@@ -438,38 +1629,101 @@ class PlainContent(Content):
 	
 	def __settext(self, txt): 
 		self._html = self._encode(str(txt))
-	text = property(lambda self: decodeentity(self._html), __settext, 
+	text = property(lambda self: decodeentity(str(self._html)), __settext, 
 			doc="str -- The element's content as plain text; HTML entities are automatically encoded/decoded.")
 	
 	
 	def __sethtml(self, txt): 
-		self._html = str(txt)
-	html = property(lambda self: self._html, __sethtml, doc="str -- The element's content as raw HTML. Use with care.")
+		self._html = _fragmentcontent(txt) if isinstance(txt, Fragment) else str(txt)
+	html = property(lambda self: str(self._html), __sethtml, doc="str -- The element's content as raw HTML (which may be set to a Fragment). Use with care.")
 
 class RichContent(Content):
 	""" Represents a non-empty HTML element's content where it contains other Container/Repeater nodes. """
 	
-	__nodesdict = {} # this declaration avoids infinite recursion between __setattr__ and __getattr__ during __init__
+	__slots__ = () # subclasses must define the slots in _kRichContentSlots
+	# _RichContent__nodeslist -- the content: static HTML strings alternating with sub-nodes
+	# _RichContent__nodesdict -- the sub-nodes, keyed by name
+	# _nodesshared -- copy-on-write: True if this node's content list is shared with a copy of it; otherwise the set of names of sub-nodes that are still shared, or False if none are
+	# _nodesused -- the set of names of sub-nodes that have been returned to the user (who may still modify them), or None if none have
 	
 	def __init__(self, content):
 		Content.__init__(self)
 		self.__nodesdict = dict([(node._nodename, node) for node in content[1::2]]) # On cloning, replace with a new dict built from cloned self.__nodeslist.
 		self.__nodeslist = content # On cloning, shallow copy this list then clone and replace each node in the list.
+		self._nodesshared = False
+		self._nodesused = None
 		
 	def __iter__(self):
-		def makegen():
-			for i in range(1, len(self.__nodeslist), 2):
-				yield self.__nodeslist[i]
-			raise StopIteration
-		return makegen()
+		nodes = self._ownnodes()
+		object.__setattr__(self, '_nodesused', set(self.__nodesdict)) # performance optimisation (bypasses __setattr__)
+		return iter(nodes)
+	
+	def _ownnodes(self):
+		# Give this node its own copies of any sub-nodes it shares with its copies, and return its sub-nodes; used internally instead of iterating the node, which also marks the sub-nodes as returned to the user.
+		shared = self._nodesshared
+		if shared:
+			for name in list(self.__nodesdict if shared is True else shared):
+				self._ownnode(name)
+		return self.__nodeslist[1::2]
 
 	def _initrichclone(self, node):
-		D = node.__nodesdict = {}
-		L = node.__nodeslist = self.__nodeslist[:]
+		# Copy-on-write: the new node shares this node's content list and sub-nodes, so copying a node takes the same time regardless of its size. When either node's sub-nodes are accessed, that node makes its own copy of each sub-node that is used (see _ownnode), so only the parts of the tree that are actually used get copied.
+		# Sub-nodes that this node has already returned to the user may still be modified through the user's references to them, so the new node gets its own copies of those immediately.
+		setattr = object.__setattr__ # performance optimisation (bypasses __setattr__)
+		used = self._nodesused
+		if used:
+			D = {}
+			L = self.__nodeslist[:]
+			shared = set()
+			for i in range(1, len(L), 2):
+				name = L[i]._nodename
+				if name in used:
+					L[i] = L[i].copy()
+				else:
+					shared.add(name)
+				D[name] = L[i]
+			setattr(node, '_RichContent__nodeslist', L)
+			setattr(node, '_RichContent__nodesdict', D)
+			setattr(node, '_nodesshared', shared or False)
+			if shared and self._nodesshared is not True:
+				setattr(self, '_nodesshared', shared | (self._nodesshared or set()))
+		else:
+			if self._nodesshared is not True:
+				setattr(self, '_nodesshared', True)
+			setattr(node, '_nodesshared', True)
+		setattr(node, '_nodesused', None)
+		return node
+	
+	def _initrowclone(self, node):
+		# Repeater instances are normally fully populated, so their sub-nodes are copied immediately rather than on first access. (The copies are themselves copy-on-write, so this only copies the instance's immediate sub-nodes.)
+		D = {}
+		L = self.__nodeslist[:]
 		for i in range(1, len(L), 2):
 			D[L[i]._nodename] = L[i] = L[i].copy()
+		setattr = object.__setattr__ # performance optimisation (bypasses __setattr__)
+		setattr(node, '_RichContent__nodeslist', L)
+		setattr(node, '_RichContent__nodesdict', D)
+		setattr(node, '_nodesshared', False)
+		setattr(node, '_nodesused', None)
 		return node
 	
+	def _ownnode(self, name):
+		# Replace the named sub-node, if it is shared with other copies of this node, with this node's own copy of it; called before a sub-node is returned to the user or replaced.
+		setattr = object.__setattr__ # performance optimisation (bypasses __setattr__)
+		shared = self._nodesshared
+		if shared is True: # this node's content list is shared, so copy it first
+			setattr(self, '_RichContent__nodeslist', self.__nodeslist[:])
+			setattr(self, '_RichContent__nodesdict', self.__nodesdict.copy())
+			shared = set(self.__nodesdict)
+			setattr(self, '_nodesshared', shared)
+		if name in shared:
+			shared.remove(name)
+			D, L = self.__nodesdict, self.__nodeslist
+			node = D[name]
+			D[name] = L[L.index(node)] = node.copy()
+			if not shared:
+				setattr(self, '_nodesshared', False)
+	
 	def _rendercontent(self, collector):
 		L = self.__nodeslist
 		collector.append(L[0])
@@ -477,31 +1731,60 @@ class RichContent(Content):
 			L[i]._render(collector)
 			collector.append(L[i + 1])
 	
+	def __setstate__(self, state):
+		# Called when unpickling; this must be defined here as pickle would otherwise call __setattr__ before the node is initialized.
+		if isinstance(state, tuple): # (__dict__ state, __slots__ state)
+			state = dict(state[0] or {}, **(state[1] or {}))
+		for name, value in state.items():
+			object.__setattr__(self, name, value)
+	
 	def __getattr__(self, name):
+		if name[0] == '_': # not a sub-node name, e.g. a slot that hasn't been set yet
+			raise AttributeError("{!r} object has no attribute {!r}".format(self.__class__.__name__, name))
+		if self._nodesshared and name in self.__nodesdict:
+			self._ownnode(name)
 		try:
-			return self.__nodesdict[name]
+			node = self.__nodesdict[name]
 		except KeyError as e: # Note: attempting to get 'text' or 'html' property will also raise error
 			raise AttributeError("{}:{} node has no attribute {!r}.".format(self.nodetype, self.nodename, name)) from e
+		used = self._nodesused
+		if used is None:
+			object.__setattr__(self, '_nodesused', {name}) # performance optimisation (bypasses __setattr__)
+		else:
+			used.add(name)
+		return node
+	
+	def __setcontent(self, content):
+		# Replace the node's sub-nodes with static content.
+		self.__nodeslist = [content]
+		self.__nodesdict = {}
+		self._nodesshared = False
+		self._nodesused = None
+		base = getattr(self.__class__, '_compiledbase', None)
+		if base is not None: # the compiled class's code and sub-node properties no longer apply
+			object.__setattr__(self, '__class__', base)
 	
 	def __setattr__(self, name, value):
 		""" Replace a sub-node, or replace node's content. """
-		if name in self.__nodesdict:
+		if name[0] == '_': # node names can't start with an underscore
+			object.__setattr__(self, name, value)
+		elif name in self.__nodesdict:
 			if not isinstance(value, Node):
 				# check user hasn't accidentally written 'node.foo="TEXT"' instead of 'node.foo.text="TEXT"'
 				raise TypeError("Can't replace node '{}:{}': value isn't a Node object.".format(
 						self.__nodesdict[name]._nodename, self.__nodesdict[name]._nodename))
 			value = value.copy() 
 			value._nodename = name
+			if self._nodesshared:
+				self._ownnode(name)
 			idx = self.__nodeslist.index(self.__nodesdict[name])
 			self.__nodesdict[name] = self.__nodeslist[idx] = value
 		elif name == 'text':
-			self.__nodeslist = [self._encode(str(value))]
-			self.__nodesdict = {}
+			self.__setcontent(self._encode(str(value)))
 		elif name == 'html':
-			self.__nodeslist = [str(value)]
-			self.__nodesdict = {}
+			self.__setcontent(_fragmentcontent(value) if isinstance(value, Fragment) else str(value))
 		else:
-			self.__dict__[name] = value
+			object.__setattr__(self, name, value)
 
 
 #####################################################################
@@ -509,9 +1792,14 @@ class RichContent(Content):
 #
 # The following classes are instantiated by Parser.__hascompletedelement(), which returns the appropriate node type for a given element according to its directive type ('con' or 'rep') and contents (empty, plain text/static markup only, or sub-nodes). Note that the user documentation glosses over these details for simplicity by omitting any mention of 'mixin' classes and pretending the class hierarchy is strictly single inheritance (Node<-Container<-Repeater). Only advanced users who wish to define their own custom node classes need know the full details.
 
+_kRichContentSlots = ('_RichContent__nodeslist', '_RichContent__nodesdict', '_nodesshared', '_nodesused')
+
+
 class EmptyContainer(NullContent, Container):
 	""" A single node with no content, e.g. <br node="con:foo" /> """
 	
+	__slots__ = ('__dict__',)
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		NullContent.__init__(self)
 		Container.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -520,6 +1808,8 @@ class EmptyContainer(NullContent, Container):
 class PlainContainer(PlainContent, Container):
 	""" A single node without sub-nodes, e.g. <p node="con:foo">Hello, <b>World</b>!<p> """
 	
+	__slots__ = ('_html', '__dict__')
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		PlainContent.__init__(self, content[0])
 		Container.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -528,6 +1818,8 @@ class PlainContainer(PlainContent, Container):
 class RichContainer(RichContent, Container):
 	""" A single node with sub-nodes, e.g. <p node="con:foo">Hello, <b node="con:bar">NAME</b>!<p> """
 	
+	__slots__ = _kRichContentSlots + ('__dict__',)
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		RichContent.__init__(self, content)
 		Container.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -540,6 +1832,8 @@ class RichContainer(RichContent, Container):
 class EmptyRepeater(NullContent, Repeater):
 	""" A repeatable node with no content, e.g. <br node="rep:foo" /> """
 	
+	__slots__ = ('__dict__',)
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		NullContent.__init__(self)
 		Repeater.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -548,6 +1842,8 @@ class EmptyRepeater(NullContent, Repeater):
 class PlainRepeater(PlainContent, Repeater):
 	""" A repeatable node without sub-nodes, e.g. <p node="rep:foo">Hello, <b>World</b>!<p> """
 	
+	__slots__ = ('_html', '__dict__')
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		PlainContent.__init__(self, content[0])
 		Repeater.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -556,6 +1852,8 @@ class PlainRepeater(PlainContent, Repeater):
 class RichRepeater(RichContent, Repeater):
 	""" A repeatable node with sub-nodes, e.g. <p node="con:foo">Hello, <b node="con:bar">NAME</b>!<p> """
 	
+	__slots__ = _kRichContentSlots + ('__dict__',)
+	
 	def __init__(self, nodename, tagname, atts, content, emptytagformat, encode):
 		RichContent.__init__(self, content)
 		Repeater.__init__(self, nodename, tagname, atts, emptytagformat, encode)
@@ -564,7 +1862,7 @@ class RichRepeater(RichContent, Repeater):
 		return self._initrichclone(Repeater.copy(self))
 		
 	def _fastclone(self): # performance optimisation
-		return self._initrichclone(Repeater._fastclone(self))
+		return self._initrowclone(Repeater._fastclone(self))
 
 ##
 
@@ -573,6 +1871,645 @@ _kNodeClasses = {
 		'rep': [EmptyRepeater, PlainRepeater, RichRepeater]}
 
 
+#######
+# Compiled rendering
+#
+# Template.compile() replaces the class of each node that contains sub-nodes with a generated subclass whose _rendercontent method is specialised to that node's content: static markup becomes constant string chunks and each sub-node becomes an inlined slot that appends its tags and content directly to the collector. The generated code appends exactly the same chunks as the tree walker, so rendered output is unchanged. Slots whose node has since been replaced by a node of a different class (e.g. by grafting) are rendered by that node's own _render method, and nodes whose content is replaced (e.g. by setting their html/text property) revert to their base class.
+#
+# Most of the time spent rendering a repeater goes on copying it and getting its sub-nodes for each row rather than on rendering the row, so the generated subclass also has a property for each sub-node (see _makenodeproperty) and, for repeaters, a _fastclone method that copies the row's sub-nodes directly (see _makerowclone). Repeaters without sub-nodes, e.g. table cells, get a subclass whose add method renders the row inline (see _addplainrow).
+
+# generated classes, keyed by (base class, static chunks, sub-node classes and names); these are shared by all nodes with the same structure. Freezing a node or collapsing its whitespace generates a class for its new content, so the least recently used classes are discarded once there are too many (nodes that use them keep them).
+_kCompiledClasses = _LRUCache(1000, 16 * 1024 * 1024)
+_kCompiledClassesLock = threading.Lock()
+
+
+# generated classes for repeaters without sub-nodes, keyed by base class
+_kCompiledRowClasses = {}
+
+
+def _compilenode(node):
+	if hasattr(node.__class__, '_fragmentbase'): # see Container.cached()
+		return
+	if isinstance(node, RichContent):
+		for subnode in node._RichContent__nodeslist[1::2]:
+			_compilenode(subnode)
+	elif not _isplainrepeater(getattr(node.__class__, '_compiledbase', node.__class__)):
+		return
+	_setcompiledclass(node)
+
+
+def _isplainrepeater(cls):
+	# Is cls a Repeater class without sub-nodes that copies and renders its rows as standard?
+	return issubclass(cls, PlainRepeater) and cls.add is Repeater.add and cls._fastclone is Repeater._fastclone \
+			and cls._rendernode is Container._rendernode and cls._rendercontent is PlainContent._rendercontent
+
+
+def _setcompiledclass(node):
+	base = getattr(node.__class__, '_compiledbase', node.__class__)
+	if not isinstance(node, RichContent): # a repeater without sub-nodes, whose class doesn't depend on its content
+		cls = _kCompiledRowClasses.get(base)
+		if cls is None:
+			cls = _kCompiledRowClasses[base] = type(base.__name__, (base,), {'__module__': base.__module__, '__qualname__': base.__qualname__, 
+					'__slots__': (), '__reduce_ex__': _reducecompiled, '_compiledbase': base, 'add': _addplainrow})
+		node.__class__ = cls
+		return
+	L = node._RichContent__nodeslist
+	if not all(chunk.__class__ is str for chunk in L[0::2]): # e.g. the node's html was set to a Fragment, which can't be written into the generated code, so the node is rendered by its base class
+		object.__setattr__(node, '__class__', base) # bypass RichContent.__setattr__
+		return
+	key = (base, tuple(L[0::2]), tuple((subnode.__class__, subnode._nodename) for subnode in L[1::2]))
+	with _kCompiledClassesLock:
+		cls = _kCompiledClasses.get(key)
+	if cls is None:
+		cls = _makecompiledclass(base, L)
+		with _kCompiledClassesLock: # the size is estimated from the static chunks, which appear in both the key and the generated source
+			_kCompiledClasses.set(key, cls, 2 * sum(map(len, key[1])))
+	object.__setattr__(node, '__class__', cls) # bypass RichContent.__setattr__
+
+
+def _compileslots(L, namespace):
+	# Generate the body of a _rendercontent/_rendernode method that renders content list L.
+	out = ['\tappend({!r})'.format(L[0])] if L[0] else [] # empty chunks are skipped
+	for i in range(1, len(L), 2):
+		cls = namespace['K{}'.format(i)] = L[i].__class__
+		out.append('\tn = L[{}]'.format(i))
+		if issubclass(cls, Repeater) and cls._render is Repeater._render:
+			out += ['\tif n.__class__ is not K{}:'.format(i),
+					'\t\tn._render(collector)',
+					'\telif n._haslazy:',
+					'\t\tn._render(collector)',
+					'\telif not n._omit:',
+					'\t\tcollector.extend(n._Repeater__renderedcontent[1:])']
+		elif issubclass(cls, Container) and not issubclass(cls, RichContent) \
+				and cls._render is Container._render and cls._rendernode is Container._rendernode:
+			content = ['\t\tappend(n._html)'] if issubclass(cls, PlainContent) else []
+			out += ['\tif n.__class__ is not K{}:'.format(i),
+					'\t\tn._render(collector)',
+					'\telif n._omit:',
+					'\t\tpass',
+					'\telif n._Container__omittags:'] + (content or ['\t\tpass']) + [
+					'\telse:',
+					'\t\tappend(n._renderedstarttag or n._renderstarttag())'] + content + [
+					'\t\tappend(n._Container__endtag)']
+		else:
+			out.append('\tn._render(collector)')
+		if L[i + 1]:
+			out.append('\tappend({!r})'.format(L[i + 1]))
+	return out
+
+
+def _makecompiledclass(base, L):
+	namespace = {'_genericrendercontent': RichContent._rendercontent}
+	body = _compileslots(L, namespace)
+	out = ['def _rendercontent(self, collector):',
+			'\tL = self._RichContent__nodeslist',
+			'\tif len(L) != {}:'.format(len(L)),
+			'\t\treturn _genericrendercontent(self, collector)',
+			'\tappend = collector.append'] + body
+	if issubclass(base, Container):
+		namespace['_genericrendernode'] = base._rendernode
+		out += ['',
+				'def _rendernode(self, collector):',
+				'\tL = self._RichContent__nodeslist',
+				'\tif len(L) != {} or self._Container__omittags:'.format(len(L)),
+				'\t\treturn _genericrendernode(self, collector)',
+				'\tappend = collector.append',
+				'\tappend(self._renderedstarttag or self._renderstarttag())'] + body + [
+				'\tappend(self._Container__endtag)']
+	source = '\n'.join(out) + '\n'
+	exec(compile(source, '<htmltemplate: compiled {}>'.format(base.__name__), 'exec'), namespace)
+	attrs = {'__module__': base.__module__, '__qualname__': base.__qualname__, '__slots__': (), '__reduce_ex__': _reducecompiled,
+			'_compiledbase': base, '_compiledsource': source, '_rendercontent': namespace['_rendercontent']}
+	if issubclass(base, Container):
+		attrs['_rendernode'] = namespace['_rendernode']
+	else: # Template._render is an alias for RichContent._rendercontent, so must be replaced too
+		attrs['_render'] = namespace['_rendercontent']
+	if base.__getattr__ is RichContent.__getattr__:
+		for subnode in L[1::2]:
+			attrs[subnode._nodename] = _makenodeproperty(subnode._nodename)
+	if issubclass(base, RichRepeater) and base._fastclone is RichRepeater._fastclone and base._initrowclone is RichContent._initrowclone:
+		attrs['_fastclone'] = _makerowclone(base, L)
+	return type(base.__name__, (base,), attrs)
+
+
+def _makenodeproperty(name):
+	# Generated classes get a property for each sub-node, which is quicker than RichContent.__getattr__() as Python only calls that after a normal attribute lookup has failed. Shared sub-nodes and profiling are handled by RichContent.__getattr__().
+	def getnode(self):
+		if self._nodesshared or _kProfiler is not None:
+			return RichContent.__getattr__(self, name)
+		node = self._RichContent__nodesdict[name]
+		used = self._nodesused
+		if used is None:
+			object.__setattr__(self, '_nodesused', {name}) # performance optimisation (bypasses __setattr__)
+		else:
+			used.add(name)
+		return node
+	return property(getnode)
+
+
+def _makerowclone(base, L):
+	# Generated classes for repeaters also get a _fastclone() method that copies a row's sub-nodes as RichRepeater._fastclone() does, but clones sub-nodes that are simple Container nodes directly instead of calling their copy() methods.
+	clones = []
+	for i in range(1, len(L), 2):
+		cls = L[i].__class__
+		if cls.copy is Container.copy and cls.__setattr__ is object.__setattr__:
+			clones.append((i, cls, _clonefunction(cls)))
+		else:
+			clones.append((i, None, None))
+	size = len(L)
+	def _fastclone(self):
+		if _kProfiler is not None: # the profiler records the time spent in _clonenode()
+			return base._fastclone(self)
+		setattr = object.__setattr__ # performance optimisation (bypasses __setattr__)
+		if not self._attsshared:
+			setattr(self, '_attsshared', True)
+		node = _clonenode(self)
+		L = self._RichContent__nodeslist[:]
+		if len(L) != size:
+			return self._initrowclone(node)
+		D = {}
+		for i, cls, clone in clones:
+			n = L[i]
+			if n.__class__ is cls:
+				if not n._attsshared:
+					n._attsshared = True
+				n = clone(n)
+			else:
+				n = n.copy()
+			D[n._nodename] = L[i] = n
+		setattr(node, '_RichContent__nodeslist', L)
+		setattr(node, '_RichContent__nodesdict', D)
+		setattr(node, '_nodesshared', False)
+		setattr(node, '_nodesused', None)
+		setattr(node, '_isrow', True)
+		return node
+	return _fastclone
+
+
+def _addplainrow(self, fn, *args, **kwargs):
+	# Repeater.add() for compiled repeaters without sub-nodes, which renders the row's tags and content inline.
+	if _kProfiler is not None:
+		return Repeater.add(self, fn, *args, **kwargs)
+	if self._renderedshared:
+		self._Repeater__ownrenderedcontent()
+	if not self._attsshared:
+		self._attsshared = True
+	newnode = _clonenode(self)
+	newnode._isrow = True
+	fn(newnode, *args, **kwargs)
+	if not newnode._omit:
+		append = self._Repeater__renderedcontent.append
+		append(newnode._sep)
+		if newnode.__class__ is not self.__class__: # e.g. fn made the row a cached fragment
+			newnode._rendernode(self._Repeater__renderedcontent)
+		elif newnode._Container__omittags:
+			append(newnode._html)
+		else:
+			append(newnode._renderedstarttag or newnode._renderstarttag())
+			append(newnode._html)
+			append(newnode._Container__endtag)
+
+
+def _nodestate(node):
+	# Get a node's slot and __dict__ values, for pickling.
+	state = {}
+	for name in _slotnames(node.__class__):
+		try:
+			state[name] = object.__getattribute__(node, name)
+		except AttributeError: # unset slot
+			pass
+	if hasattr(node, '__dict__'):
+		state.update(node.__dict__)
+	return state
+
+
+def _reducecompiled(node, protocol):
+	# Generated classes can't be pickled by reference, so compiled nodes are pickled as their base class and recompiled when unpickled (e.g. by Repeater.repeatparallel() when using a process pool).
+	return _unpicklecompiled, (node._compiledbase, _nodestate(node))
+
+
+def _unpicklecompiled(base, state):
+	node = base.__new__(base)
+	for name, value in state.items():
+		object.__setattr__(node, name, value) # bypass RichContent.__setattr__
+	_setcompiledclass(node) # its sub-nodes have already been unpickled (and recompiled)
+	return node
+
+
+#######
+# Data binding
+#
+# Node.bind() inserts nested dicts and lists into a node's sub-nodes. Repeater rows are the hot path, so a repeater whose sub-nodes are all simple Container nodes (i.e. with no sub-nodes of their own) binds each dict row by rendering it directly to a single HTML string, without copying the repeater or calling any user code. The code to do this is generated once for each repeater structure and cached, as with Template.compile(). Rows containing values that the generated code can't handle (e.g. dicts of attributes) are bound by copying the repeater as usual.
+
+_kBindPlans = {} # generated bind functions, keyed by (repeater class, static chunks, sub-node classes and names); None if a repeater structure can't be bound directly
+
+
+def _bindnode(node, data):
+	if isinstance(node, Repeater):
+		if data is None or data is False:
+			node.omit()
+		elif data is True or isinstance(data, (str, collections.abc.Mapping)) or not isinstance(data, collections.abc.Iterable):
+			node.add(_bindcontent, data)
+		else:
+			node._bindrows(data)
+	else:
+		_bindcontent(node, data)
+
+
+def _bindcontent(node, data):
+	if isinstance(node, Template) and not isinstance(data, collections.abc.Mapping):
+		raise TypeError("Can't bind {} to template: data must be a dict.".format(type(data).__name__))
+	if data is True:
+		pass
+	elif data is None or data is False:
+		node.omit()
+	elif isinstance(data, Markup):
+		node.html = data
+	elif isinstance(data, str):
+		node.text = data
+	elif isinstance(data, collections.abc.Mapping):
+		if 'atts' in data:
+			atts = node.atts
+			for name, value in data['atts'].items():
+				atts[name] = value
+		if 'html' in data:
+			node.html = data['html']
+		elif 'text' in data:
+			node.text = data['text']
+		else:
+			for subnode in node._ownnodes():
+				name = subnode._nodename
+				if name in data:
+					_bindnode(subnode, data[name])
+				else:
+					subnode.omit()
+	elif isinstance(data, collections.abc.Iterable):
+		raise TypeError("Can't bind {} to {}:{} node: only Repeater nodes can be bound to a list or other iterable.".format(
+				type(data).__name__, node._nodetype, node._nodename))
+	else:
+		node.text = data
+
+
+def _issimplenode(cls):
+	# Is cls a Container class without sub-nodes that renders as standard?
+	return issubclass(cls, Container) and not issubclass(cls, (Repeater, RichContent)) \
+			and cls._render is Container._render and cls._rendernode is Container._rendernode
+
+
+def _bindplan(node):
+	# Get the generated function that binds rows to the given Repeater node, or None if it can't be bound directly.
+	if not isinstance(node, RichContent):
+		return None
+	L = node._RichContent__nodeslist
+	key = (node.__class__, tuple(L[0::2]), tuple((subnode.__class__, subnode._nodename) for subnode in L[1::2]))
+	try:
+		return _kBindPlans[key]
+	except KeyError:
+		pass
+	base = getattr(node.__class__, '_compiledbase', node.__class__)
+	if base._rendernode is Container._rendernode and base._rendercontent is RichContent._rendercontent \
+			and all(_issimplenode(subnode.__class__) for subnode in L[1::2]):
+		plan = _makebindplan(L)
+	else:
+		plan = None
+	_kBindPlans[key] = plan
+	return plan
+
+
+def _makebindplan(L):
+	# The generated function renders each row as: start tag, static HTML, sub-node 1, static HTML, sub-node 2, ..., static HTML, end tag. For each sub-node i, the function first looks up its tags, content and encoding function (which are the same for every row) as si, ci, ti and ei; then for each row, it renders the sub-node's value as xi.
+	out = ['def bindrows(node, rows, append, fallback):',
+			'\tL = node._RichContent__nodeslist',
+			'\tif node._Container__omittags:',
+			'\t\thead, tail = L[0], L[-1]',
+			'\telse:',
+			'\t\thead = (node._renderedstarttag or node._renderstarttag()) + L[0]',
+			'\t\ttail = L[-1] + node._Container__endtag',
+			'\tsep = node._sep']
+	for i in range(1, len(L), 2):
+		out += ['\tn{0} = n = L[{0}]'.format(i),
+				'\tk{0}, c{0}, e{0} = n._omit, str(getattr(n, "_html", "")), n._encode'.format(i),
+				'\tif n._Container__omittags:',
+				"\t\ts{0} = t{0} = ''".format(i),
+				'\telse:',
+				'\t\ts{0}, t{0} = n._renderedstarttag or n._renderstarttag(), n._Container__endtag'.format(i)]
+	out += ['\tfor row in rows:',
+			"\t\tif row.__class__ is not dict or 'atts' in row or 'text' in row or 'html' in row:",
+			'\t\t\tfallback(row)',
+			'\t\t\tcontinue']
+	result = ['head']
+	for i in range(1, len(L), 2):
+		isempty = issubclass(L[i].__class__, NullContent)
+		out += ['\t\tv = row.get({!r})'.format(L[i]._nodename),
+				'\t\tif k{0} or v is None or v is False:'.format(i),
+				"\t\t\tx{} = ''".format(i),
+				'\t\telif v.__class__ is str:',
+				('\t\t\tx{0} = s{0} + t{0}' if isempty else '\t\t\tx{0} = s{0} + e{0}(v) + t{0}').format(i),
+				'\t\telse:',
+				'\t\t\tx{0} = _bindleaf(v, n{0}, s{0}, c{0}, t{0}, e{0}, {1})'.format(i, isempty),
+				'\t\t\tif x{} is None:'.format(i),
+				'\t\t\t\tfallback(row)',
+				'\t\t\t\tcontinue']
+		result += ['x{}'.format(i), repr(L[i + 1]) if i + 2 < len(L) else 'tail']
+	out += ['\t\tappend(sep)',
+			'\t\tappend({})'.format(' + '.join(result))]
+	namespace = {'_bindleaf': _bindleaf}
+	exec(compile('\n'.join(out) + '\n', '<htmltemplate: bind>', 'exec'), namespace)
+	return namespace['bindrows']
+
+
+def _bindleaf(value, node, starttag, content, endtag, encode, isempty):
+	# Render a sub-node bound to a value other than a plain string, None or False, as _bindcontent would; returns None if the row must be bound by _bindcontent (i.e. the value is a list or other iterable, so _bindcontent will raise an error).
+	if isinstance(value, collections.abc.Mapping): # e.g. {'text': ..., 'atts': {...}}; bind a copy of the sub-node
+		node = node.copy()
+		_bindcontent(node, value)
+		chunks = []
+		node._render(chunks)
+		return _joinchunks(chunks)
+	elif value is True or isempty: # empty elements' content can't be changed
+		pass
+	elif isinstance(value, Markup):
+		content = value
+	elif isinstance(value, str):
+		content = encode(value)
+	elif isinstance(value, collections.abc.Iterable):
+		return None
+	else:
+		content = encode(str(value))
+	return starttag + content + endtag
+
+
+#######
+# Tabular fill
+#
+# Repeater.fillrows() renders a whole table in a few passes over its columns. The repeater is first rendered once as a %-style format string (the row skeleton), with a '%s' placeholder for the content of each filled sub-node; each column's values are then extracted, formatted and encoded using map(), and the resulting columns are zipped into the skeleton, one row at a time.
+
+
+def _fillrows(node, rows, columns, formatters, encoders):
+	# Returns a list of rendered rows.
+	iscolumnar = isinstance(rows, collections.abc.Mapping)
+	if not (iscolumnar or isinstance(rows, collections.abc.Sequence)):
+		rows = list(rows) # e.g. a generator or database cursor; the rows are read once for each column
+	skeleton, filled = _fillskeleton(node, rows, columns, iscolumnar)
+	values = []
+	for subnode, key in filled:
+		if iscolumnar:
+			column = rows[key]
+		elif key is None: # the rows are the values of a repeater without sub-nodes
+			column = rows
+		else:
+			column = map(operator.itemgetter(key), rows)
+		name = subnode._nodename
+		column = map(formatters.get(name, str), column)
+		encoder = encoders[name] if name in encoders else subnode._encode
+		if encoder is not None:
+			column = map(encoder, column)
+		values.append(list(column))
+	if iscolumnar:
+		length = len(values[0]) if values else len(next(iter(rows.values()), ()))
+		if any(len(column) != length for column in values):
+			raise ValueError("Can't fill repeater node 'rep:{}': its columns are of different lengths.".format(node._nodename))
+	else:
+		length = len(rows)
+	if values:
+		return list(map(skeleton.__mod__, zip(*values)))
+	else:
+		return [skeleton % ()] * length
+
+
+def _fillskeleton(node, rows, columns, iscolumnar):
+	# Render the given Repeater node as a %-style format string; returns (format string, [(sub-node, column key), ...]).
+	base = getattr(node.__class__, '_compiledbase', node.__class__)
+	if isinstance(node, NullContent) or base._rendernode is not Container._rendernode \
+			or base._rendercontent not in (RichContent._rendercontent, PlainContent._rendercontent):
+		raise TypeError("Can't fill {}:{} node: only non-empty Repeater nodes can be filled.".format(node._nodetype, node._nodename))
+	if node._Container__omittags:
+		head = tail = ''
+	else:
+		head, tail = node._renderedstarttag or node._renderstarttag(), node._Container__endtag
+	if not isinstance(node, RichContent):
+		if columns is not None:
+			raise ValueError("Can't fill repeater node 'rep:{}' by column: it has no sub-nodes.".format(node._nodename))
+		if iscolumnar:
+			raise TypeError("Can't fill repeater node 'rep:{}' from a dict of columns: it has no sub-nodes.".format(node._nodename))
+		return head.replace('%', '%%') + '%s' + tail.replace('%', '%%'), [(node, None)]
+	L = node._RichContent__nodeslist
+	subnodes = L[1::2]
+	if columns is None:
+		if iscolumnar:
+			columns = {subnode._nodename: subnode._nodename for subnode in subnodes if subnode._nodename in rows}
+		elif rows and isinstance(rows[0], collections.abc.Mapping):
+			columns = {subnode._nodename: subnode._nodename for subnode in subnodes if subnode._nodename in rows[0]}
+		elif rows:
+			columns = {subnode._nodename: i for i, subnode in enumerate(subnodes[:len(rows[0])])}
+		else:
+			columns = {}
+	else:
+		for name in set(columns).difference(subnode._nodename for subnode in subnodes):
+			raise ValueError("Can't fill repeater node 'rep:{}': it has no sub-node named {!r}.".format(node._nodename, name))
+	result, filled = [head + L[0]], []
+	for i in range(1, len(L), 2):
+		subnode = L[i]
+		if subnode._nodename in columns:
+			if not _issimplenode(getattr(subnode.__class__, '_compiledbase', subnode.__class__)) or isinstance(subnode, NullContent):
+				raise TypeError("Can't fill {}:{} node in repeater node 'rep:{}': only non-empty Container nodes without sub-nodes can be filled.".format(
+						subnode._nodetype, subnode._nodename, node._nodename))
+			if subnode._omit:
+				pass
+			elif subnode._Container__omittags:
+				result.append(None)
+			else:
+				result += [subnode._renderedstarttag or subnode._renderstarttag(), None, subnode._Container__endtag]
+			if not subnode._omit:
+				filled.append((subnode, columns[subnode._nodename]))
+		else:
+			chunks = []
+			subnode._render(chunks)
+			result.append(_joinchunks(chunks))
+		result.append(L[i + 1])
+	result.append(tail)
+	return ''.join('%s' if part is None else part.replace('%', '%%') for part in result), filled
+
+
+#######
+# Freezing
+#
+# Node.freeze() replaces each sub-node that isn't to be kept with its rendered HTML, merged into the static HTML around it. The node's content list is replaced rather than modified, as it may be shared with copies of the node.
+
+
+def _freezenode(node, names):
+	kept = {} # sub-node name : names of its own sub-nodes to keep, or None to keep the whole sub-node
+	for name in names:
+		name, _, subname = name.partition('.')
+		if not subname:
+			kept[name] = None
+		elif kept.get(name, ()) is not None:
+			kept.setdefault(name, []).append(subname)
+	if not isinstance(node, RichContent):
+		for name in kept:
+			raise ValueError("Can't freeze {}:{} node: it has no sub-node named {!r}.".format(node._nodetype, node._nodename, name))
+		return
+	for name in kept:
+		if name not in node._RichContent__nodesdict:
+			raise ValueError("Can't freeze {}:{} node: it has no sub-node named {!r}.".format(node._nodetype, node._nodename, name))
+		if node._nodesshared:
+			node._ownnode(name) # the kept sub-node may be modified, so must not be shared with copies of this node
+	L = node._RichContent__nodeslist
+	newL, D = [L[0]], {}
+	for i in range(1, len(L), 2):
+		subnode = L[i]
+		name = subnode._nodename
+		if name in kept:
+			if kept[name] is not None:
+				_freezenode(subnode, kept[name])
+			newL += [subnode, L[i + 1]]
+			D[name] = subnode
+		else:
+			chunks = []
+			subnode._render(chunks)
+			newL[-1] += _joinchunks(chunks) + L[i + 1]
+	setattr = object.__setattr__ # bypass RichContent.__setattr__
+	setattr(node, '_RichContent__nodeslist', newL)
+	setattr(node, '_RichContent__nodesdict', D)
+	setattr(node, '_nodesshared', False)
+	if hasattr(node.__class__, '_compiledbase'): # recompile for the new content list
+		_setcompiledclass(node)
+
+
+#######
+# Whitespace collapsing
+
+_kPreservedElements = {'pre', 'textarea', 'script', 'style'} # elements whose content is output exactly as written
+_kPreservedEndTagPatterns = {name: re.compile(r'</{}\s*>'.format(name), re.I) for name in _kPreservedElements}
+# elements whose start and end tags are never displayed next to text, so whitespace beside them is never displayed either
+_kBlockElements = {'html', 'head', 'body', 'title', 'table', 'caption', 'colgroup', 'col', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th'}
+_kWhitespacePattern = re.compile('[ \t\n\r\f]+') # HTML whitespace only, as \s would also match non-breaking spaces
+
+
+def _collapserun(m):
+	return '\n' if '\n' in m.group() or '\r' in m.group() else ' '
+
+
+def _collapsetext(html, stack, stats, before=None, after=None):
+	# Collapse the whitespace in a static HTML string. stack is the list of preserved elements that are open at the start of the string, and is updated for the preserved elements it opens and closes. before and after are the names of the tags that precede and follow the string, if known.
+	out = []
+	pos = 0
+	while pos < len(html):
+		if stack: # copy everything up to and including the preserved element's end tag
+			m = _kPreservedEndTagPatterns[stack[-1]].search(html, pos)
+			if not m:
+				out.append(html[pos:])
+				break
+			out.append(html[pos:m.end()])
+			pos = m.end()
+			stack.pop()
+			before = None
+			continue
+		m = _kTokenPattern.search(html, pos)
+		text = html[pos:m.start() if m else len(html)]
+		tagname = (m.group(1) or m.group(2) or '').lower() if m else after
+		if text and not text.strip(' \t\n\r\f') and (before in _kBlockElements or tagname in _kBlockElements):
+			text = ''
+		out.append(_kWhitespacePattern.sub(_collapserun, text))
+		if not m:
+			break
+		out.append(m.group())
+		pos = m.end()
+		before = tagname
+		if m.group(2) and not m.group(4) and tagname in _kPreservedElements:
+			stack.append(tagname)
+	result = ''.join(out)
+	stats['bytes'] += len(html) - len(result)
+	return result
+
+
+def _tagname(node):
+	# Get a node's tag name, or None if its tags are omitted.
+	if not isinstance(node, Container) or node._Container__omittags:
+		return None
+	starttag = node._Container__starttag
+	return starttag[1:starttag.index('{')]
+
+
+def _collapsenode(node, stack, stats, before=None, after=None):
+	if getattr(node, '_fragment', None) is not None: # see Container.cached()
+		return
+	tagname = _tagname(node)
+	if tagname is not None:
+		before = after = tagname
+	preserved = tagname in _kPreservedElements and bool(node._Container__endtag)
+	if preserved:
+		stack.append(tagname)
+	if isinstance(node, RichContent):
+		node._ownnodes()
+		L = node._RichContent__nodeslist
+		newL = []
+		for i, item in enumerate(L):
+			if i % 2:
+				_collapsenode(item, stack, stats)
+				newL.append(item)
+			elif not isinstance(item, str): # e.g. a Fragment, whose HTML is output as-is
+				newL.append(item)
+			else:
+				html = _collapsetext(item, stack, stats, before if i == 0 else _tagname(L[i - 1]), 
+						after if i == len(L) - 1 else _tagname(L[i + 1]))
+				if item and not html:
+					stats['chunks'] += 1
+				newL.append(html)
+		object.__setattr__(node, '_RichContent__nodeslist', newL) # bypass RichContent.__setattr__
+		if hasattr(node.__class__, '_compiledbase'): # recompile for the new content list
+			_setcompiledclass(node)
+	elif isinstance(node, PlainContent) and isinstance(node._html, str):
+		object.__setattr__(node, '_html', _collapsetext(node._html, stack, stats, before, after))
+	if preserved:
+		del stack[-1]
+	if isinstance(node, Repeater): # the separator is output between one copy of the repeater and the next
+		object.__setattr__(node, '_sep', _collapsetext(node._sep, stack, stats, tagname, tagname))
+
+
+#######
+# Cached fragments
+#
+# Container.cached() fixes a node's HTML by replacing its class with a generated subclass whose _render and _rendernode methods output the HTML stored in the node's _fragment slot. Parent nodes render the node by calling _render, except that the rows of a Repeater (see Repeater._isrow) are rendered by calling _rendernode. As the node's content is no longer rendered, the subclass is derived from the node's original (uncompiled) class. Compiled parent nodes render the node by calling its _render method, as it is no longer of the class they were compiled for.
+
+_kFragmentClasses = {} # generated classes, keyed by original node class
+
+
+def _renderfragment(self, collector):
+	if not self._omit:
+		collector.append(self._fragment)
+
+
+def _renderfragmentnode(self, collector):
+	collector.append(self._fragment)
+
+
+def _setfragment(node, fragment):
+	cls = node.__class__
+	base = getattr(cls, '_fragmentbase', None) or getattr(cls, '_compiledbase', cls)
+	try:
+		cls = _kFragmentClasses[base]
+	except KeyError:
+		cls = _kFragmentClasses[base] = type(base.__name__, (base,), {'__module__': base.__module__, '__qualname__': base.__qualname__, 
+				'__slots__': (), '__reduce_ex__': _reducefragment, '_fragmentbase': base, '_render': _renderfragment, '_rendernode': _renderfragmentnode})
+	object.__setattr__(node, '_fragment', fragment) # bypass RichContent.__setattr__
+	object.__setattr__(node, '__class__', cls)
+
+
+def _reducefragment(node, protocol):
+	# As with compiled nodes, generated classes can't be pickled by reference.
+	state = _nodestate(node)
+	return _unpicklefragment, (node._fragmentbase, state.pop('_fragment'), state)
+
+
+def _unpicklefragment(base, fragment, state):
+	node = base.__new__(base)
+	for name, value in state.items():
+		object.__setattr__(node, name, value)
+	_setfragment(node, fragment)
+	return node
+
+
 #######
 
 
@@ -580,29 +2517,48 @@ class Attributes:
 	"""Public facade for modifying a node's tag attributes."""
 	
 	__attnamepattern = re.compile('^[a-zA-Z_][-.:a-zA-Z_0-9]*$')
+	__validattnames = set() # attribute names that have already matched __attnamepattern
+	__maxvalidattnames = 1000 # limit on the size of __validattnames, in case attribute names are generated from data
+	
+	def __init__(self, node):
+		self.__node = node
 	
-	def __init__(self, atts, encode):
-		self.__atts, self._encode = atts, encode
+	__atts = property(lambda self: self.__node._atts)
+	
+	def __ownatts(self):
+		# Called before modifying the node's attributes, in case they are shared with a copy of the node.
+		node = self.__node
+		if node._attsshared:
+			node._ownatts()
+		return node._atts
 	
 	def __getitem__(self, name):
 		return decodeentity(self.__atts[name])
 		
 	def __setitem__(self, name, val):
 		try:
-			# Note: the next line will fail if the name is not a string; this will be caught and reported below.
-			if not self.__attnamepattern.match(name): 
-				raise ValueError("Bad attribute name.")
+			# Note: the next lines will fail if the name is not a string; this will be caught and reported below.
+			if name not in self.__validattnames:
+				if not self.__attnamepattern.match(name): 
+					raise ValueError("Bad attribute name.")
+				if len(self.__validattnames) < self.__maxvalidattnames:
+					self.__validattnames.add(name)
+			node = self.__node
 			if isinstance(val, str):
-				val = self._encode(val)
+				val = node._encode(val)
 			elif val is not None:
 				raise TypeError("Bad attribute value (not a string or None): {!r}".format(val))
-			self.__atts[name] = val
+			if node._attsshared:
+				node._ownatts()
+			node._atts[name] = val
+			node._renderedstarttag = None
 		except Exception as e:
 			msg = str(e) if isinstance(name, str) else "Bad attribute name (not a string)."
 			raise e.__class__("Can't set tag attribute {!r}: {}".format(name, msg)) from e
 		
 	def __delitem__(self, name):
-		del self.__atts[name]
+		del self.__ownatts()[name]
+		self.__node._renderedstarttag = None
 	
 	def __repr__(self):
 		return '<Attributes [{}]>'.format(_renderatts(self.__atts.items())[1:])
@@ -614,7 +2570,7 @@ class Attributes:
 		return [decodeentity(v) for v in self.__atts.values()]
 	
 	def items(self):
-		return [(k, decodeentity(v)) for v in self.__atts.items()]
+		return [(k, decodeentity(v)) for k, v in self.__atts.items()]
 	
 	def __len__(self):
 		return len(self.__atts)
@@ -630,12 +2586,16 @@ class Template(RichContent, Node):
 	
 	_nodetype = 'tem'
 	
-	def __init__(self, html, isxhtml=True, attribute='node', encodefn=encodeentity):
+	def __init__(self, html, isxhtml=True, attribute='node', encodefn=encodeentity, compiled=False, parser='htmlparser', include=None, collapsewhitespace=False):
 		"""
 			html : str -- the template HTML
 			isxhtml : bool -- if True, trailing slash will be preserved in empty tags (e.g. '<br />'); if False, it will be removed (e.g. '<br>')
 			attribute : str -- name of the tag attribute used to hold compiler directives
 			encodefn : function -- the function used to encode HTML entities; if omitted, the &, <, > and " characters will be encoded by default
+			compiled : bool -- if True, the template object model is compiled to generated Python code after parsing (see Template.compile)
+			parser : str | type -- the parser backend used to parse the HTML: 'htmlparser' (the default), 'scanner' or 'expat' (see parserbackends), or a Builder subclass
+			include : function | None -- a function that takes the template name given in an include directive (e.g. node="inc:nav.html") and returns the Template to include; TemplateLoader supplies this for the templates it loads
+			collapsewhitespace : bool -- if True, insignificant whitespace is removed from the template's static HTML after parsing (see Node.collapsewhitespace)
 			
 			Notes:
 			
@@ -645,11 +2605,19 @@ class Template(RichContent, Node):
 			
 			- If a custom encodeentity function is used, it must always encode the reserved &, < and " characters, otherwise the generated HTML will be malformed.
 		"""
-		parser = Parser(attribute, encodefn, isxhtml)
+		if isinstance(parser, str):
+			parser = parserbackends[parser]
+		parser = parser(attribute, encodefn, isxhtml)
+		if include is not None:
+			parser._include = include
 		parser.feed(html)
 		parser.close()
 		Node.__init__(self, '', encodefn)
 		RichContent.__init__(self, parser.result())
+		if collapsewhitespace:
+			self.collapsewhitespace()
+		if compiled:
+			self.compile()
 	
 	# Allow Template nodes to replace Container/Repeater nodes
 	_render = RichContent._rendercontent
@@ -659,5 +2627,791 @@ class Template(RichContent, Node):
 			
 			Result : Template
 		"""
-		return self._initrichclone(CloneNode(self)) # performance optimisation
+		return self._initrichclone(_clonenode(self)) # performance optimisation
+	
+	@classmethod
+	def load(cls, path, cache_dir=None, encoding='utf-8', **kwargs):
+		""" Read and parse an HTML template file.
+		
+			path : str -- path to the template file
+			cache_dir : str | None -- if given, path to a directory in which parsed templates are cached, so that later processes can load the template without parsing it again (see TemplateCache)
+			encoding : str -- the file's encoding
+			**kwargs : any -- any additional arguments to pass to Template.__init__()
+			Result : Template
+		"""
+		if cache_dir is not None:
+			return templatecache(cache_dir).load(path, encoding, **kwargs)
+		with open(path, encoding=encoding) as f:
+			return cls(f.read(), **kwargs)
+	
+	def compile(self):
+		""" Replace the generic tree-walking renderer used by this template and its sub-nodes with generated Python code that is specialised to the template's structure. Copies made after compiling are also compiled. The rendered HTML is unchanged.
+		"""
+		_compilenode(self)
+
+
+#####################################################################
+# TEMPLATE CACHE
+#####################################################################
+
+
+class TemplateCache:
+	""" A persistent on-disk cache of parsed templates. Each template's object model is pickled to a file whose name is a hash of the template's HTML and the settings it was parsed with, so later processes can rehydrate it without parsing the HTML again. Edited templates are stored under a new key; stale files are not removed until clear() is called.
+	
+		Notes:
+		
+		- Cache files are unpickled when loaded, so the cache directory must only be writable by trusted users.
+		
+		- A template can only be cached if its encodefn function can be pickled (i.e. it is defined at the top level of a module). Templates that can't be cached are parsed as normal, and counted as errors.
+		
+		- Templates that include other templates are never cached, as their object models also depend on the included templates. They are parsed as normal, but are not counted as errors.
+	"""
+	
+	_formatversion = 7 # change this when the object model's internal structure changes, so that existing cache files are ignored
+	
+	def __init__(self, dirpath):
+		"""
+			dirpath : str -- path to the cache directory; this is created if it doesn't already exist
+		"""
+		self.dirpath = dirpath
+		os.makedirs(dirpath, exist_ok=True)
+		self.hits = self.misses = self.errors = 0
+		self.parsetime = self.loadtime = self.savedtime = 0.0
+	
+	def __repr__(self):
+		return '<TemplateCache {!r}>'.format(self.dirpath)
+	
+	def _key(self, html, isxhtml, attribute, encodefn, parser):
+		encodename, parsername = ('{}.{}'.format(getattr(fn, '__module__', ''), getattr(fn, '__qualname__', repr(fn))) 
+				for fn in [encodefn, parserbackends.get(parser, parser)])
+		key = hashlib.sha256()
+		for s in [str(self._formatversion), repr(bool(isxhtml)), attribute, encodename, parsername, html]:
+			key.update(s.encode('utf-8', 'surrogatepass') + b'\0')
+		return key.hexdigest()
+	
+	def load(self, path, encoding='utf-8', isxhtml=True, attribute='node', encodefn=encodeentity, compiled=False, parser='htmlparser', include=None, 
+			collapsewhitespace=False):
+		""" Read an HTML template file, loading its object model from the cache if possible, else parsing it and adding it to the cache.
+		
+			path : str -- path to the template file
+			encoding : str -- the file's encoding
+			isxhtml, attribute, encodefn, compiled, parser, include, collapsewhitespace -- see Template.__init__()
+			Result : Template
+		"""
+		with open(path, encoding=encoding) as f:
+			html = f.read()
+		cachepath = os.path.join(self.dirpath, self._key(html, isxhtml, attribute, encodefn, parser) + '.pickle')
+		template = None
+		t = time.perf_counter()
+		try:
+			with open(cachepath, 'rb') as f:
+				parsetime, template = pickle.load(f)
+		except FileNotFoundError:
+			pass
+		except Exception: # corrupt or incompatible cache file; it will be replaced below
+			self.errors += 1
+		if template is None:
+			self.misses += 1
+			included = []
+			if include is not None:
+				def include(name, include=include):
+					included.append(name)
+					return include(name)
+			t = time.perf_counter()
+			template = Template(html, isxhtml, attribute, encodefn, parser=parser, include=include)
+			parsetime = time.perf_counter() - t
+			self.parsetime += parsetime
+			if not included:
+				self._write(cachepath, parsetime, template)
+		else:
+			self.hits += 1
+			loadtime = time.perf_counter() - t
+			self.loadtime += loadtime
+			self.savedtime += parsetime - loadtime
+		if collapsewhitespace: # templates are cached as parsed, so that the same cache file can be used either way
+			template.collapsewhitespace()
+		if compiled: # compiled nodes can't be pickled, so templates are always cached uncompiled
+			template.compile()
+		return template
+	
+	def _write(self, cachepath, parsetime, template):
+		try:
+			data = pickle.dumps((parsetime, template), pickle.HIGHEST_PROTOCOL)
+		except Exception: # e.g. encodefn is a lambda
+			self.errors += 1
+			return
+		fd, temppath = tempfile.mkstemp(suffix='.tmp', dir=self.dirpath)
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				f.write(data)
+			os.replace(temppath, cachepath) # atomic, so concurrent processes never read a partly written file
+		except OSError:
+			self.errors += 1
+			try:
+				os.remove(temppath)
+			except OSError:
+				pass
+	
+	def stats(self):
+		""" Get this cache's hit/miss statistics.
+		
+			Result : dict -- 'hits', 'misses' and 'errors' counts; total 'parsetime' (time spent parsing templates on misses), 'loadtime' (time spent loading templates on hits) and 'savedtime' (the time it originally took to parse the templates loaded on hits, minus loadtime), in seconds
+		"""
+		return {'hits': self.hits, 'misses': self.misses, 'errors': self.errors, 
+				'parsetime': self.parsetime, 'loadtime': self.loadtime, 'savedtime': self.savedtime}
+	
+	def clear(self):
+		""" Delete all cached templates. """
+		for name in os.listdir(self.dirpath):
+			if name.endswith('.pickle'):
+				os.remove(os.path.join(self.dirpath, name))
+
+
+_kTemplateCaches = {}
+
+def templatecache(dirpath):
+	""" Get the shared TemplateCache used by Template.load() for the given cache directory.
+	
+		dirpath : str -- path to the cache directory
+		Result : TemplateCache
+	"""
+	dirpath = os.path.abspath(dirpath)
+	try:
+		return _kTemplateCaches[dirpath]
+	except KeyError:
+		cache = _kTemplateCaches[dirpath] = TemplateCache(dirpath)
+		return cache
+
+
+#####################################################################
+# FRAGMENT CACHE
+#####################################################################
+
+
+class FragmentCache:
+	""" An in-memory cache of rendered HTML fragments, used by Container.cached(). Once the cache exceeds maxentries fragments or (estimated) maxbytes of memory, the least recently used fragments are discarded. Fragments can also be given a time to live, after which they are discarded and rendered again when next requested. The cache can be shared between threads.
+	"""
+	
+	def __init__(self, maxentries=1000, maxbytes=None, ttl=None):
+		"""
+			maxentries : int | None -- the maximum number of fragments to keep; if None, there is no limit
+			maxbytes : int | None -- the maximum (estimated) memory used by all fragments, in bytes; if None, there is no limit
+			ttl : float | None -- the default number of seconds for which a fragment is kept; if None, fragments are kept until evicted
+		"""
+		self.ttl = ttl
+		self._fragments = _LRUCache(maxentries, maxbytes) # key : (HTML, expiry time | None)
+		self._lock = threading.RLock()
+		self.hits = self.misses = self.expirations = 0
+	
+	def __repr__(self):
+		return '<{} {} entries>'.format(self.__class__.__name__, len(self._fragments))
+	
+	def get(self, key):
+		""" Get the HTML for the given key.
+		
+			key : any -- the fragment's key
+			Result : str | None -- the HTML, or None if it isn't cached or has expired
+		"""
+		with self._lock:
+			entry = self._fragments.get(key)
+			if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+				self._fragments.pop(key)
+				self.expirations += 1
+				entry = None
+			if entry is None:
+				self.misses += 1
+				return None
+			self.hits += 1
+			return entry[0]
+	
+	def set(self, key, html, ttl=None):
+		""" Add HTML to the cache, replacing any existing HTML for the given key.
+		
+			key : any -- the fragment's key
+			html : str -- the rendered HTML
+			ttl : float | None -- the number of seconds for which the HTML is kept; if None, the cache's default is used
+		"""
+		if ttl is None:
+			ttl = self.ttl
+		expires = None if ttl is None else time.monotonic() + ttl
+		with self._lock:
+			self._fragments.set(key, (html, expires), sys.getsizeof(html))
+	
+	def pop(self, key):
+		""" Discard the HTML for the given key, if it is cached.
+		
+			key : any -- the fragment's key
+		"""
+		with self._lock:
+			self._fragments.pop(key)
+	
+	def stats(self):
+		""" Get this cache's statistics.
+		
+			Result : dict -- 'hits', 'misses', 'expirations' and 'evictions' counts; the number of fragments currently cached ('entries') and their estimated total memory use ('bytes')
+		"""
+		with self._lock:
+			return {'hits': self.hits, 'misses': self.misses, 'expirations': self.expirations, 'evictions': self._fragments.evictions, 
+					'entries': len(self._fragments), 'bytes': self._fragments.size}
+	
+	def clear(self):
+		""" Discard all cached fragments. """
+		with self._lock:
+			self._fragments.clear()
+
+
+fragmentcache = FragmentCache() # the cache used by Container.cached() by default
+
+
+#####################################################################
+# RENDER CACHE
+#####################################################################
+
+
+class RenderCache(FragmentCache):
+	""" An in-memory cache of rendered pages and their ETags, used by Node.rendercached(), Node.renderitercached() and Node.cachedetag(). Limits and time to live are as for FragmentCache. The cache can be shared between threads.
+	"""
+	
+	def get(self, key):
+		""" Get the HTML and ETag for the given key.
+		
+			key : any -- the page's key
+			Result : tuple of (str, str) | None -- the HTML and its ETag, or None if it isn't cached or has expired
+		"""
+		return FragmentCache.get(self, key)
+	
+	def set(self, key, html, etag, ttl=None):
+		""" Add HTML to the cache, replacing any existing HTML for the given key.
+		
+			key : any -- the page's key
+			html : str -- the rendered HTML
+			etag : str -- the HTML's ETag
+			ttl : float | None -- the number of seconds for which the HTML is kept; if None, the cache's default is used
+		"""
+		if ttl is None:
+			ttl = self.ttl
+		expires = None if ttl is None else time.monotonic() + ttl
+		with self._lock:
+			self._fragments.set(key, ((html, etag), expires), sys.getsizeof(html) + sys.getsizeof(etag))
+
+
+rendercache = RenderCache() # the cache used by Node.rendercached(), etc. by default
+
+
+def _rendercachekey(node, fn, key, args, kwargs, encoding):
+	# The node and function are compared by identity, so a template that is reloaded (see TemplateLoader) or a lambda that is created for each call gets new keys.
+	if key is None:
+		try:
+			data = pickle.dumps((args, sorted(kwargs.items())), pickle.HIGHEST_PROTOCOL)
+		except Exception as e:
+			raise TypeError("Can't derive a render cache key from the function's arguments, as they can't be pickled: {}".format(e)) from e
+		key = hashlib.blake2b(data, digest_size=16).digest()
+	return node, fn, key, encoding
+
+
+def _etag(data):
+	# Calculate a strong ETag for the encoded HTML.
+	return '"{}"'.format(hashlib.blake2b(data, digest_size=16).hexdigest())
+
+
+def _itercached(collector, cache, key, ttl, buffersize, encoding):
+	# Yield the rendered chunks for Node.renderitercached(), calculating the ETag as they are yielded, then add the HTML to the cache.
+	chunks = []
+	encode = codecs.getincrementalencoder(encoding)().encode
+	h = hashlib.blake2b(digest_size=16)
+	for chunk in _bufferchunks(_iterchunks(collector), buffersize):
+		h.update(encode(chunk))
+		chunks.append(chunk)
+		yield chunk
+	h.update(encode('', True))
+	cache.set(key, ''.join(chunks), '"{}"'.format(h.hexdigest()), ttl)
+
+
+#####################################################################
+# TEMPLATE LOADER
+#####################################################################
+
+
+class TemplateLoader:
+	""" Loads templates by name from a directory. Each template file is parsed once and the resulting master template is kept in memory; callers are given copies of it, which they can modify as they like. Template files are checked for changes no more than once every checkinterval seconds, and are reloaded if they have been modified. If maxentries or maxbytes is given, the least recently used templates are discarded once the loader exceeds that many templates or (estimated) bytes of memory.
+	
+		Templates may include other templates from the same directory using include directives (e.g. node="inc:partials/nav.html"), where the name is relative to the template directory. Included templates are inlined when the including template is parsed, and a template is reloaded whenever any of the templates it includes (directly or indirectly) is modified. A ParseError is raised if a template includes itself.
+	"""
+	
+	def __init__(self, dirpath, checkinterval=2.0, maxentries=None, maxbytes=None, encoding='utf-8', cache_dir=None, **kwargs):
+		"""
+			dirpath : str -- path to the directory containing the template files
+			checkinterval : float | None -- the minimum time in seconds between checks for modified template files; if 0, templates are checked every time they are requested; if None, templates are never checked after they are loaded
+			maxentries : int | None -- the maximum number of templates to keep in memory; if None, there is no limit
+			maxbytes : int | None -- the maximum (estimated) memory used by all templates, in bytes; if None, there is no limit
+			encoding : str -- the template files' encoding
+			cache_dir : str | None -- if given, path to a directory in which parsed templates are cached on disk (see TemplateCache)
+			**kwargs : any -- any additional arguments to pass to Template.__init__() (e.g. compiled=True)
+		"""
+		self.dirpath = os.path.abspath(dirpath)
+		self.checkinterval, self.encoding, self.cache_dir, self._options = checkinterval, encoding, cache_dir, kwargs
+		self._templates = _LRUCache(maxentries, maxbytes) # name : [template, path, (mtime, size), lastchecked, {included path : (mtime, size)}]
+		self._loading = [] # names of the templates currently being parsed, used to detect include cycles
+		self._lock = threading.RLock()
+		self.reloads = 0
+	
+	def __repr__(self):
+		return '<TemplateLoader {!r}>'.format(self.dirpath)
+	
+	def _path(self, name):
+		path = os.path.abspath(os.path.join(self.dirpath, name))
+		if os.path.commonpath([self.dirpath, path]) != self.dirpath:
+			raise ValueError("Can't load template {!r}: it is outside the template directory.".format(name))
+		return path
+	
+	def _load(self, name, path):
+		stat = os.stat(path)
+		dependencies = {}
+		def include(includename):
+			includename = os.path.normpath(includename)
+			if includename in self._loading:
+				raise ParseError("Can't include template {!r}: include cycle {}.".format(
+						includename, ' -> '.join(self._loading[self._loading.index(includename):] + [includename])))
+			entry = self._entry(includename)
+			dependencies[entry[1]] = entry[2]
+			dependencies.update(entry[4])
+			return entry[0]
+		self._loading.append(os.path.normpath(name))
+		try:
+			template = Template.load(path, self.cache_dir, self.encoding, include=include, **self._options)
+		finally:
+			self._loading.pop()
+		entry = [template, path, (stat.st_mtime_ns, stat.st_size), time.monotonic(), dependencies]
+		self._templates.set(name, entry, _sizeof(template, set()))
+		return entry
+	
+	def _ischanged(self, entry):
+		# Check if a template file or any of the templates it includes have been modified since it was loaded.
+		for path, key in [(entry[1], entry[2])] + list(entry[4].items()):
+			stat = os.stat(path)
+			if (stat.st_mtime_ns, stat.st_size) != key:
+				return True
+		return False
+	
+	def _entry(self, name):
+		entry = self._templates.get(name)
+		if entry is None:
+			entry = self._load(name, self._path(name))
+		elif self.checkinterval is not None:
+			now = time.monotonic()
+			if now - entry[3] >= self.checkinterval:
+				entry[3] = now
+				try:
+					ischanged = self._ischanged(entry)
+				except OSError:
+					self._templates.pop(name)
+					raise
+				if ischanged:
+					self.reloads += 1
+					entry = self._load(name, entry[1])
+		return entry
+	
+	def template(self, name):
+		""" Get the master template for the given name. This should not be modified; use get() to obtain a copy that can be.
+		
+			name : str -- the template file's path, relative to the template directory
+			Result : Template
+		"""
+		with self._lock:
+			return self._entry(name)[0]
+	
+	def get(self, name):
+		""" Get a copy of the template for the given name.
+		
+			name : str -- the template file's path, relative to the template directory
+			Result : Template
+		"""
+		return self.template(name).copy()
+	
+	def render(self, name, fn, *args, **kwargs):
+		""" Render the template for the given name. See Node.render() for details.
+		
+			name : str -- the template file's path, relative to the template directory
+			fn : function | None -- the function that will insert content into a copy of the template
+			*args : any -- any additional arguments to pass to the function
+			**kwargs : any -- any additional arguments to pass to the function
+			Result : str -- the generated HTML
+		"""
+		return self.template(name).render(fn, *args, **kwargs)
+	
+	def stats(self):
+		""" Get this loader's statistics.
+		
+			Result : dict -- 'hits', 'misses', 'reloads' and 'evictions' counts; the number of templates currently loaded ('entries') and their estimated total memory use ('bytes')
+		"""
+		with self._lock:
+			cache = self._templates
+			return {'hits': cache.hits, 'misses': cache.misses, 'reloads': self.reloads, 'evictions': cache.evictions, 
+					'entries': len(cache), 'bytes': cache.size}
+	
+	def clear(self):
+		""" Discard all loaded templates. """
+		with self._lock:
+			self._templates.clear()
+
+
+#####################################################################
+# WEB SERVER ADAPTERS
+#####################################################################
 
+
+def _responseheaders(headers, encoding, length):
+	headers = list(headers or [])
+	if not any(name.lower() == 'content-type' for name, value in headers):
+		headers.append(('Content-Type', 'text/html; charset={}'.format(encoding)))
+	if length is not None:
+		headers.append(('Content-Length', str(length)))
+	return headers
+
+
+def _responsebody(collector, encoding, buffersize):
+	# Encode rendered chunks as a response body; returns (iterable of bytes, length in bytes | None). If none of the chunks are deferred (e.g. by Repeater.repeatlazy()), the body is encoded in advance, so that its length is known; otherwise it is encoded as it is rendered.
+	encoder = _chunkencoder(encoding)
+	try:
+		sum(map(len, collector))
+	except TypeError: # collector contains deferred chunks
+		return encoder.encode(_iterchunks(collector), buffersize), None
+	body = list(encoder.encode(collector, buffersize))
+	return body, sum(map(len, body))
+
+
+def wsgiresponse(start_response, node, fn=None, *args, status='200 OK', headers=None, buffersize=8192, encoding='utf-8', **kwargs):
+	""" Render a node as the response to a WSGI request, e.g. `return wsgiresponse(start_response, template, render_page, data)`. See Node.renderiterbytes() for details.
+	
+		start_response : function -- the WSGI start_response function
+		node : Node -- the node to render
+		fn : function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the node is rendered as-is
+		*args : any -- any additional arguments to pass to the function
+		status : str -- the HTTP status
+		headers : list of (str, str) | None -- any additional HTTP headers; a Content-Type header is added if not given, and a Content-Length header is added if the length of the response is known in advance
+		buffersize : int -- the minimum size of each chunk of the response, in characters
+		encoding : str -- the encoding used to convert the HTML to bytes
+		**kwargs : any -- any additional arguments to pass to the function
+		Result : iterable of bytes -- the response body, to be returned by the WSGI application
+	"""
+	if fn:
+		node = node.copy()
+		fn(node, *args, **kwargs)
+	collector = []
+	node._render(collector)
+	body, length = _responsebody(collector, encoding, buffersize)
+	start_response(status, _responseheaders(headers, encoding, length))
+	return body
+
+
+async def asgiresponse(send, node, fn=None, *args, status=200, headers=None, buffersize=8192, encoding='utf-8', **kwargs):
+	""" Render a node as the response to an ASGI HTTP request, e.g. `await asgiresponse(send, template, render_page, data)`. The response body is sent as one or more 'http.response.body' messages as it is rendered; see Node.renderiterasync() for details. 
+	
+		send : coroutine function -- the ASGI send function
+		node : Node -- the node to render
+		fn : function | coroutine function | None -- if given, the node is copied and passed to the function to manipulate before being rendered; if None, the node is rendered as-is
+		*args : any -- any additional arguments to pass to the function
+		status : int -- the HTTP status code
+		headers : list of (str, str) | None -- any additional HTTP headers (see wsgiresponse())
+		buffersize : int -- the minimum size of each message's body, in characters
+		encoding : str -- the encoding used to convert the HTML to bytes
+		**kwargs : any -- any additional arguments to pass to the function
+	"""
+	if fn:
+		node = node.copy()
+		result = fn(node, *args, **kwargs)
+		if inspect.isawaitable(result):
+			await result
+	collector = []
+	node._render(collector)
+	try:
+		sum(map(len, collector))
+	except TypeError: # collector contains deferred chunks, which may be rendered asynchronously
+		encode = codecs.getincrementalencoder(encoding)().encode
+		body, length = (encode(chunk) async for chunk in _abufferchunks(_aiterchunks(collector), buffersize or 1)), None
+	else:
+		body, length = _responsebody(collector, encoding, buffersize)
+		body = _aiter(body)
+	await send({'type': 'http.response.start', 'status': status, 'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) 
+			for name, value in _responseheaders(headers, encoding, length)]})
+	previous = b''
+	async for chunk in body:
+		if previous:
+			await send({'type': 'http.response.body', 'body': previous, 'more_body': True})
+		previous = chunk
+	await send({'type': 'http.response.body', 'body': previous, 'more_body': False})
+
+
+#####################################################################
+# PROFILER
+#####################################################################
+
+# While a Profiler is active, Node.render(), Repeater.add(), Container._renderstarttag(), _clonenode(), and RichContent.__getattr__() and __iter__() are replaced by wrappers that time each call. The times are recorded as a tree of frames: each node frame (e.g. 'rep:client') contains 'clone', 'callback' and 'starttag' frames for the time spent copying nodes, in the controller function and rendering tag attributes; the node frame's own time is that spent rendering. Each node frame is identified by the node's path in the template (e.g. ('tem:', 'con:nav', 'rep:link')): the node passed to a controller function has the path of the node being rendered or added to, each sub-node obtained from it has its path plus the sub-node's name, and copies of a node have the same path as the node. Node.render() and Repeater.add() render the node themselves, recording a frame for each Container sub-node that is rendered. The original functions are restored when the profiler exits, so profiling costs nothing when not in use.
+
+_kProfiler = None # the active Profiler, if any
+_kPhaseFrames = ('clone', 'callback', 'starttag')
+
+
+class _ProfileFrame:
+	
+	__slots__ = ('calls', 'omitted', 'time', 'childtime', 'bytes')
+	
+	def __init__(self):
+		self.calls = self.omitted = self.time = self.childtime = self.bytes = 0
+
+
+class Profiler:
+	""" Records where time is spent while rendering templates; see profile(). Profiling applies to all threads while active, but is intended for diagnosing one render at a time. """
+	
+	def __init__(self, encoding='utf-8'):
+		self.encoding = encoding # used to count the bytes rendered
+		self._frames = {} # node path, or node path plus phase frame name : _ProfileFrame
+		self._paths = {} # id(node) : (node, node path), for nodes that have been passed to or obtained by controller functions; the node is kept so that its id isn't reused
+		self._local = threading.local()
+		self._originals = None
+		self.time = 0 # total time profiled, in nanoseconds
+	
+	def __enter__(self):
+		global _kProfiler, _clonenode
+		if _kProfiler is not None:
+			raise RuntimeError("Can't start profiling: another Profiler is already active.")
+		_kProfiler = self
+		self._originals = (Node.render, Repeater.add, Container._renderstarttag, _clonenode, RichContent.__getattr__, RichContent.__iter__)
+		Node.render, Repeater.add, Container._renderstarttag, _clonenode, RichContent.__getattr__, RichContent.__iter__ = (
+				_profiledrender, _profiledadd, _profiledrenderstarttag, _profiledclonenode, _profiledgetattr, _profilediter)
+		self._start = time.perf_counter_ns()
+		return self
+	
+	def __exit__(self, *exc_info):
+		global _kProfiler, _clonenode
+		self.time += time.perf_counter_ns() - self._start
+		Node.render, Repeater.add, Container._renderstarttag, _clonenode, RichContent.__getattr__, RichContent.__iter__ = self._originals
+		_kProfiler = self._originals = None
+		self._paths.clear()
+	
+	def _path(self, node):
+		# Get a node's path; a node that wasn't passed to or obtained by a controller function is the root of its path.
+		entry = self._paths.get(id(node))
+		return ('{}:{}'.format(node._nodetype, node._nodename),) if entry is None else entry[1]
+	
+	def _setpath(self, node, path):
+		self._paths[id(node)] = (node, path)
+	
+	def _enter(self, key):
+		# key is a node path, or the name of a phase frame within the current frame
+		stack = self._local.__dict__.setdefault('stack', [])
+		if key.__class__ is str:
+			key = (stack[-1][0] + (key,)) if stack else (key,)
+		stack.append([key, time.perf_counter_ns(), 0]) # frame key, start time, time in child frames
+	
+	def _exit(self, size=0, omitted=0):
+		stack = self._local.stack
+		key, start, childtime = stack.pop()
+		elapsed = time.perf_counter_ns() - start
+		frame = self._frames.get(key)
+		if frame is None:
+			frame = self._frames[key] = _ProfileFrame()
+		frame.calls += 1
+		frame.omitted += omitted
+		frame.time += elapsed
+		frame.childtime += childtime
+		frame.bytes += size
+		if stack:
+			stack[-1][2] += elapsed
+	
+	def _size(self, chunks):
+		# Get the encoded size of the rendered chunks; deferred chunks (e.g. lazy repeater rows) aren't rendered yet, so aren't counted.
+		encoding = self.encoding
+		return sum(len(chunk.encode(encoding)) for chunk in chunks if isinstance(chunk, str))
+	
+	def stats(self):
+		""" Get the profiling results for each node.
+		
+			Result : dict -- node path (e.g. 'tem:/con:nav/rep:link') : dict of 'calls' (renders or additions), 'omitted', 'time' (total time in seconds, including 'callback', 'clone', 'starttag' and 'render'), 'bytes' (size of the HTML rendered, once encoded)
+		"""
+		result = {}
+		for key, frame in self._frames.items():
+			if key[-1] in _kPhaseFrames:
+				continue
+			path = '/'.join(key)
+			stats = result.setdefault(path, dict.fromkeys(['calls', 'omitted', 'time', 'callback', 'clone', 'starttag', 'render', 'bytes'], 0))
+			stats['calls'] += frame.calls
+			stats['omitted'] += frame.omitted
+			stats['time'] += frame.time / 1e9
+			stats['render'] += (frame.time - frame.childtime) / 1e9
+			stats['bytes'] += frame.bytes
+			for phase in _kPhaseFrames:
+				if key + (phase,) in self._frames:
+					stats[phase] += self._frames[key + (phase,)].time / 1e9
+		return result
+	
+	def report(self, limit=None):
+		""" Format the profiling results as a table, slowest nodes first. Times are in milliseconds; a node's time includes that of its sub-nodes and of any repeaters filled by its controller function.
+		
+			limit : int | None -- the maximum number of nodes to include
+			Result : str
+		"""
+		stats = sorted(self.stats().items(), key=lambda item: item[1]['time'], reverse=True)[:limit]
+		out = ['{:<40}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}'.format(
+				'node', 'calls', 'omitted', 'time', 'callback', 'clone', 'starttag', 'render', 'bytes')]
+		for path, s in stats:
+			out.append('{:<40}{:>8}{:>8}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}{:>10}'.format(path, s['calls'], s['omitted'], 
+					s['time'] * 1e3, s['callback'] * 1e3, s['clone'] * 1e3, s['starttag'] * 1e3, s['render'] * 1e3, s['bytes']))
+		out.append('total profiled time: {:.3f}ms'.format(self.time / 1e6))
+		return '\n'.join(out)
+	
+	def collapsed(self):
+		""" Format the profiling results in the 'collapsed stack' format used by flame graph tools (e.g. flamegraph.pl, speedscope): one line per frame, giving the frame's path and its own time in microseconds.
+		
+			Result : str
+		"""
+		return ''.join('{} {}\n'.format(';'.join(key), round((frame.time - frame.childtime) / 1e3))
+				for key, frame in sorted(self._frames.items()))
+
+
+def profile(encoding='utf-8'):
+	""" Profile template rendering, e.g. `with profile() as p: ...`, then `print(p.report())`.
+	
+		encoding : str -- the encoding used to count the bytes rendered
+		Result : Profiler
+	"""
+	return Profiler(encoding)
+
+
+def _profiledcallback(profiler, fn, node, path, args, kwargs):
+	# Call a controller function, recording the time spent in it; the node passed to it has the given path.
+	profiler._setpath(node, path)
+	profiler._enter('callback')
+	try:
+		return fn(node, *args, **kwargs)
+	finally:
+		profiler._exit()
+
+
+def _profiledcontent(node):
+	# Get the content list of a node that the profiler can render itself, or None if the node must render itself (e.g. it has no sub-nodes, or is a cached or custom node).
+	cls = node.__class__
+	base = getattr(cls, '_compiledbase', cls)
+	if not isinstance(node, RichContent) or base._rendercontent is not RichContent._rendercontent:
+		return None
+	if isinstance(node, Container):
+		if cls._render not in (Container._render, Repeater._render) or base._rendernode is not Container._rendernode:
+			return None
+	elif base._render is not RichContent._rendercontent:
+		return None
+	return node._RichContent__nodeslist
+
+
+def _profiledrendernode(profiler, node, L, collector, path):
+	# Render a node's tags and its content list L (see _profiledcontent), as the tree walker does, recording a frame for each Container sub-node. Repeaters are rendered as usual, as their copies are recorded by Repeater.add().
+	tags = isinstance(node, Container) and not node._Container__omittags
+	if tags:
+		collector.append(node._renderedstarttag or node._renderstarttag())
+	collector.append(L[0])
+	for i in range(1, len(L), 2):
+		subnode = L[i]
+		if isinstance(subnode, Container) and not isinstance(subnode, Repeater):
+			subpath = path + ('{}:{}'.format(subnode._nodetype, subnode._nodename),)
+			profiler._enter(subpath)
+			start = len(collector)
+			try:
+				subL = None if subnode._omit else _profiledcontent(subnode)
+				if subL is None:
+					subnode._render(collector)
+				else:
+					_profiledrendernode(profiler, subnode, subL, collector, subpath)
+			finally:
+				profiler._exit(profiler._size(collector[start:]), subnode._omit)
+		else:
+			subnode._render(collector)
+		collector.append(L[i + 1])
+	if tags:
+		collector.append(node._Container__endtag)
+
+
+def _profiledrender(self, fn=None, *args, **kwargs):
+	profiler = _kProfiler
+	path = profiler._path(self)
+	profiler._enter(path)
+	size = 0
+	try:
+		if fn:
+			self = self.copy()
+			_profiledcallback(profiler, fn, self, path, args, kwargs)
+		collector = []
+		L = None if isinstance(self, Container) and self._omit else _profiledcontent(self)
+		if L is None or isinstance(self, Repeater): # a repeater renders its copies
+			self._render(collector)
+		else:
+			_profiledrendernode(profiler, self, L, collector, path)
+		result = _joinchunks(collector)
+		size = len(result.encode(profiler.encoding))
+		return result
+	finally:
+		profiler._exit(size)
+		if not profiler._local.stack: # the nodes used by this render are no longer needed
+			profiler._paths.clear()
+
+
+def _profiledadd(self, fn, *args, **kwargs):
+	# Equivalent to Repeater.add(), but also records the path of the copy passed to the controller function, and a frame for each of its sub-nodes.
+	profiler = _kProfiler
+	path = profiler._path(self)
+	profiler._enter(path)
+	size = omitted = 0
+	try:
+		if self._renderedshared:
+			self._Repeater__ownrenderedcontent()
+		newnode = self._fastclone()
+		_profiledcallback(profiler, fn, newnode, path, args, kwargs)
+		omitted = newnode._omit
+		if not omitted:
+			rendered = self._Repeater__renderedcontent
+			rendered.append(newnode._sep)
+			start = len(rendered)
+			L = _profiledcontent(newnode)
+			if L is None:
+				newnode._rendernode(rendered)
+			else:
+				_profiledrendernode(profiler, newnode, L, rendered, path)
+			size = profiler._size(rendered[start:])
+	finally:
+		profiler._exit(size, omitted)
+
+
+def _profiledgetattr(self, name):
+	profiler = _kProfiler
+	node = profiler._originals[4](self, name)
+	profiler._setpath(node, profiler._path(self) + ('{}:{}'.format(node._nodetype, node._nodename),))
+	return node
+
+
+def _profilediter(self):
+	profiler = _kProfiler
+	path = profiler._path(self)
+	nodes = list(profiler._originals[5](self))
+	for node in nodes:
+		profiler._setpath(node, path + ('{}:{}'.format(node._nodetype, node._nodename),))
+	return iter(nodes)
+
+
+def _profiledrenderstarttag(self):
+	profiler = _kProfiler
+	profiler._enter('starttag')
+	try:
+		return profiler._originals[2](self)
+	finally:
+		profiler._exit()
+
+
+def _profiledclonenode(node):
+	profiler = _kProfiler
+	profiler._enter('clone')
+	try:
+		clone = profiler._originals[3](node)
+	finally:
+		profiler._exit()
+	entry = profiler._paths.get(id(node))
+	if entry is not None: # e.g. a copy of a sub-node, passed to Node.recurse()
+		profiler._setpath(clone, entry[1])
+	return clone
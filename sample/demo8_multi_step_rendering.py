@@ -45,6 +45,7 @@ def createsectiontemplate(sectiontitle, links):
 	node = template.copy()
 	node.sectiontitle.text = sectiontitle # set the part of the title common to all pages in a section
 	node.navbaritem.repeat(render_navbaritem, links) # render the navlinks common to all pages in a section
+	node.freeze('pagetitle', 'pageheading', 'bodyhtml') # render everything else as static HTML, so that it needn't be copied or rendered again for each page
 	return node
 
 
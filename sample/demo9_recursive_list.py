@@ -21,17 +21,18 @@ template = Template("""
 """)
 
 
+def render_list(node, datalist):
+	node.item.repeat(render_item, datalist)
+
 def render_item(node, dataitem):
 	if isinstance(dataitem, list):
 		# recursively render sub-list using original con:list node
-		listnode = template.list.copy()
-		listnode.item.repeat(render_item, dataitem)
-		node.html = listnode.render()
+		node.recurse(template.list, render_list, dataitem)
 	else:
 		node.text = str(dataitem)
 
 def render_template(node, datalist):
-	node.list.item.repeat(render_item, datalist)
+	render_list(node.list, datalist)
 
 #################################################
 # MAIN
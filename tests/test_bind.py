@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+# Tests Node.bind() and Node.renderdata().
+
+import unittest
+
+from htmltemplate import Template, Markup
+
+
+kHTML = '<h1 node="con:title">TITLE</h1><ul><li node="rep:item"><a node="con:link" href="#">LINK</a></li></ul><p node="con:footer">FOOTER</p>'
+
+
+class BindTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+
+	def test_renderdata(self):
+		data = {'title': 'A & B', 'item': [{'link': {'text': 'one', 'atts': {'href': '/1'}}}, {'link': Markup('<b>two</b>')}]}
+		self.assertEqual(self.template.renderdata(data),
+				'<h1>A &amp; B</h1><ul><li><a href="/1">one</a></li>\n<li><a href="#"><b>two</b></a></li></ul>')
+
+	def test_template(self):
+		# a template can only be bound to a dict or other mapping
+		for data in [None, False, True, 'text', Markup('<b>html</b>'), 42, [{'title': 'x'}], ({'title': 'x'},)]:
+			with self.subTest(data=data):
+				with self.assertRaises(TypeError):
+					self.template.renderdata(data)
+				with self.assertRaises(TypeError):
+					self.template.copy().bind(data)
+
+	def test_iterable(self):
+		with self.assertRaises(TypeError):
+			self.template.renderdata({'title': ['a', 'b']})
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# Tests Node.renderbytes(), Node.renderiterbytes() and Node.renderstream().
+
+import asyncio, sys, unittest
+
+import htmltemplate
+from htmltemplate import Template
+
+
+kHTML = '<html><head>{}</head><body><p node="con:para">PARA</p></body></html>'.format('<meta name="x" content="y" />' * 100)
+
+
+def render_page(node, text):
+	node.para.text = text
+
+
+class RenderBytesTest(unittest.TestCase):
+
+	def test_encodings(self):
+		template = Template(kHTML)
+		for text in ['short', 'longé ' * 1000]:
+			expected = template.render(render_page, text)
+			for encoding in ['utf-8', 'latin-1', 'utf-16']:
+				self.assertEqual(template.renderbytes(render_page, text, encoding=encoding), expected.encode(encoding))
+				self.assertEqual(b''.join(template.renderiterbytes(render_page, text, encoding=encoding, buffersize=100)),
+						expected.encode(encoding))
+
+	def test_renderstream(self):
+		class Writer:
+			def __init__(self):
+				self.chunks = []
+			def write(self, data):
+				self.chunks.append(data)
+			async def drain(self):
+				pass
+		template = Template(kHTML)
+		expected = template.render(render_page, 'longé ' * 1000)
+		for encoding in ['utf-8', 'latin-1', 'utf-16']:
+			writer = Writer()
+			asyncio.run(template.renderstream(writer, render_page, 'longé ' * 1000, buffersize=100, encoding=encoding))
+			self.assertGreater(len(writer.chunks), 1)
+			self.assertEqual(b''.join(writer.chunks).decode(encoding), expected)
+	
+	def test_encodercache(self):
+		# the encoder's cache counts the chunks as well as their bytes, and keeps the chunks that are used most recently
+		encoder = htmltemplate._ChunkEncoder('utf-8')
+		encoder._encoded.maxbytes = 200000
+		template = Template(kHTML)
+		static = template.render().split('<p>')[0]
+		for i in range(100):
+			chunks = [static, 'dynamic text {} '.format(i) * 100]
+			self.assertEqual(b''.join(encoder.encode(iter(chunks), None)), ''.join(chunks).encode('utf-8'))
+			self.assertIn(static, encoder._encoded)
+		self.assertLessEqual(encoder._encoded.size, 200000)
+		self.assertGreaterEqual(encoder._encoded.size, sum(sys.getsizeof(chunk) for chunk in encoder._encoded._entries))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Tests Container.cached() and FragmentCache.
+
+import asyncio, concurrent.futures, pickle, unittest
+
+from htmltemplate import Template, FragmentCache
+
+
+def render_nav(node, names):
+	node.link.repeat(render_link, names)
+
+def render_link(node, name):
+	node.text = name
+
+def render_cachedrow(node, name, cache):
+	node.cached(name, render_row, name, cache=cache)
+
+def render_row(node, name):
+	node.name.text = name
+
+
+class CachedTest(unittest.TestCase):
+
+	def setUp(self):
+		self.cache = FragmentCache()
+
+	def render(self, template, names, key):
+		def render_page(node):
+			node.nav.cached(key, render_nav, names, cache=self.cache)
+		return template.render(render_page)
+
+	def test_cached(self):
+		template = Template('<ul node="con:nav"><li node="rep:link">LINK</li></ul>')
+		self.assertEqual(self.render(template, ['a', 'b'], 'ab'), '<ul><li>a</li>\n<li>b</li></ul>')
+		self.assertEqual(self.render(template, ['x'], 'ab'), '<ul><li>a</li>\n<li>b</li></ul>')
+		self.assertEqual(self.render(template.copy(), ['x'], 'ab'), '<ul><li>a</li>\n<li>b</li></ul>')
+		self.assertEqual(self.render(template, ['x'], 'x'), '<ul><li>x</li></ul>')
+		self.assertEqual(self.cache.stats()['entries'], 2)
+
+	def test_templates(self):
+		# nodes with the same name in different templates don't share cached HTML
+		t1 = Template('<ul node="con:nav"><li node="rep:link">LINK</li></ul>')
+		t2 = Template('<div node="con:nav"><p node="rep:link">LINK</p></div>')
+		self.assertEqual(self.render(t1, ['a'], 'a'), '<ul><li>a</li></ul>')
+		self.assertEqual(self.render(t2, ['a'], 'a'), '<div><p>a</p></div>')
+		t3 = Template('<ul node="con:nav"><li node="rep:link">LINK</li></ul>')
+		self.assertEqual(self.render(t3, ['b'], 'a'), '<ul><li>b</li></ul>')
+		self.assertEqual(self.render(pickle.loads(pickle.dumps(t1)), ['c'], 'a'), '<ul><li>c</li></ul>')
+
+	def test_rows(self):
+		# a row's cached HTML is that of the row itself, whichever method renders the rows
+		html = '<ul><li node="rep:row"><b node="con:name">NAME</b></li></ul>'
+		names = ['a', 'a', 'b', 'a']
+		expected = '<ul><li><b>a</b></li>\n<li><b>a</b></li>\n<li><b>b</b></li>\n<li><b>a</b></li></ul>'
+		async def addasync(node):
+			for name in names:
+				await node.row.addasync(render_cachedrow, name, self.cache)
+		with concurrent.futures.ThreadPoolExecutor(2) as executor:
+			for compiled in (False, True):
+				template = Template(html, compiled=compiled)
+				for render in [lambda: template.render(lambda node: node.row.repeat(render_cachedrow, names, self.cache)),
+						lambda: ''.join(template.renderiter(lambda node: node.row.repeatlazy(render_cachedrow, names, self.cache))),
+						lambda: template.render(lambda node: node.row.repeatparallel(render_cachedrow, names, self.cache, executor=executor, chunksize=1)),
+						lambda: asyncio.run(template.renderasync(addasync))]:
+					with self.subTest(compiled=compiled, render=render):
+						self.cache.clear()
+						self.assertEqual(render(), expected)
+						self.assertEqual(render(), expected)
+		self.assertEqual(self.cache.stats()['entries'], 2)
+		# the node that rows are copied from caches the rows added by its controller function
+		template = Template('<ul><li node="rep:link">LINK</li></ul>')
+		render = lambda names: template.render(lambda node: node.link.cached('k', lambda node: node.repeat(render_link, names), cache=self.cache))
+		self.assertEqual(render(['x', 'y']), '<ul><li>x</li>\n<li>y</li></ul>')
+		self.assertEqual(render([]), '<ul><li>x</li>\n<li>y</li></ul>')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Tests that compiled templates render the same HTML as uncompiled templates.
+
+import gc, pickle, unittest, weakref
+
+import htmltemplate
+from htmltemplate import Template, Fragment
+
+
+kPageHTML = '<html><title node="con:title">TITLE</title><div node="con:body"><p node="con:para">PARA</p></div></html>'
+kSectionHTML = '<section><h1 node="con:heading">HEADING</h1></section>'
+kTableHTML = '''<table><tr node="rep:row"><td node="con:name">NAME</td><td><a node="con:link" href="#">LINK</a></td>
+<td node="rep:cell">CELL</td></tr></table>'''
+
+
+def render_page(node, title, body):
+	node.title.text = title
+	node.body.html = body
+
+def render_section(node, heading):
+	node.heading.text = heading
+
+def render_table(node, rows):
+	node.row.repeat(render_row, rows)
+
+def render_row(node, i):
+	node.name.text = 'Name {}'.format(i)
+	node.link.atts['href'] = '/{}'.format(i)
+	if i % 3 == 0:
+		node.link.omit()
+	if i % 4 == 0:
+		node.name = Template('<b node="con:b">B</b>').b # grafted nodes are rendered by their own class
+	node.cell.repeat(render_cell, range(i % 3))
+
+def render_cell(node, j):
+	if j == 1:
+		node.atts['class'] = 'odd'
+	node.text = j
+
+
+class FragmentChunkTest(unittest.TestCase):
+	# A rich node whose html is set to a Fragment has that Fragment as its only static chunk.
+
+	def fragments(self):
+		section = Template(kSectionHTML)
+		yield section.renderfragment(render_section, 'Lazy', lazy=True)
+		yield Fragment([section.render(render_section, 'Large') + 'x' * 70000])
+
+	def test_compile(self):
+		for fragment in self.fragments():
+			template = Template(kPageHTML)
+			expected = template.render(render_page, 'Title', fragment)
+			template.body.html = fragment
+			template.title.text = 'Title'
+			template.compile()
+			self.assertEqual(template.render(), expected)
+			self.assertEqual(template.copy().render(), expected)
+
+	def test_freeze(self):
+		for fragment in self.fragments():
+			template = Template(kPageHTML, compiled=True)
+			expected = template.render(render_page, 'Title', fragment)
+			template.body.html = fragment
+			template.title.text = 'Title'
+			template.freeze('body')
+			self.assertEqual(template.render(), expected)
+			template.body.freeze()
+			self.assertEqual(template.render(), expected)
+
+
+class RowsTest(unittest.TestCase):
+	# Compiled repeaters copy and render their rows without calling the generic methods.
+
+	def test_rows(self):
+		expected = Template(kTableHTML).render(render_table, range(12))
+		template = Template(kTableHTML, compiled=True)
+		self.assertIsNot(template.row.__class__, htmltemplate.RichRepeater)
+		self.assertIsNot(template.row.cell.__class__, htmltemplate.PlainRepeater)
+		self.assertEqual(template.render(render_table, range(12)), expected)
+		self.assertEqual(template.copy().render(render_table, range(12)), expected)
+		self.assertEqual(pickle.loads(pickle.dumps(template)).render(render_table, range(12)), expected)
+		with htmltemplate.profile():
+			self.assertEqual(template.render(render_table, range(12)), expected)
+
+	def test_replacedcontent(self):
+		# a compiled node whose content is replaced reverts to its base class, so its sub-nodes are no longer attributes
+		template = Template(kTableHTML, compiled=True)
+		row = template.row
+		self.assertEqual(row.name.nodename, 'name')
+		row.text = 'Text'
+		self.assertIs(row.__class__, htmltemplate.RichRepeater)
+		self.assertFalse(hasattr(row, 'name'))
+		row.name = 'x'
+		self.assertEqual(row.name, 'x')
+		self.assertEqual(template.render(lambda node: node.row.add(lambda row: None)), '<table><tr>Text</tr></table>')
+
+
+class CompiledClassesTest(unittest.TestCase):
+
+	def setUp(self):
+		self.classes = htmltemplate._kCompiledClasses
+		htmltemplate._kCompiledClasses = htmltemplate._LRUCache(10, 100000)
+
+	def tearDown(self):
+		htmltemplate._kCompiledClasses = self.classes
+
+	def test_freeze(self):
+		# each freeze generates a class for the node's new content; only the most recently used are kept
+		template = Template(kPageHTML, compiled=True)
+		classes = []
+		for i in range(100):
+			node = template.copy()
+			node.title.text = 'Title {}'.format(i) + 'x' * 5000
+			node.freeze('body')
+			self.assertEqual(node.render(), template.render(render_page, 'Title {}'.format(i) + 'x' * 5000, '<p>PARA</p>'))
+			node = node.copy() # generates the class's clone function
+			classes.append(weakref.ref(node.__class__))
+			self.assertLessEqual(len(htmltemplate._kCompiledClasses), 10)
+			self.assertLessEqual(htmltemplate._kCompiledClasses.size, 100000)
+		self.assertEqual(template.copy().render(), template.render())
+		# classes that have been discarded aren't kept alive by their clone functions
+		del node
+		gc.collect()
+		self.assertLessEqual(sum(1 for cls in classes if cls() is not None), 10)
+
+	def test_names(self):
+		# nodes with the same markup but differently named sub-nodes don't share a class
+		html = '<div node="con:a"><b node="con:x">1</b></div><div node="con:c"><b node="con:y">1</b></div>'
+		for compiled in (False, True):
+			with self.subTest(compiled=compiled):
+				template = Template(html, compiled=compiled)
+				self.assertFalse(hasattr(template.c, 'x'))
+				self.assertEqual(template.c.y.nodename, 'y')
+				template.c.x = 'value'
+				self.assertEqual(template.c.x, 'value')
+				self.assertEqual(template.render(), '<div><b>1</b></div><div><b>1</b></div>')
+
+
+if __name__ == '__main__':
+	unittest.main()
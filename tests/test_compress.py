@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Tests Node.rendercompressed() and Node.renderitercompressed(), comparing their output with zlib's compression of render().encode().
+
+import unittest, zlib
+
+import htmltemplate
+from htmltemplate import Template
+
+
+kHTML = '<!DOCTYPE html>\n<html><head>{}</head><body><p node="con:para">PARA</p><ul><li node="rep:item">ITEM</li></ul></body></html>'.format(
+		''.join('<meta name="x{}" content="y" />'.format(i) for i in range(50)))
+
+kFormats = {'gzip': 31, 'deflate': 15}
+
+
+def render_page(node, text, items):
+	node.para.text = text
+	node.item.repeat(render_item, items)
+
+def render_item(node, item):
+	node.text = item
+
+
+def compress(html, format, level=6, encoding='utf-8'):
+	compressor = zlib.compressobj(level, zlib.DEFLATED, kFormats[format])
+	return compressor.compress(html.encode(encoding)) + compressor.flush()
+
+def decompress(data, format):
+	return zlib.decompress(data, kFormats[format])
+
+
+class RenderCompressedTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+		self.args = ('tëxt', ['item {}'.format(i) for i in range(200)])
+		self.expected = self.template.render(render_page, *self.args)
+
+	def test_rendercompressed(self):
+		htmltemplate._kCompressedPrefixes.clear()
+		for format in kFormats:
+			for level in [1, 6, 9]:
+				with self.subTest(format=format, level=level):
+					expected = compress(self.expected, format, level)
+					for i in range(2): # the first render compresses the leading static HTML; the second reuses it
+						self.assertEqual(self.template.rendercompressed(render_page, *self.args, format=format, level=level), expected)
+		self.assertEqual(len(htmltemplate._kCompressedPrefixes), 6)
+		# the compressed prefix is only reused for the same leading HTML
+		html = self.template.render(lambda node: setattr(node.para, 'text', 'other'))
+		self.assertEqual(self.template.rendercompressed(lambda node: setattr(node.para, 'text', 'other')), compress(html, 'gzip'))
+
+	def test_renderitercompressed(self):
+		for format in kFormats:
+			with self.subTest(format=format):
+				chunks = list(self.template.renderitercompressed(render_page, *self.args, format=format))
+				self.assertEqual(b''.join(chunks), compress(self.expected, format))
+				chunks = list(self.template.renderitercompressed(render_page, *self.args, format=format, buffersize=500, flush=True))
+				self.assertGreater(len(chunks), 2)
+				decompressor = zlib.decompressobj(kFormats[format])
+				html = b''
+				for chunk in chunks[:-1]: # each flushed chunk can be decompressed as soon as it is received
+					html += decompressor.decompress(chunk)
+					self.assertTrue(self.expected.encode('utf-8').startswith(html))
+				self.assertEqual((html + decompressor.decompress(chunks[-1]) + decompressor.flush()).decode('utf-8'), self.expected)
+
+	def test_noprefix(self):
+		# short leading HTML, and encodings that start with a BOM, are compressed in full every time
+		template = Template('<p node="con:para">PARA</p><li node="rep:item">ITEM</li>')
+		self.assertEqual(template.rendercompressed(render_page, 'x', [], format='deflate'), compress('<p>x</p>', 'deflate'))
+		self.assertEqual(b''.join(template.renderitercompressed(render_page, 'x', [], format='deflate')), compress('<p>x</p>', 'deflate'))
+		for i in range(2):
+			data = self.template.rendercompressed(render_page, *self.args, encoding='utf-16')
+			self.assertEqual(decompress(data, 'gzip').decode('utf-16'), self.expected)
+			data = b''.join(self.template.renderitercompressed(render_page, *self.args, encoding='utf-16', buffersize=100))
+			self.assertEqual(decompress(data, 'gzip').decode('utf-16'), self.expected)
+
+	def test_format(self):
+		for format in ['br', 'GZIP', None]:
+			with self.subTest(format=format):
+				with self.assertRaisesRegex(ValueError, 'unknown format'):
+					self.template.rendercompressed(render_page, *self.args, format=format)
+				with self.assertRaisesRegex(ValueError, 'unknown format'):
+					list(self.template.renderitercompressed(render_page, *self.args, format=format))
+
+
+if __name__ == '__main__':
+	unittest.main()
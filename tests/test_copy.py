@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Tests that copies of a node are independent of the original, including when the original's sub-nodes are modified through references obtained before it was copied.
+
+import unittest
+
+from htmltemplate import Template
+
+
+kHTML = '''<div node="con:a"><b node="con:x">X</b> <i node="con:y">Y</i></div>
+<a node="con:link" href="/">LINK</a>
+<ul><li node="rep:item">ITEM</li></ul>'''
+
+
+def render_item(node, name):
+	node.text = name
+
+
+class CopyTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+		self.expected = self.template.render()
+
+	def test_copy(self):
+		t2 = self.template.copy()
+		t2.a.x.text = 'Q'
+		t2.link.atts['href'] = '/changed'
+		t2.item.repeat(render_item, ['one', 'two'])
+		self.assertEqual(self.template.render(), self.expected)
+		t3 = t2.copy()
+		t3.a.x.text = 'R'
+		self.assertIn('<b>Q</b>', t2.render())
+		self.assertIn('<b>R</b>', t3.render())
+
+	def test_heldcontainer(self):
+		a = self.template.a
+		t2 = self.template.copy()
+		a.x.text = 'Q'
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<b>Q</b>', self.template.render())
+
+	def test_heldsubnode(self):
+		x = self.template.a.x
+		t2 = self.template.copy()
+		x.text = 'Q'
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<b>Q</b>', self.template.render())
+
+	def test_heldleaf(self):
+		link = self.template.link
+		t2 = self.template.copy()
+		link.atts['href'] = '/changed'
+		link.text = 'CHANGED'
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<a href="/changed">CHANGED</a>', self.template.render())
+
+	def test_heldattributes(self):
+		atts = self.template.link.atts
+		t2 = self.template.copy()
+		atts['href'] = '/changed'
+		del atts['href']
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<a>LINK</a>', self.template.render())
+
+	def test_heldrepeater(self):
+		item = self.template.item
+		t2 = self.template.copy()
+		item.repeat(render_item, ['one', 'two'])
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<li>one</li>', self.template.render())
+
+	def test_helditerated(self):
+		nodes = list(self.template)
+		t2 = self.template.copy()
+		for node in nodes:
+			node.omit()
+		self.assertEqual(t2.render(), self.expected)
+		self.assertEqual(self.template.render().strip(), '<ul></ul>')
+
+	def test_iteratecopy(self):
+		self.template.a
+		t2 = self.template.copy()
+		self.assertEqual([node.nodename for node in t2], ['a', 'link', 'item'])
+		self.assertEqual([node.nodename for node in self.template], ['a', 'link', 'item'])
+		self.assertEqual(t2.render(), self.expected)
+
+	def test_heldcompiled(self):
+		template = Template(kHTML, compiled=True)
+		a = template.a
+		t2 = template.copy()
+		a.x.text = 'Q'
+		self.assertEqual(t2.render(), self.expected)
+		self.assertIn('<b>Q</b>', template.render())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# Tests Repeater.fillrows(), comparing its output with the equivalent Repeater.repeat() calls.
+
+import unittest
+
+from htmltemplate import Template
+
+
+kTableHTML = '''<table><tr node="rep:row"><td node="con:name">NAME</td><td width="50%"><b node="con:score">0</b>%</td>
+<td node="-con:note">NOTE</td></tr></table>'''
+
+
+def render_row(node, name, score, note='NOTE'):
+	node.name.text = name
+	node.score.text = score
+	node.note.text = note
+
+
+class FillRowsTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kTableHTML)
+		self.rows = [('Smith & Co', 50, 'a < b'), ('100% Jones', 7.5, '%s %d')]
+
+	def fill(self, *args, template=None, **kwargs):
+		node = (template or self.template).copy()
+		node.row.fillrows(*args, **kwargs)
+		return node.render()
+
+	def repeat(self, rows, fn=render_row):
+		return self.template.render(lambda node: node.row.repeat(lambda node, row: fn(node, *row), rows))
+
+	def test_tuples(self):
+		expected = self.repeat(self.rows)
+		self.assertEqual(self.fill(self.rows), expected)
+		self.assertEqual(self.fill(self.rows, template=Template(kTableHTML, compiled=True)), expected)
+		self.assertEqual(self.fill(iter(self.rows)), expected)
+		# fewer values than sub-nodes: the remaining sub-nodes are rendered as they are
+		self.assertEqual(self.fill([row[:2] for row in self.rows]), self.repeat([row[:2] for row in self.rows]))
+		self.assertEqual(self.fill([]), self.repeat([]))
+
+	def test_dicts(self):
+		expected = self.repeat(self.rows)
+		self.assertEqual(self.fill([{'name': name, 'score': score, 'note': note, 'other': 0} for name, score, note in self.rows]), expected)
+		self.assertEqual(self.fill([{'a': name, 'b': score, 'c': note} for name, score, note in self.rows],
+				columns={'name': 'a', 'score': 'b', 'note': 'c'}), expected)
+		self.assertEqual(self.fill([(note, score, name) for name, score, note in self.rows],
+				columns={'name': 2, 'score': 1, 'note': 0}), expected)
+		with self.assertRaises(ValueError):
+			self.fill(self.rows, columns={'nosuchnode': 0})
+
+	def test_columns(self):
+		columns = {'name': [row[0] for row in self.rows], 'score': [row[1] for row in self.rows], 'note': [row[2] for row in self.rows]}
+		self.assertEqual(self.fill(columns), self.repeat(self.rows))
+		with self.assertRaises(ValueError):
+			self.fill({'name': ['a', 'b'], 'score': [1]})
+
+	def test_formatters(self):
+		rows = [('a', 0.5, '<i>x</i>'), ('b', 0.25, '<i>y</i>')]
+		expected = self.repeat(rows, lambda node, name, score, note: (
+				setattr(node.name, 'text', name.upper()), setattr(node.score, 'html', '<em>{:.0%}</em>'.format(score)), setattr(node.note, 'html', note)))
+		self.assertEqual(self.fill(rows, formatters={'name': str.upper, 'score': '<em>{:.0%}</em>'.format}, encoders={'score': None, 'note': None}),
+				expected)
+		self.assertIn('<b><em>50%</em></b>%', expected)
+
+	def test_omitted(self):
+		node = self.template.copy()
+		node.row.score.omit()
+		node.row.fillrows(self.rows)
+		self.assertEqual(node.render(), self.repeat(self.rows, lambda node, name, score, note: (
+				render_row(node, name, score, note), node.score.omit())))
+
+	def test_plain(self):
+		template = Template('<ul><li node="rep:item" class="100%">ITEM</li></ul>')
+		node = template.copy()
+		node.item.fillrows(['a & b', 5, '%'])
+		self.assertEqual(node.render(), template.render(lambda node: node.item.repeat(
+				lambda node, value: setattr(node, 'text', value), ['a & b', 5, '%'])))
+		with self.assertRaises(ValueError):
+			template.copy().item.fillrows(['a'], columns={'item': 0})
+		with self.assertRaises(TypeError):
+			template.copy().item.fillrows({'item': ['a']})
+
+	def test_errors(self):
+		template = Template('<ul><li node="rep:item"><a node="con:link"><b node="con:b">B</b></a></li><br node="rep:empty" /></ul>')
+		with self.assertRaises(TypeError): # a filled sub-node can't have sub-nodes of its own
+			template.copy().item.fillrows([('a',)])
+		with self.assertRaises(TypeError):
+			template.copy().empty.fillrows(['a'])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Tests include directives (e.g. node="inc:nav.html").
+
+import os, tempfile, unittest
+
+from htmltemplate import Template, TemplateLoader, ParseError
+
+
+kTemplates = {
+	'nav.html': '<ul node="con:nav"><li node="rep:link">LINK</li></ul><p node="con:note">NOTE</p>',
+	'layout.html': '<header node="con:header">HEADER</header><main node="con:main">MAIN</main>',
+}
+
+
+def include(name):
+	return Template(kTemplates[name])
+
+def render_page(node):
+	node.nav.link.repeat(render_link, ['a', 'b'])
+
+def render_link(node, name):
+	node.text = name
+
+
+class IncludeTest(unittest.TestCase):
+
+	def test_include(self):
+		template = Template('<body><nav node="inc:nav.html">IGNORED</nav><p node="con:footer">FOOTER</p></body>', include=include)
+		self.assertEqual([node.nodename for node in template], ['nav', 'note', 'footer'])
+		self.assertEqual(template.render(render_page),
+				'<body><nav><ul><li>a</li>\n<li>b</li></ul><p>NOTE</p></nav><p>FOOTER</p></body>')
+		# the included template's nodes are copies, so the included template isn't affected
+		nav = include('nav.html')
+		template = Template('<div node="-inc:nav.html" />', include=lambda name: nav)
+		template.note.text = 'changed'
+		self.assertEqual(nav.note.text, 'NOTE')
+
+	def test_omittags(self):
+		template = Template('<body><div node="-inc:nav.html"></div></body>', include=include)
+		self.assertEqual(template.render(render_page), '<body><ul><li>a</li>\n<li>b</li></ul><p>NOTE</p></body>')
+
+	def test_overrides(self):
+		# nodes defined in the include element replace the included template's nodes of the same name
+		template = Template('<div node="-inc:layout.html"><main node="con:main"><h1 node="con:title">TITLE</h1></main></div>', include=include)
+		self.assertEqual([node.nodename for node in template], ['header', 'main'])
+		template.main.title.text = 'Title'
+		self.assertEqual(template.render(), '<header>HEADER</header><main><h1>Title</h1></main>')
+		self.assertEqual(include('layout.html').render(), '<header>HEADER</header><main>MAIN</main>')
+
+	def test_errors(self):
+		for html, message in [
+				('<p node="con:nav">NAV</p><div node="inc:nav.html" />', "Duplicate node name: 'nav'"),
+				('<div node="inc:nav.html" /><p node="con:note">NOTE</p>', "Duplicate node name: 'note'"),
+				('<div node="inc:layout.html"><p node="con:footer">FOOTER</p></div>', "no node named 'footer' to replace"),
+				]:
+			with self.subTest(html=html):
+				with self.assertRaisesRegex(ParseError, message):
+					Template(html, include=include)
+		with self.assertRaisesRegex(ParseError, 'no include function'):
+			Template('<div node="inc:nav.html" />')
+
+	def test_cycle(self):
+		with tempfile.TemporaryDirectory() as dirpath:
+			for name, html in [('a.html', '<div node="inc:b.html" />'), ('b.html', '<p node="-inc:c.html" />'), ('c.html', '<b node="inc:a.html" />')]:
+				with open(os.path.join(dirpath, name), 'w', encoding='utf-8') as f:
+					f.write(html)
+			loader = TemplateLoader(dirpath)
+			with self.assertRaises(ParseError) as cm:
+				loader.template('a.html')
+			self.assertIn('a.html -> b.html -> c.html -> a.html', str(cm.exception))
+
+
+if __name__ == '__main__':
+	unittest.main()
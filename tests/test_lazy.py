@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# Tests Repeater.repeatlazy(), comparing its output with Repeater.add() and Repeater.repeat().
+
+import asyncio, unittest
+
+from htmltemplate import Template
+
+
+kHTML = '<html><ul><li node="rep:item"><b node="con:name">NAME</b></li></ul><p node="con:footer">FOOTER</p></html>'
+
+
+def render_item(node, item, suffix=''):
+	if item is None:
+		node.omit()
+	node.name.text = '{}{}'.format(item, suffix)
+
+async def render_itemasync(node, item, suffix=''):
+	await asyncio.sleep(0)
+	render_item(node, item, suffix)
+
+async def aiterate(items):
+	for item in items:
+		await asyncio.sleep(0)
+		yield item
+
+
+def render_mixed(node, items):
+	# eager rows, before, between and after lazy rows
+	node.item.add(render_item, 'first')
+	node.item.repeatlazy(render_item, items, '!')
+	node.item.add(render_item, 'middle', suffix='?')
+	node.item.repeatlazy(render_item, items)
+	node.item.add(render_item, 'last')
+	node.footer.text = 'done'
+
+def render_eager(node, items):
+	node.item.add(render_item, 'first')
+	node.item.repeat(render_item, items, '!')
+	node.item.add(render_item, 'middle', suffix='?')
+	node.item.repeat(render_item, items)
+	node.item.add(render_item, 'last')
+	node.footer.text = 'done'
+
+
+class RepeatLazyTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+		self.items = ['a & b', None, 'c'] + ['item {}'.format(i) for i in range(100)]
+		self.expected = self.template.render(render_eager, self.items)
+
+	def test_render(self):
+		node = self.template.copy()
+		render_mixed(node, self.items)
+		self.assertEqual(node.render(), self.expected)
+		self.assertEqual(node.render(), self.expected) # a list can be rendered again
+		for buffersize in [0, 10, 8192]:
+			with self.subTest(buffersize=buffersize):
+				chunks = list(node.renderiter(buffersize=buffersize))
+				self.assertEqual(''.join(chunks), self.expected)
+		self.assertEqual(node.renderbytes(), self.expected.encode('utf-8'))
+		self.assertEqual(node.copy().render(), self.expected)
+		self.assertEqual(self.template.render(render_mixed, self.items), self.expected)
+		self.assertEqual(self.template.render(), '<html><ul></ul><p>FOOTER</p></html>')
+
+	def test_deferred(self):
+		# items are only rendered when the template is, so changes to them until then are included
+		items = ['a']
+		node = self.template.copy()
+		node.item.repeatlazy(render_item, items)
+		items.append('b')
+		self.assertEqual(node.render(), '<html><ul><li><b>a</b></li>\n<li><b>b</b></li></ul><p>FOOTER</p></html>')
+		node = self.template.copy()
+		node.item.repeatlazy(render_item, [None, None])
+		self.assertEqual(node.render(), '<html><ul></ul><p>FOOTER</p></html>')
+
+	def test_consumed(self):
+		# a one-shot iterator (e.g. a generator or database cursor) can only be rendered once
+		expected = self.template.render(lambda node: (node.item.add(render_item, 'first'), node.item.repeat(render_item, self.items)))
+		for name, method in [('render', lambda node: node.render()), ('renderiter', lambda node: ''.join(node.renderiter())),
+				('renderbytes', lambda node: node.renderbytes().decode('utf-8'))]:
+			with self.subTest(method=name):
+				node = self.template.copy()
+				node.item.add(render_item, 'first')
+				node.item.repeatlazy(render_item, (item for item in self.items))
+				self.assertEqual(method(node), expected)
+				with self.assertRaisesRegex(RuntimeError, 'already been consumed'):
+					method(node)
+
+	def test_coroutine(self):
+		node = self.template.copy()
+		node.item.add(render_item, 'first')
+		node.item.repeatlazy(render_itemasync, self.items)
+		for method in [node.render, lambda: ''.join(node.renderiter()), node.renderbytes]:
+			with self.assertRaisesRegex(TypeError, 'coroutine function'):
+				method()
+		expected = self.template.render(lambda node: (node.item.add(render_item, 'first'), node.item.repeat(render_item, self.items)))
+		self.assertEqual(asyncio.run(node.renderasync()), expected)
+		node = self.template.copy()
+		node.item.repeatlazy(render_item, aiterate(self.items))
+		with self.assertRaisesRegex(TypeError, 'asynchronous iterable'):
+			node.render()
+		self.assertEqual(asyncio.run(node.renderasync()), self.template.render(lambda node: node.item.repeat(render_item, self.items)))
+
+
+if __name__ == '__main__':
+	unittest.main()
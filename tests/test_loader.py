@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Tests TemplateLoader, using a temporary template directory.
+
+import os, tempfile, unittest
+
+from htmltemplate import TemplateLoader, ParseError
+
+
+kPageHTML = '<html><title node="con:title">TITLE</title><div node="inc:nav.html"></div></html>'
+kNavHTML = '<ul node="con:nav"><li node="con:link">LINK</li></ul>'
+
+
+def render_page(node, title):
+	node.title.text = title
+
+
+class LoaderTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tempdir = tempfile.TemporaryDirectory()
+		self.dirpath = self.tempdir.name
+		self.write('page.html', kPageHTML)
+		self.write('nav.html', kNavHTML)
+
+	def tearDown(self):
+		self.tempdir.cleanup()
+
+	def write(self, name, html):
+		# Write a template file, making sure that its modification time changes even if the file system's timestamps are coarse.
+		path = os.path.join(self.dirpath, name)
+		mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+		with open(path, 'w', encoding='utf-8') as f:
+			f.write(html)
+		if mtime is not None:
+			os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+	def test_load(self):
+		loader = TemplateLoader(self.dirpath)
+		self.assertEqual(loader.render('page.html', render_page, 'Title'), '<html><title>Title</title><div><ul><li>LINK</li></ul></div></html>')
+		self.assertIs(loader.template('page.html'), loader.template('page.html'))
+		self.assertIsNot(loader.get('page.html'), loader.template('page.html'))
+		stats = loader.stats()
+		self.assertEqual((stats['entries'], stats['reloads'], stats['evictions']), (2, 0, 0))
+		self.assertGreater(stats['bytes'], 0)
+		self.assertGreaterEqual(stats['hits'], 2)
+		loader.clear()
+		self.assertEqual(loader.stats()['entries'], 0)
+
+	def test_reload(self):
+		# modified files are only noticed once checkinterval has passed since the last check
+		loader = TemplateLoader(self.dirpath, checkinterval=3600)
+		template = loader.template('page.html')
+		self.write('page.html', kPageHTML.replace('<html>', '<html lang="en">'))
+		self.assertIs(loader.template('page.html'), template)
+		loader.checkinterval = 0
+		self.assertEqual(loader.render('page.html', None), '<html lang="en"><title>TITLE</title><div><ul><li>LINK</li></ul></div></html>')
+		self.assertEqual(loader.stats()['reloads'], 1)
+		self.assertIs(loader.template('page.html'), loader.template('page.html'))
+		# a template is also reloaded when a template that it includes is modified
+		self.write('nav.html', kNavHTML.replace('<ul', '<ol').replace('</ul>', '</ol>'))
+		self.assertEqual(loader.render('page.html', None), '<html lang="en"><title>TITLE</title><div><ol><li>LINK</li></ol></div></html>')
+		# a template whose file has been deleted is discarded
+		os.remove(os.path.join(self.dirpath, 'page.html'))
+		with self.assertRaises(OSError):
+			loader.template('page.html')
+		with self.assertRaises(OSError):
+			loader.template('page.html')
+
+	def test_nocheck(self):
+		loader = TemplateLoader(self.dirpath, checkinterval=None)
+		template = loader.template('page.html')
+		self.write('page.html', '<p>changed</p>')
+		self.assertIs(loader.template('page.html'), template)
+		self.assertEqual(loader.stats()['reloads'], 0)
+
+	def test_path(self):
+		loader = TemplateLoader(os.path.join(self.dirpath, 'sub'))
+		os.mkdir(loader.dirpath)
+		for name in ['../page.html', os.path.join(self.dirpath, 'page.html'), 'x/../../page.html']:
+			with self.subTest(name=name):
+				with self.assertRaises(ValueError):
+					loader.template(name)
+		self.write('sub/inner.html', '<p node="inc:../nav.html"></p>')
+		with self.assertRaises(ValueError): # includes are also confined to the template directory
+			loader.template('inner.html')
+
+	def test_cycle(self):
+		self.write('a.html', '<div node="inc:b.html"></div>')
+		self.write('b.html', '<div node="inc:a.html"></div>')
+		loader = TemplateLoader(self.dirpath)
+		with self.assertRaises(ParseError) as cm:
+			loader.template('a.html')
+		self.assertIn('a.html -> b.html -> a.html', str(cm.exception))
+		self.write('self.html', '<div node="inc:self.html"></div>')
+		with self.assertRaises(ParseError):
+			loader.template('self.html')
+
+	def test_maxentries(self):
+		for i in range(5):
+			self.write('t{}.html'.format(i), '<p node="con:p">{}</p>'.format(i))
+		loader = TemplateLoader(self.dirpath, maxentries=3)
+		for i in range(5):
+			loader.template('t{}.html'.format(i))
+		loader.template('t2.html') # the most recently used templates are kept
+		stats = loader.stats()
+		self.assertEqual((stats['entries'], stats['evictions']), (3, 2))
+		template = loader.template('t4.html')
+		loader.template('t0.html')
+		self.assertIs(loader.template('t4.html'), template)
+		self.assertEqual(loader.stats()['entries'], 3)
+
+	def test_maxbytes(self):
+		for i in range(5):
+			self.write('t{}.html'.format(i), '<p node="con:p">{}</p>'.format('x' * 10000))
+		loader = TemplateLoader(self.dirpath)
+		loader.template('t0.html')
+		size = loader.stats()['bytes']
+		loader = TemplateLoader(self.dirpath, maxbytes=size * 2)
+		for i in range(5):
+			self.assertEqual(loader.render('t{}.html'.format(i), None), '<p>{}</p>'.format('x' * 10000))
+			self.assertLessEqual(loader.stats()['bytes'], size * 2)
+		self.assertEqual(loader.stats()['entries'], 2)
+		self.assertEqual(loader.stats()['evictions'], 3)
+
+
+if __name__ == '__main__':
+	unittest.main()
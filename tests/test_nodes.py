@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+# Tests the node classes' public attributes.
+
+import pickle, unittest
+
+from htmltemplate import Template
+
+
+kHTML = '<div node="con:rich"><b node="con:plain">PLAIN</b><br node="con:empty" /></div><p node="rep:row">ROW</p>'
+
+
+class AttributesTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+
+	def test_userattributes(self):
+		# nodes accept arbitrary attributes, which are copied with them
+		template = self.template
+		for node in [template, template.rich, template.rich.plain, template.rich.empty, template.row]:
+			node.data = node.nodename
+			self.assertEqual(node.copy().data, node.nodename)
+			self.assertEqual(pickle.loads(pickle.dumps(node)).data, node.nodename)
+		self.assertEqual(template.copy().rich.plain.data, 'plain')
+		self.assertEqual(template.render(), '<div><b>PLAIN</b><br /></div>')
+
+	def test_emptynode(self):
+		# setting an empty node's content has no effect
+		empty = self.template.rich.empty
+		empty.text = 'x'
+		empty.html = '<i>x</i>'
+		self.assertEqual(empty.text, '')
+		self.assertEqual(empty.html, '')
+		self.assertEqual(self.template.render(), '<div><b>PLAIN</b><br /></div>')
+
+	def test_replacenode(self):
+		with self.assertRaises(TypeError):
+			self.template.rich.plain = 'text'
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Tests Repeater.repeatparallel(), comparing its output with Repeater.repeat(). The render functions are module-level so that they can be pickled for process pools.
+
+import concurrent.futures, unittest
+
+from htmltemplate import Template
+
+
+kHTML = '<table><tr node="rep:row"><td node="con:name">NAME</td><td node="con:value">VALUE</td></tr></table><ul><li node="rep:item">ITEM</li></ul>'
+
+
+def render_row(node, item, prefix=''):
+	if item % 3 == 0:
+		node.omit()
+	node.name.text = '{}{}'.format(prefix, item)
+	node.value.text = item * item
+	if item % 5 == 0:
+		node.value.atts['class'] = 'five'
+
+def render_item(node, item, suffix):
+	node.text = '{}{}'.format(item, suffix)
+
+
+def render_page(node, method, items, **kwargs):
+	node.row._sep = '\n\t'
+	method(node.row, render_row, items, prefix='#', **kwargs)
+	node.item._sep = ', '
+	method(node.item, render_item, items, '!', **kwargs)
+
+
+class RepeatParallelTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+		self.items = list(range(1, 50))
+		self.expected = self.template.render(render_page, type(self.template.row).repeat, self.items)
+
+	def render(self, items, **kwargs):
+		return self.template.render(render_page, type(self.template.row).repeatparallel, items, **kwargs)
+
+	def test_threads(self):
+		with concurrent.futures.ThreadPoolExecutor(4) as executor:
+			for chunksize in [None, 1, 7, 100]:
+				with self.subTest(chunksize=chunksize):
+					self.assertEqual(self.render(self.items, executor=executor, chunksize=chunksize), self.expected)
+			self.assertEqual(self.render(range(1, 50), executor=executor), self.expected)
+			self.assertEqual(self.render([], executor=executor), self.template.render(render_page, type(self.template.row).repeat, []))
+			self.assertEqual(self.render([3, 6, 9], executor=executor), self.template.render(render_page, type(self.template.row).repeat, [3, 6, 9]))
+
+	def test_processes(self):
+		with concurrent.futures.ProcessPoolExecutor(2) as executor:
+			self.assertEqual(self.render(self.items, executor=executor), self.expected)
+			self.assertEqual(self.render(self.items, executor=executor, chunksize=10), self.expected)
+		# with no executor, a process pool is created for the call
+		self.assertEqual(self.render(self.items[:10], chunksize=5), self.template.render(render_page, type(self.template.row).repeat, self.items[:10]))
+
+	def test_added(self):
+		# rows rendered in parallel follow any rows already added, and the template itself is unchanged
+		node = self.template.copy()
+		node.item.add(render_item, 0, '?')
+		with concurrent.futures.ThreadPoolExecutor(2) as executor:
+			node.item.repeatparallel(render_item, [1, 2, 3], '!', executor=executor, chunksize=2)
+		self.assertEqual(node.render(), '<table></table><ul><li>0?</li>\n<li>1!</li>\n<li>2!</li>\n<li>3!</li></ul>')
+		self.assertEqual(self.template.render(), '<table></table><ul></ul>')
+
+	def test_errors(self):
+		with concurrent.futures.ThreadPoolExecutor(2) as executor:
+			with self.assertRaises(ZeroDivisionError):
+				self.template.copy().item.repeatparallel(lambda node, item: 1 / item, [1, 0], executor=executor)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Tests that the parser backends build the same object models.
+
+import glob, os, re, unittest
+
+from htmltemplate import Template, ParseError, parserbackends
+
+
+kSampleDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample')
+
+kTemplates = {
+	'uppercase tags': '<DIV node="con:a"><P node="rep:b" CLASS="x">B</P><Br node="con:c"/></DIV>',
+	'unquoted attributes': '<div node=con:a class=x><a node=rep:b href=/foo/bar.html>B</a><input node=con:c type=text disabled /></div>',
+	'entities in attributes': '<a node="con:a" href="/?x=1&amp;y=&quot;2&quot;" title="&lt;&#169;&gt;">A &amp; B</a><img node="con:b" alt="&eacute;" />',
+	'cdata': '<div node="con:a"><![CDATA[<p node="con:b">B</p>]]><p node="con:c">C</p></div>',
+	'script': '<div node="con:a"><script>if (a < b) { x = \'<p node="con:b">\'; }</script><style>p { color: red }</style><p node="con:c">C</p></div>',
+	'comments': '<div node="con:a"><!-- <p node="con:b">B</p> --><p node="con:c">C<!--<b node="con:d">--></p></div>',
+	'processing instructions': '<?xml version="1.0"?><!DOCTYPE html><html><p node="con:a">A<?php echo "<b node=\'con:b\'>"; ?></p></html>',
+	'many scripts': ''.join('<div node="con:d{0}"><script>var s{0} = "</p>";</script><p node="con:p{0}">P</p></div>'.format(i) for i in range(100)),
+}
+
+
+def sampletemplates():
+	templates = dict(kTemplates)
+	for path in glob.glob(os.path.join(kSampleDir, '**', '*.html'), recursive=True):
+		with open(path, encoding='utf8') as f:
+			templates[os.path.relpath(path, kSampleDir)] = f.read()
+	for path in glob.glob(os.path.join(kSampleDir, '*.py')):
+		with open(path, encoding='utf8') as f:
+			for i, html in enumerate(re.findall(r"Template\((?:'''|\"\"\")(.*?)(?:'''|\"\"\")", f.read(), re.S)):
+				templates['{}#{}'.format(os.path.basename(path), i)] = html
+	return templates
+
+
+def dump(node):
+	# Describe a node's structure and content, for comparing object models.
+	out = [node.__class__.__name__, node.nodename, repr(getattr(node, '_atts', None)), repr(getattr(node, '_sep', None))]
+	content = getattr(node, '_RichContent__nodeslist', None)
+	if content is None:
+		out.append(repr(getattr(node, '_html', None)))
+	else:
+		out += [repr(item) if i % 2 == 0 else dump(item) for i, item in enumerate(content)]
+	return '(' + ' '.join(out) + ')'
+
+
+class ParserTest(unittest.TestCase):
+
+	def test_backends(self):
+		for name, html in sorted(sampletemplates().items()):
+			expected = dump(Template(html))
+			for backend in parserbackends:
+				with self.subTest(template=name, parser=backend):
+					try:
+						result = dump(Template(html, parser=backend))
+					except ParseError: # expat only accepts well-formed XHTML
+						self.assertEqual(backend, 'expat')
+					else:
+						self.assertEqual(result, expected)
+
+	def test_script(self):
+		template = Template(kTemplates['script'], parser='scanner')
+		self.assertEqual([node.nodename for node in template.a], ['c'])
+		# the scanner copies markup outside of template nodes as-is, so its end tag needn't be lowercase
+		html = '<div node="con:a"><SCRIPT type="text/javascript">x = "<b node=\\"con:b\\">";</Script ><p node="con:c">C</p></div>'
+		template = Template(html, parser='scanner')
+		self.assertEqual([node.nodename for node in template.a], ['c'])
+		self.assertEqual(template.render(), html.replace(' node="con:a"', '').replace(' node="con:c"', ''))
+
+	def test_unicode(self):
+		# characters whose lowercase form is longer than themselves don't affect the position of the end tag
+		html = '<div node="con:a"><script>"' + "İ" * 30 + '"</script><p node="con:b">B</p></div>'
+		self.assertEqual(dump(Template(html, parser='scanner')), dump(Template(html)))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Tests profile() and Profiler.
+
+import unittest
+
+from htmltemplate import Template, Node, profile
+
+
+kHTML = '''<title node="con:title">TITLE</title>
+<ul node="con:nav"><li node="rep:link"><a node="con:link" href="#">LINK</a></li></ul>
+<p node="con:footer">FOOTER</p><p node="con:note">NOTE</p>'''
+
+
+def render_page(node, title, links):
+	node.title.text = title
+	node.nav.link.repeat(render_link, links)
+	node.note.omit()
+
+def render_link(node, name):
+	node.link.text = name
+	node.link.atts['href'] = '/' + name
+
+
+class ProfileTest(unittest.TestCase):
+
+	def test_stats(self):
+		for compiled in (False, True):
+			with self.subTest(compiled=compiled):
+				template = Template(kHTML, compiled=compiled)
+				expected = template.render(render_page, 'Café', ['a', 'b', 'c'])
+				render = Node.render
+				with profile() as p:
+					html = template.render(render_page, 'Café', ['a', 'b', 'c'])
+				self.assertIs(Node.render, render)
+				self.assertEqual(html, expected)
+				stats = p.stats()
+				# paths follow the template's structure, not the calls that rendered each node
+				self.assertEqual(sorted(stats), ['tem:', 'tem:/con:footer', 'tem:/con:nav', 'tem:/con:nav/rep:link',
+						'tem:/con:nav/rep:link/con:link', 'tem:/con:note', 'tem:/con:title'])
+				self.assertEqual(stats['tem:']['bytes'], len(expected.encode('utf-8')))
+				self.assertEqual(stats['tem:/con:title']['bytes'], len('<title>Café</title>'.encode('utf-8')))
+				self.assertEqual(stats['tem:/con:nav']['bytes'], len(expected[expected.index('<ul>'):expected.index('</ul>') + 5]))
+				self.assertEqual(stats['tem:/con:nav/rep:link']['calls'], 3)
+				self.assertEqual(stats['tem:/con:nav/rep:link/con:link']['calls'], 3)
+				self.assertEqual(stats['tem:/con:nav/rep:link/con:link']['bytes'], len('<a href="/a">a</a>') * 3)
+				self.assertEqual((stats['tem:/con:note']['calls'], stats['tem:/con:note']['omitted']), (1, 1))
+				for path, s in stats.items():
+					self.assertGreater(s['time'], 0, path)
+					self.assertGreaterEqual(s['time'], s['render'], path)
+				self.assertGreater(stats['tem:']['callback'], 0)
+				self.assertIn('tem:/con:nav/rep:link', p.report())
+				self.assertIn('tem:;con:nav;rep:link;callback ', p.collapsed())
+
+	def test_subnode(self):
+		nav = Template(kHTML).nav
+		with profile() as p:
+			nav.render(lambda node: node.link.repeat(render_link, ['a']))
+		self.assertEqual(sorted(p.stats()), ['con:nav', 'con:nav/rep:link', 'con:nav/rep:link/con:link'])
+
+	def test_nested(self):
+		with profile() as p:
+			with self.assertRaises(RuntimeError):
+				with profile():
+					pass
+
+
+if __name__ == '__main__':
+	unittest.main()
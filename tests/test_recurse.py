@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Tests Container.recurse(), comparing its output for nested lists (as in sample/demo9_recursive_list.py) with rendering each sub-list to a string.
+
+import unittest
+
+from htmltemplate import Template
+
+
+kHTML = '''
+<html>
+	<ul node="con:list" class="level">
+<li node="rep:item">...</li>
+	</ul>
+</html>
+'''
+
+kData = ['A1', 'A2 & co', ['b1', 'b2', 'b3', ['c1', 'c2', 'c3'], 'b4', ['c5', 'c6'], []], 'A3', 'A4']
+
+
+def render_list(node, datalist, prototype, recurse):
+	node.item.repeat(render_item, datalist, prototype, recurse)
+
+def render_item(node, dataitem, prototype, recurse):
+	if isinstance(dataitem, list):
+		recurse(node, prototype, dataitem)
+	else:
+		node.text = dataitem
+
+def recurse_in_place(node, prototype, datalist):
+	# render the sub-list using the original con:list node
+	node.recurse(prototype, render_list, datalist, prototype, recurse_in_place)
+
+def recurse_to_string(node, prototype, datalist):
+	node.html = prototype.render(render_list, datalist, prototype, recurse_to_string)
+
+def render_template(node, datalist, recurse):
+	render_list(node.list, datalist, node.list.copy(), recurse)
+
+
+class RecurseTest(unittest.TestCase):
+
+	def check(self, template, data):
+		expected = template.render(render_template, data, recurse_to_string)
+		self.assertEqual(template.render(render_template, data, recurse_in_place), expected)
+		self.assertEqual(''.join(template.renderiter(render_template, data, recurse_in_place, buffersize=0)), expected)
+		return expected
+
+	def test_nested(self):
+		for compiled in [False, True]:
+			with self.subTest(compiled=compiled):
+				template = Template(kHTML, compiled=compiled)
+				html = self.check(template, kData)
+				self.assertEqual(html.count('<ul class="level">'), 5)
+				self.assertIn('<li><ul class="level">\n<li>c1</li>', html)
+				self.assertIn('<li>A2 &amp; co</li>', html)
+				self.assertEqual(template.render(), Template(kHTML).render())
+
+	def test_deep(self):
+		data = ['leaf']
+		for i in range(50):
+			data = [str(i), data]
+		html = self.check(Template(kHTML), data)
+		self.assertEqual(html.count('<li>leaf</li>'), 1)
+		self.assertEqual(html.count('</ul>'), 51)
+
+
+if __name__ == '__main__':
+	unittest.main()
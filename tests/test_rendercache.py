@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Tests Node.rendercached(), Node.renderitercached() and Node.cachedetag().
+
+import hashlib, time, unittest
+from unittest import mock
+
+from htmltemplate import Template, RenderCache, rendercache
+
+
+kHTML = '<html><title node="con:title">TITLE</title><ul><li node="rep:item">ITEM</li></ul></html>'
+
+
+def render_page(node, title, items):
+	render_page.calls += 1
+	node.title.text = title
+	node.item.repeat(render_item, items)
+
+def render_item(node, item):
+	node.text = item
+
+
+class RenderCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+		self.cache = RenderCache()
+		render_page.calls = 0
+
+	def test_rendercached(self):
+		expected = self.template.render(render_page, 'Tïtle', ['a', 'b'])
+		self.assertIsNone(self.template.cachedetag(render_page, 'Tïtle', ['a', 'b'], cache=self.cache))
+		html, etag = self.template.rendercached(render_page, 'Tïtle', ['a', 'b'], cache=self.cache)
+		self.assertEqual(html, expected)
+		self.assertEqual(etag, '"{}"'.format(hashlib.blake2b(expected.encode('utf-8'), digest_size=16).hexdigest()))
+		self.assertEqual(self.template.rendercached(render_page, 'Tïtle', ['a', 'b'], cache=self.cache), (html, etag))
+		self.assertEqual(self.template.cachedetag(render_page, 'Tïtle', ['a', 'b'], cache=self.cache), etag)
+		self.assertEqual(render_page.calls, 2)
+		# different arguments, keys and encodings are cached separately
+		self.assertNotEqual(self.template.rendercached(render_page, 'Title', ['a', 'b'], cache=self.cache)[0], html)
+		self.assertNotEqual(self.template.rendercached(render_page, 'Tïtle', ['a', 'b'], cache=self.cache, encoding='latin-1')[1], etag)
+		self.assertEqual(self.template.rendercached(render_page, 'Tïtle', ['a', 'b'], cache=self.cache, key='page')[0], html)
+		self.assertEqual(render_page.calls, 5)
+		self.assertEqual(self.template.rendercached(render_page, 'ignored', [], cache=self.cache, key='page')[0], html)
+		self.assertEqual(render_page.calls, 5)
+
+	def test_renderitercached(self):
+		for encoding in ['utf-8', 'utf-16']:
+			with self.subTest(encoding=encoding):
+				cache = RenderCache()
+				items = ['é{}'.format(i) for i in range(1000)]
+				expected = self.template.rendercached(render_page, 'Title', items, cache=RenderCache(), encoding=encoding)
+				etag, chunks = self.template.renderitercached(render_page, 'Title', items, cache=cache, buffersize=100, encoding=encoding)
+				self.assertIsNone(etag)
+				self.assertIsNone(self.template.cachedetag(render_page, 'Title', items, cache=cache, encoding=encoding))
+				chunks = list(chunks)
+				self.assertGreater(len(chunks), 1)
+				self.assertEqual(''.join(chunks), expected[0])
+				self.assertEqual(self.template.cachedetag(render_page, 'Title', items, cache=cache, encoding=encoding), expected[1])
+				self.assertEqual(self.template.rendercached(render_page, 'Title', items, cache=cache, encoding=encoding), expected)
+				etag, chunks = self.template.renderitercached(render_page, 'Title', items, cache=cache, encoding=encoding)
+				self.assertEqual((''.join(chunks), etag), expected)
+
+	def test_ttl(self):
+		now = time.monotonic()
+		with mock.patch('time.monotonic', lambda: now):
+			cache = RenderCache(ttl=60)
+			self.template.rendercached(render_page, 'Title', [], cache=cache)
+			self.template.rendercached(render_page, 'Other', [], cache=cache, ttl=600)
+			now += 59
+			self.assertIsNotNone(self.template.cachedetag(render_page, 'Title', [], cache=cache))
+			now += 1
+			self.assertIsNone(self.template.cachedetag(render_page, 'Title', [], cache=cache))
+			self.assertIsNotNone(self.template.cachedetag(render_page, 'Other', [], cache=cache))
+			self.template.rendercached(render_page, 'Title', [], cache=cache)
+			self.assertEqual(render_page.calls, 3)
+			self.assertEqual(cache.stats()['expirations'], 1)
+			now += 540
+			self.assertIsNone(self.template.cachedetag(render_page, 'Other', [], cache=cache))
+
+	def test_unpicklable(self):
+		for method in [self.template.rendercached, self.template.renderitercached, self.template.cachedetag]:
+			with self.subTest(method=method.__name__):
+				with self.assertRaisesRegex(TypeError, "Can't derive a render cache key"):
+					method(render_page, 'Title', (item for item in 'ab'), cache=self.cache)
+				with self.assertRaisesRegex(TypeError, "Can't derive a render cache key"):
+					method(render_page, 'Title', [], cache=self.cache, callback=lambda: None)
+		self.assertEqual(render_page.calls, 0)
+		# an explicit key is used as-is
+		html, etag = self.template.rendercached(render_page, 'Title', (item for item in 'ab'), cache=self.cache, key=1)
+		self.assertIn('<li>a</li>', html)
+
+	def test_default(self):
+		self.addCleanup(rendercache.clear)
+		self.template.rendercached(render_page, 'Title', [])
+		self.template.rendercached(render_page, 'Title', [])
+		self.assertEqual(render_page.calls, 1)
+		self.assertIsNone(self.template.cachedetag(render_page, 'Title', [], cache=self.cache))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Tests TemplateCache, using temporary template and cache directories.
+
+import glob, os, tempfile, unittest
+
+from htmltemplate import Template, TemplateCache, encodeentity
+
+
+kHTML = '''<html><title node="con:title">TITLE</title>
+<ul><li node="rep:item"><a node="con:link" href="#">LINK</a></li></ul></html>'''
+
+
+def render_page(node, title, items):
+	node.title.text = title
+	node.item.repeat(render_item, items)
+
+def render_item(node, item):
+	node.link.text = item
+	node.link.atts['href'] = '/' + item
+
+def encodeupper(s):
+	return encodeentity(s).upper()
+
+
+class TemplateCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tempdir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tempdir.name, 'page.html')
+		with open(self.path, 'w', encoding='utf-8') as f:
+			f.write(kHTML)
+		self.cache = TemplateCache(os.path.join(self.tempdir.name, 'cache'))
+
+	def tearDown(self):
+		self.tempdir.cleanup()
+
+	def cachefiles(self):
+		return glob.glob(os.path.join(self.cache.dirpath, '*.pickle'))
+
+	def counts(self):
+		stats = self.cache.stats()
+		return stats['hits'], stats['misses'], stats['errors']
+
+	def test_hits(self):
+		expected = Template(kHTML).render(render_page, 'Title', ['a', 'b'])
+		self.assertEqual(self.cache.load(self.path).render(render_page, 'Title', ['a', 'b']), expected)
+		self.assertEqual(self.counts(), (0, 1, 0))
+		self.assertEqual(self.cache.load(self.path).render(render_page, 'Title', ['a', 'b']), expected)
+		self.assertEqual(self.counts(), (1, 1, 0))
+		self.assertEqual(len(self.cachefiles()), 1)
+		# another cache using the same directory, e.g. in a later process
+		self.assertEqual(TemplateCache(self.cache.dirpath).load(self.path).render(render_page, 'Title', ['a', 'b']), expected)
+		self.cache.clear()
+		self.assertEqual(self.cachefiles(), [])
+
+	def test_keys(self):
+		# templates parsed with different settings are cached separately
+		self.cache.load(self.path)
+		for kwargs in [{'isxhtml': False}, {'encodefn': encodeupper}, {'parser': 'scanner'}]:
+			with self.subTest(**kwargs):
+				misses = self.cache.misses
+				self.cache.load(self.path, **kwargs)
+				self.assertEqual(self.cache.misses, misses + 1)
+				self.cache.load(self.path, **kwargs)
+				self.assertEqual(self.cache.misses, misses + 1)
+		self.assertEqual(len(self.cachefiles()), 4)
+		self.assertEqual(self.cache.load(self.path, encodefn=encodeupper).render(render_page, 'a&b', []),
+				'<html><title>A&AMP;B</title>\n<ul></ul></html>')
+
+	def test_corrupt(self):
+		self.cache.load(self.path)
+		path, = self.cachefiles()
+		with open(path, 'wb') as f:
+			f.write(b'not a pickle')
+		template = self.cache.load(self.path)
+		self.assertEqual(template.render(), Template(kHTML).render())
+		self.assertEqual(self.counts(), (0, 2, 1))
+		self.cache.load(self.path) # the corrupt file was replaced
+		self.assertEqual(self.counts(), (1, 2, 1))
+
+	def test_lambda(self):
+		# a template whose encodefn can't be pickled is parsed every time
+		encodefn = lambda s: encodeentity(s)
+		for i in range(2):
+			self.assertEqual(self.cache.load(self.path, encodefn=encodefn).render(render_page, 'a&b', []),
+					'<html><title>a&amp;b</title>\n<ul></ul></html>')
+		self.assertEqual(self.counts(), (0, 2, 2))
+		self.assertEqual(self.cachefiles(), [])
+
+	def test_compiled(self):
+		expected = Template(kHTML).render(render_page, 'Title', ['a', 'b'])
+		for i in range(2):
+			template = self.cache.load(self.path, compiled=True)
+			self.assertTrue(hasattr(template.__class__, '_compiledbase'))
+			self.assertEqual(template.render(render_page, 'Title', ['a', 'b']), expected)
+		self.assertEqual(self.counts(), (1, 1, 0))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# Tests wsgiresponse() and asgiresponse(), using the standard library's WSGI validator and a fake ASGI send function.
+
+import asyncio, unittest, wsgiref.util, wsgiref.validate
+
+from htmltemplate import Template, wsgiresponse, asgiresponse
+
+
+kHTML = '<html><title node="con:title">TITLE</title><ul><li node="rep:item">ITEM</li></ul></html>'
+
+
+def render_page(node, title, items):
+	node.title.text = title
+	node.item.repeat(render_item, items)
+
+def render_lazypage(node, title, items):
+	node.title.text = title
+	node.item.repeatlazy(render_item, items)
+
+def render_item(node, item):
+	node.text = item
+
+async def render_asyncpage(node, title, items):
+	node.title.text = title
+	node.item.repeatlazy(render_asyncitem, items)
+
+async def render_asyncitem(node, item):
+	await asyncio.sleep(0)
+	node.text = item
+
+
+def render_empty(node):
+	node.html = ''
+
+def render_emptylist(node, items):
+	node.item.repeatlazy(render_item, items)
+
+
+class WSGITest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+
+	def respond(self, *args, **kwargs):
+		# Call a validated WSGI application that responds with wsgiresponse(); returns (status, headers dict, body).
+		response = []
+		def application(environ, start_response):
+			return wsgiresponse(start_response, *args, **kwargs)
+		def start_response(status, headers, exc_info=None):
+			response.extend([status, dict(headers)])
+		environ = {'QUERY_STRING': ''}
+		wsgiref.util.setup_testing_defaults(environ)
+		result = wsgiref.validate.validator(application)(environ, start_response)
+		try:
+			body = b''.join(result)
+		finally:
+			result.close()
+		return response[0], response[1], body
+
+	def test_eager(self):
+		items = ['item {}'.format(i) for i in range(1000)]
+		expected = self.template.render(render_page, 'Title é', items).encode('utf-8')
+		status, headers, body = self.respond(self.template, render_page, 'Title é', items, buffersize=100)
+		self.assertEqual(status, '200 OK')
+		self.assertEqual(body, expected)
+		self.assertEqual(headers['Content-Type'], 'text/html; charset=utf-8')
+		self.assertEqual(headers['Content-Length'], str(len(expected)))
+
+	def test_lazy(self):
+		items = ['item {}'.format(i) for i in range(1000)]
+		expected = self.template.render(render_page, 'Title', items).encode('latin-1')
+		status, headers, body = self.respond(self.template, render_lazypage, 'Title', iter(items),
+				status='404 Not Found', headers=[('Cache-Control', 'no-cache')], buffersize=100, encoding='latin-1')
+		self.assertEqual(status, '404 Not Found')
+		self.assertEqual(body, expected)
+		self.assertEqual(headers['Content-Type'], 'text/html; charset=latin-1')
+		self.assertEqual(headers['Cache-Control'], 'no-cache')
+		self.assertNotIn('Content-Length', headers)
+
+	def test_empty(self):
+		status, headers, body = self.respond(self.template, render_empty)
+		self.assertEqual(body, b'')
+		self.assertEqual(headers['Content-Length'], '0')
+		status, headers, body = self.respond(Template('<li node="rep:item">ITEM</li>'), render_emptylist, iter([]))
+		self.assertEqual(body, b'')
+		self.assertNotIn('Content-Length', headers)
+
+
+class ASGITest(unittest.TestCase):
+
+	def setUp(self):
+		self.template = Template(kHTML)
+
+	def respond(self, *args, **kwargs):
+		# Call asgiresponse() with a fake send function; returns (response start message, headers dict, body messages).
+		messages = []
+		async def send(message):
+			messages.append(message)
+		asyncio.run(asgiresponse(send, *args, **kwargs))
+		start, body = messages[0], messages[1:]
+		self.assertEqual(start['type'], 'http.response.start')
+		self.assertTrue(body)
+		for message in body:
+			self.assertEqual(message['type'], 'http.response.body')
+			self.assertIsInstance(message['body'], bytes)
+		self.assertEqual([message['more_body'] for message in body], [True] * (len(body) - 1) + [False])
+		return start, dict(start['headers']), body
+
+	def test_eager(self):
+		items = ['item {}'.format(i) for i in range(1000)]
+		expected = self.template.render(render_page, 'Title é', items).encode('utf-8')
+		start, headers, body = self.respond(self.template, render_page, 'Title é', items, buffersize=100)
+		self.assertEqual(start['status'], 200)
+		self.assertGreater(len(body), 1)
+		self.assertEqual(b''.join(message['body'] for message in body), expected)
+		self.assertEqual(headers[b'content-type'], b'text/html; charset=utf-8')
+		self.assertEqual(headers[b'content-length'], str(len(expected)).encode('ascii'))
+
+	def test_lazy(self):
+		items = ['item {}'.format(i) for i in range(1000)]
+		expected = self.template.render(render_page, 'Title', items).encode('utf-8')
+		start, headers, body = self.respond(self.template, render_lazypage, 'Title', iter(items),
+				status=404, headers=[('Cache-Control', 'no-cache')], buffersize=100)
+		self.assertEqual(start['status'], 404)
+		self.assertGreater(len(body), 1)
+		self.assertEqual(b''.join(message['body'] for message in body), expected)
+		self.assertEqual(headers[b'cache-control'], b'no-cache')
+		self.assertNotIn(b'content-length', headers)
+
+	def test_async(self):
+		items = ['item {}'.format(i) for i in range(1000)]
+		expected = self.template.render(render_page, 'Title', items).encode('utf-8')
+		start, headers, body = self.respond(self.template, render_asyncpage, 'Title', items, buffersize=100)
+		self.assertGreater(len(body), 1)
+		self.assertEqual(b''.join(message['body'] for message in body), expected)
+		self.assertNotIn(b'content-length', headers)
+
+	def test_empty(self):
+		start, headers, body = self.respond(self.template, render_empty)
+		self.assertEqual(body, [{'type': 'http.response.body', 'body': b'', 'more_body': False}])
+		self.assertEqual(headers[b'content-length'], b'0')
+		start, headers, body = self.respond(Template('<li node="rep:item">ITEM</li>'), render_emptylist, iter([]))
+		self.assertEqual(body, [{'type': 'http.response.body', 'body': b'', 'more_body': False}])
+		self.assertNotIn(b'content-length', headers)
+
+	def test_single(self):
+		start, headers, body = self.respond(self.template, render_page, 'Title', ['item'])
+		self.assertEqual(len(body), 1)
+		self.assertEqual(body[0]['body'], self.template.render(render_page, 'Title', ['item']).encode('utf-8'))
+
+
+if __name__ == '__main__':
+	unittest.main()
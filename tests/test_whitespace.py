@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+# Tests Node.collapsewhitespace().
+
+import unittest
+
+from htmltemplate import Template, Fragment
+
+
+def render_table(node, cells):
+	node.row.repeat(render_row, cells)
+
+def render_row(node, cell):
+	node.cell.text = cell
+
+
+class CollapseWhitespaceTest(unittest.TestCase):
+
+	def test_collapse(self):
+		template = Template('<table>\n\t<tr node="rep:row">\n\t\t<td node="con:cell">  CELL  </td>\n\t</tr>\n</table>\n\n<pre node="con:code">  a\n  b</pre>')
+		stats = template.collapsewhitespace()
+		self.assertEqual(template.render(render_table, ['a', 'b']), '<table><tr><td>a</td></tr><tr><td>b</td></tr></table><pre>  a\n  b</pre>')
+		self.assertGreater(stats['bytes'], 0)
+
+	def test_fragment(self):
+		section = Template('<section>\n\t<h1 node="con:heading">HEADING</h1>\n</section>')
+		for fragment in [section.renderfragment(lazy=True), Fragment([section.render() + ' ' * 70000])]:
+			template = Template('<div node="con:body">\n\t<p node="con:para">PARA</p>\n</div>')
+			template.body.html = fragment
+			expected = template.render()
+			template.collapsewhitespace()
+			self.assertEqual(template.render(), expected)
+
+
+if __name__ == '__main__':
+	unittest.main()